@@ -1,4 +1,3 @@
-import stripe
 from flask import Flask
 from app.extensions import (
     bootstrap,
@@ -9,7 +8,14 @@ from app.extensions import (
     configure_uploads,
     patch_request_class,
 )
-from app.search import FlaskSQLAlchemyMiddleware, ElasticsearchClient
+from app.assets import init_assets
+from app.cache import init_fragment_cache, init_page_cache
+from app.metrics import init_metrics
+from app.passwords import init_password_hashing
+from app.profiling import init_profiling
+from app.sessions import init_sessions
+from app.throttling import init_rate_limiting
+from app.search import FlaskSQLAlchemyMiddleware, ElasticsearchClient, SearchTelemetry
 from config import CONFIG_MAPPER
 import os
 
@@ -22,6 +28,7 @@ def register_blueprints(app):
     from app.blueprints import dashboard as dashboard_blueprint
     from app.blueprints import events as events_blueprint
     from app.blueprints import payments as payments_blueprint
+    from app.blueprints import internal as internal_blueprint
 
     app.register_blueprint(main_blueprint)
     app.register_blueprint(auth_blueprint, url_prefix="/auth")
@@ -30,6 +37,7 @@ def register_blueprints(app):
     app.register_blueprint(dashboard_blueprint, url_prefix="/dashboard")
     app.register_blueprint(events_blueprint, url_prefix="/events")
     app.register_blueprint(payments_blueprint, url_prefix="/payments")
+    app.register_blueprint(internal_blueprint, url_prefix="/internal")
 
 
 def register_extensions(app):
@@ -50,19 +58,39 @@ def register_extensions(app):
 
 def add_attributes(app, use_elasticsearch):
     """Add attributes to the application instance."""
-    stripe.api_key = app.config["STRIPE_SECRET_KEY"]
-    app.stripe = stripe
+    app.search_telemetry = SearchTelemetry(
+        app.config["SEARCH_SLOW_QUERY_THRESHOLD"],
+        app.config["SEARCH_SLOW_QUERY_LOG_SIZE"],
+        app.logger,
+    )
+    init_fragment_cache(app)
+    init_page_cache(app)
+    init_sessions(app)
+    init_password_hashing(app)
+    init_rate_limiting(app)
+    init_assets(app)
+    init_profiling(app)
+    init_metrics(app)
 
     if use_elasticsearch:
-        elasticsearch_client = ElasticsearchClient(app.config["ELASTICSEARCH_URL"])
-        sqlalchemy_search_middleware = FlaskSQLAlchemyMiddleware(elasticsearch_client, db)
-        app.sqlalchemy_search_middleware = sqlalchemy_search_middleware
-        db.event.listen(
-            db.session, "before_commit", sqlalchemy_search_middleware.before_commit
-        )
-        db.event.listen(
-            db.session, "after_commit", sqlalchemy_search_middleware.after_commit
-        )
+        init_search(app, ElasticsearchClient(app.config["ELASTICSEARCH_URL"]))
+
+
+def init_search(app, elasticsearch_client):
+    """Search with the given client and keep its indices in sync
+    with the database.
+    """
+    app.elasticsearch_client = elasticsearch_client
+    sqlalchemy_search_middleware = FlaskSQLAlchemyMiddleware(
+        elasticsearch_client, db, app.search_telemetry
+    )
+    app.sqlalchemy_search_middleware = sqlalchemy_search_middleware
+    db.event.listen(
+        db.session, "before_commit", sqlalchemy_search_middleware.before_commit
+    )
+    db.event.listen(
+        db.session, "after_commit", sqlalchemy_search_middleware.after_commit
+    )
 
 
 def create_app(config_name, use_elasticsearch):
@@ -73,8 +101,20 @@ def create_app(config_name, use_elasticsearch):
     
     app = Flask(__name__.split(".")[0])
     app.config.from_object(CONFIG_MAPPER[config_name])
+    CONFIG_MAPPER[config_name].init_app(app)
     register_extensions(app)
     add_attributes(app, use_elasticsearch)
     register_blueprints(app)
     return app
 
+
+
+def init_worker(app):
+    """Reset the connections a worker process inherited from the process
+    that created the application before it forked, e.g. when gunicorn
+    preloads the application.
+    """
+    db.dispose_engines(app)
+    elasticsearch_client = getattr(app, "elasticsearch_client", None)
+    if elasticsearch_client is not None:
+        elasticsearch_client.reset()
@@ -0,0 +1,258 @@
+"""This module contains a manifest of fingerprinted static assets.
+
+Each asset gets a name with a hash of its contents in it, e.g.
+css/style.3f2a1b9c04de.css, which url_for("static") returns instead of
+the plain name. Since the name changes whenever the file does, the
+fingerprinted files are served with a far-future, immutable
+Cache-Control header.
+
+Without a build, the manifest is computed when the application starts
+and fingerprinted names are served from the original files. The
+"flask assets build" command writes fingerprinted copies of the assets
+to ASSET_BUILD_FOLDER instead, with the references between them
+rewritten and .gz and .br siblings next to them, along with a manifest
+that is loaded at startup.
+"""
+
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+
+MANIFEST_FILENAME = "manifest.json"
+FINGERPRINT_LENGTH = 12
+ONE_YEAR = 365 * 24 * 60 * 60
+COMPRESSIBLE_EXTENSIONS = {
+    ".css",
+    ".eot",
+    ".ico",
+    ".js",
+    ".json",
+    ".map",
+    ".otf",
+    ".svg",
+    ".ttf",
+    ".txt",
+    ".webmanifest",
+}
+ENCODING_EXTENSIONS = {"br": ".br", "gzip": ".gz"}
+FINGERPRINT_PATTERN = re.compile(r"\.[0-9a-f]{%d}(\.[^./]+)$" % FINGERPRINT_LENGTH)
+CSS_URL_PATTERN = re.compile(r"""url\((['"]?)([^'")]+)\1\)""")
+
+
+class AssetManifest:
+    """Class to map static filenames to their fingerprinted names and
+    to the files that are served for them.
+    """
+
+    def __init__(self, folder, assets, built=False):
+        self.folder = folder
+        self.assets = assets
+        self.built = built
+        self.originals = {asset["path"]: name for name, asset in assets.items()}
+
+    @classmethod
+    def from_static_folder(cls, static_folder, directories):
+        """Return a manifest for the assets in the given directories
+        of the static folder, which are served as they are.
+        """
+        assets = {
+            name: {"path": fingerprint(name, read_asset(static_folder, name))}
+            for name in find_assets(static_folder, directories)
+        }
+        return cls(static_folder, assets)
+
+    @classmethod
+    def load(cls, build_folder):
+        """Return the manifest written by build_assets."""
+        with open(os.path.join(build_folder, MANIFEST_FILENAME)) as manifest_file:
+            return cls(build_folder, json.load(manifest_file), built=True)
+
+    def url_filename(self, filename):
+        """Return the name url_for should use for the given static file."""
+        asset = self.assets.get(filename)
+        return filename if asset is None else asset["path"]
+
+    def original(self, filename):
+        """Return the plain name of the given fingerprinted name, or
+        None if it isn't one.
+        """
+        return self.originals.get(filename)
+
+    def file_for(self, filename, accept_encodings=()):
+        """Return the path of the file to send for the given fingerprinted
+        name, relative to the manifest's folder, and its content encoding.
+        The smallest encoding the client accepts is chosen.
+        """
+        name = self.originals[filename]
+        if not self.built:
+            return name, None
+        for encoding in self.assets[name].get("encodings", []):
+            if encoding in accept_encodings:
+                return filename + ENCODING_EXTENSIONS[encoding], encoding
+        return filename, None
+
+
+def find_assets(static_folder, directories):
+    """Return the names of the files in the given directories of the
+    static folder, relative to it and using forward slashes.
+    """
+    names = []
+    for directory in directories:
+        for root, _, filenames in os.walk(os.path.join(static_folder, directory)):
+            for filename in filenames:
+                path = os.path.relpath(os.path.join(root, filename), static_folder)
+                names.append(path.replace(os.sep, "/"))
+    return sorted(names)
+
+
+def read_asset(static_folder, name):
+    """Return the contents of the given asset."""
+    with open(os.path.join(static_folder, *name.split("/")), "rb") as asset:
+        return asset.read()
+
+
+def fingerprint(name, content):
+    """Return the name with a hash of the content inserted before
+    its extension.
+    """
+    digest = hashlib.md5(content).hexdigest()[:FINGERPRINT_LENGTH]
+    root, extension = posixpath.splitext(name)
+    return "%s.%s%s" % (root, digest, extension)
+
+
+def strip_fingerprint(filename):
+    """Return the filename without its fingerprint."""
+    return FINGERPRINT_PATTERN.sub(r"\1", filename)
+
+
+def rewrite_css_urls(name, content, assets):
+    """Return the CSS with relative url() references to other assets
+    replaced with their fingerprinted names.
+    """
+    directory = posixpath.dirname(name)
+
+    def replace(match):
+        reference = match.group(2)
+        if reference.startswith(("/", "data:", "#")) or ":" in reference:
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(directory, reference))
+        if target not in assets:
+            return match.group(0)
+        path = posixpath.relpath(assets[target]["path"], directory)
+        return "url(%s%s%s)" % (match.group(1), path, match.group(1))
+
+    return CSS_URL_PATTERN.sub(replace, content.decode("utf-8")).encode("utf-8")
+
+
+def compress(content):
+    """Return the content compressed with each available encoding,
+    keeping only the ones that make it smaller.
+    """
+    compressed = {"gzip": gzip.compress(content, 9, mtime=0)}
+    if brotli is not None:
+        compressed["br"] = brotli.compress(content)
+    return {
+        encoding: data
+        for encoding, data in sorted(compressed.items(), key=lambda item: len(item[1]))
+        if len(data) < len(content)
+    }
+
+
+def build_assets(static_folder, directories, build_folder):
+    """Write fingerprinted, precompressed copies of the assets in the
+    given directories to the build folder along with their manifest,
+    and return the manifest.
+    """
+    names = find_assets(static_folder, directories)
+    # stylesheets are fingerprinted last since they refer to the others
+    names.sort(key=lambda name: name.endswith(".css"))
+    assets = {}
+    for name in names:
+        content = read_asset(static_folder, name)
+        if name.endswith(".css"):
+            content = rewrite_css_urls(name, content, assets)
+        path = fingerprint(name, content)
+        asset = {"path": path, "encodings": []}
+        files = {path: content}
+        if posixpath.splitext(name)[1] in COMPRESSIBLE_EXTENSIONS:
+            for encoding, data in compress(content).items():
+                asset["encodings"].append(encoding)
+                files[path + ENCODING_EXTENSIONS[encoding]] = data
+        for file_path, data in files.items():
+            full_path = os.path.join(build_folder, *file_path.split("/"))
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "wb") as output:
+                output.write(data)
+        assets[name] = asset
+
+    with open(os.path.join(build_folder, MANIFEST_FILENAME), "w") as manifest_file:
+        json.dump(assets, manifest_file, indent=2, sort_keys=True)
+    return AssetManifest(build_folder, assets, built=True)
+
+
+def fingerprint_static_url(endpoint, values):
+    """Replace the filename given to url_for("static") with its
+    fingerprinted name.
+    """
+    if endpoint == "static" and "filename" in values:
+        values["filename"] = current_app.asset_manifest.url_filename(
+            values["filename"]
+        )
+
+
+def send_asset(filename):
+    """Send a static file. Fingerprinted files are sent in the smallest
+    encoding the client accepts and may be cached forever.
+    """
+    manifest = current_app.asset_manifest
+    if manifest.original(filename) is None:
+        # a fingerprint from an earlier deploy still gets the current file
+        if strip_fingerprint(filename) in manifest.assets:
+            filename = strip_fingerprint(filename)
+        return current_app.send_static_file(filename)
+    accept_encodings = [
+        encoding for encoding in ENCODING_EXTENSIONS if request.accept_encodings[encoding]
+    ]
+    path, encoding = manifest.file_for(filename, accept_encodings)
+    mimetype = mimetypes.guess_type(manifest.original(filename))[0]
+    response = send_from_directory(
+        manifest.folder,
+        path,
+        mimetype=mimetype or "application/octet-stream",
+        cache_timeout=ONE_YEAR,
+    )
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Cache-Control"] = "public, max-age=%d, immutable" % ONE_YEAR
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def init_assets(app):
+    """Fingerprint the application's static assets and serve them with
+    far-future caching. The manifest written by "flask assets build" is
+    used when there is one.
+    """
+    if not app.config["ASSET_FINGERPRINTING"]:
+        return
+    build_folder = app.config["ASSET_BUILD_FOLDER"]
+    if os.path.exists(os.path.join(build_folder, MANIFEST_FILENAME)):
+        app.asset_manifest = AssetManifest.load(build_folder)
+    else:
+        app.asset_manifest = AssetManifest.from_static_folder(
+            app.static_folder, app.config["ASSET_DIRECTORIES"]
+        )
+    app.url_defaults(fingerprint_static_url)
+    app.view_functions["static"] = send_asset
@@ -8,3 +8,4 @@ from app.blueprints.users import users
 from app.blueprints.dashboard import dashboard
 from app.blueprints.events import events
 from app.blueprints.payments import payments
+from app.blueprints.internal import internal
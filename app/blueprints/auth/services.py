@@ -22,6 +22,8 @@ def login_user(form_data, query, store_user_session):
     user = query.filter_by(email=form_data["email"]).first()
     if user is not None and user.verify_password(form_data["password"]):
         store_user_session(user, form_data["remember_me"])
+        if user in query.session.dirty:
+            query.session.commit()
         return user
     else:
         raise InvalidLoginCredentials("Invalid email or password")
@@ -25,6 +25,7 @@ from app.blueprints.main.forms import SearchForm
 from app.models import User, Role
 from app.extensions import db, login_manager
 from app.blueprints.auth import services
+from app.throttling import throttle
 
 
 def redirect_to_next_url(fallback_endpoint):
@@ -57,6 +58,7 @@ def login():
     """View function to handle user logins"""
     form = LoginForm()
     if form.validate_on_submit():
+        throttle("login", form.email.data)
         form_data = {
             "email": form.email.data,
             "password": form.password.data,
@@ -102,6 +104,7 @@ def request_password_reset():
         return redirect(url_for("main.index"))
     form = PasswordResetRequestForm()
     if form.validate_on_submit():
+        throttle("password_reset", form.email.data)
         try:
             services.initiate_password_reset(form.email.data)
         except services.InvalidEmail as err:
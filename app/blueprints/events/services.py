@@ -4,7 +4,15 @@ in event blueprint."""
 from datetime import datetime
 from flask import url_for
 from http import HTTPStatus
-from app.models import Event, Package, ImageType, Image, EventCategory, EventType
+from app.models import (
+    Event,
+    Package,
+    ImageType,
+    Image,
+    EventCategory,
+    EventType,
+    User,
+)
 from app.blueprints.events.forms import CreateEventForm
 
 
@@ -96,3 +104,20 @@ def update_models_from_create_event_form(form, venue, event):
     end_time = CreateEventForm.convert_choice_to_value(form.end_time.data, "TIMES")
     event.start_datetime = datetime.combine(form.start_date.data, start_time)
     event.end_datetime = datetime.combine(form.end_date.data, end_time)
+    event.update_status()
+
+
+def get_event_validators(id):
+    """Return the values the event page's ETag is built from and the
+    time the page last changed, or None if there is no such event.
+    """
+    row = (
+        Event.query.join(User, User.id == Event.user_id)
+        .with_entities(Event.version, Event.updated_at, User.updated_at)
+        .filter(Event.id == id)
+        .first()
+    )
+    if row is None:
+        return None
+    version, event_updated_at, organizer_updated_at = row
+    return (version, organizer_updated_at), max(event_updated_at, organizer_updated_at)
@@ -44,9 +44,11 @@ from app.models import (
     Package,
     Video,
     Permission,
-    Sponsorship
+    Sponsorship,
+    event_cards,
 )
-from app.utils import permission_required
+from app.cache import tag_page
+from app.utils import cached_page, conditional, permission_required, read_only
 
 
 @events.route("/create", methods=["GET", "POST"])
@@ -415,13 +417,16 @@ def publish(id):
     if event.packages.count() == 0:
         flash("You cannot publish an event without adding any packages.", "danger")
         return redirect(url_for("events.packages", id=event.id))
-    event.published = True
+    event.publish()
     db.session.commit()
     flash("Your event has been published.", "success")
     return redirect(url_for("main.index"))
 
 
 @events.route("/<int:id>", methods=["GET", "POST"])
+@conditional(services.get_event_validators)
+@cached_page("event:{id}")
+@read_only
 def event(id):
     """Return the view that displays the event's information"""
     form = ContactForm()
@@ -456,6 +461,7 @@ def event(id):
 
 
 @events.route("/<int:id>/<tab>")
+@cached_page("event:{id}")
 def event_tab(id, tab):
     """Return an html template with the appropriate content
     based on the tab clicked by the user on an event's page.
@@ -471,6 +477,7 @@ def event_tab(id, tab):
         )
     elif tab == "sponsors":
         users = {sponsorship.sponsor for sponsorship in event.sponsorships}
+        tag_page(*["user:%d" % user.id for user in users])
         return render_template("users/_users.html", event=event, users=users)
     else:
         abort(404)
@@ -509,10 +516,7 @@ def save_event(id):
 def saved_events():
     """Return a page where sponsors can view their list of saved events."""
     endpoint = "events.saved_events"
-    events = [
-        (event.main_image(), event)
-        for event in current_user.saved_events
-    ]
+    events = event_cards(Event.users.any(User.id == current_user.id)).all()
     return render_template(
         "events/saved_events.html", events=events, endpoint=endpoint
     )
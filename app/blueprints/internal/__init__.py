@@ -0,0 +1,12 @@
+"""This package contains view functions for the internal blueprint,
+which exposes operational statistics to administrators.
+"""
+
+
+from flask import Blueprint
+
+
+internal = Blueprint("internal", __name__)
+
+
+from app.blueprints.internal import views
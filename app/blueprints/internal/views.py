@@ -0,0 +1,71 @@
+"""This module contains view functions for the internal blueprint."""
+
+
+from flask import Response, abort, current_app, jsonify, send_from_directory
+from flask_login import login_required
+from app.blueprints.internal import internal
+from app.extensions import db
+from app.profiling import is_profile_id
+from app.utils import admin_required
+
+
+@internal.route("/search-metrics")
+@login_required
+@admin_required
+def search_metrics():
+    """Return latency histograms per endpoint and the slowest
+    searches as a json object.
+    """
+    return jsonify(current_app.search_telemetry.to_dict())
+
+
+@internal.route("/db-pool")
+@login_required
+@admin_required
+def db_pool():
+    """Return connection pool statistics for each database as a
+    json object.
+    """
+    return jsonify(db.pool_statistics())
+
+
+@internal.route("/profiles")
+@login_required
+@admin_required
+def profiles():
+    """Return the number of sampled requests and stack samples for
+    each endpoint as a json object.
+    """
+    if current_app.profiles is None:
+        abort(404)
+    return jsonify(current_app.profiles.to_dict())
+
+
+@internal.route("/profiles/<endpoint>")
+@login_required
+@admin_required
+def endpoint_profile(endpoint):
+    """Return the stacks sampled for the endpoint in collapsed form,
+    which can be turned into a flame graph.
+    """
+    if current_app.profiles is None:
+        abort(404)
+    collapsed = current_app.profiles.collapsed(endpoint)
+    if collapsed is None:
+        abort(404)
+    return Response(collapsed, mimetype="text/plain")
+
+
+@internal.route("/profiles/requests/<profile_id>")
+@login_required
+@admin_required
+def request_profile(profile_id):
+    """Send the cProfile stats saved for a profiled request."""
+    if current_app.profiles is None or not is_profile_id(profile_id):
+        abort(404)
+    return send_from_directory(
+        current_app.config["PROFILE_DIR"],
+        profile_id + ".prof",
+        as_attachment=True,
+        mimetype="application/octet-stream",
+    )
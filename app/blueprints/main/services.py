@@ -2,10 +2,85 @@
 the main blueprint.
 """
 
-from app.search import BooleanQuery, QueryType, BooleanClause
+from datetime import datetime
+from app.models import EventCategory
+from app.search import BooleanQuery, QueryType, BooleanClause, AggregationType
+
+
+# price bands used to group events by the prices of their packages
+PRICE_RANGES = [
+    {"to": 500},
+    {"from": 500, "to": 1000},
+    {"from": 1000, "to": 5000},
+    {"from": 5000},
+]
+
+
+def add_event_search_facets(search_query):
+    """Add aggregations to the given search query so that the number
+    of matching events per category, city, month and price band
+    are returned along with the search results.
+    """
+    search_query.add_aggregation(
+        "categories", AggregationType.TERMS, "event_category_id"
+    )
+    search_query.add_aggregation("cities", AggregationType.TERMS, "venue.city.keyword")
+    search_query.add_aggregation(
+        "dates",
+        AggregationType.DATE_HISTOGRAM,
+        "start_datetime",
+        calendar_interval="month",
+        format="yyyy-MM",
+        min_doc_count=1,
+    )
+    search_query.add_aggregation(
+        "prices", AggregationType.RANGE, "package_prices", ranges=PRICE_RANGES
+    )
+    return search_query
+
+
+def create_search_facets(search_response):
+    """Return a dictionary of facet names mapped to lists of
+    (label, count) tuples created from the aggregations in the
+    given search response.
+    """
+    category_names = dict(
+        EventCategory.query.with_entities(EventCategory.id, EventCategory.name)
+    )
+    facets = {
+        "Categories": [
+            (category_names.get(bucket["key"], bucket["key"]), bucket["doc_count"])
+            for bucket in search_response.buckets("categories")
+        ],
+        "Cities": [
+            (bucket["key"], bucket["doc_count"])
+            for bucket in search_response.buckets("cities")
+        ],
+        "Dates": [
+            (
+                datetime.strptime(bucket["key_as_string"], "%Y-%m").strftime("%b %Y"),
+                bucket["doc_count"],
+            )
+            for bucket in search_response.buckets("dates")
+        ],
+        "Prices": [
+            (_format_price_range(bucket), bucket["doc_count"])
+            for bucket in search_response.buckets("prices")
+            if bucket["doc_count"] > 0
+        ],
+    }
+    return {name: buckets for name, buckets in facets.items() if buckets}
+
+
+def _format_price_range(bucket):
+    """Return a label for a bucket from a range aggregation."""
+    if "from" not in bucket:
+        return f"Under ${bucket['to']:.0f}"
+    if "to" not in bucket:
+        return f"${bucket['from']:.0f}+"
+    return f"${bucket['from']:.0f} - ${bucket['to']:.0f}"
 
 
-    
 def create_advanced_event_search_query(form_data):
     bool_query = BooleanQuery()
     bool_query.add(
@@ -46,4 +121,4 @@ def create_advanced_event_search_query(form_data):
             "format": "yyyy-MM-dd"
         }
     )
-    return bool_query
+    return add_event_search_facets(bool_query)
@@ -7,25 +7,28 @@ from flask_login import login_required, current_user
 from app.blueprints.main import main, services
 from app.blueprints.main.forms import AdvancedSearchForm, SearchForm
 from app.extensions import db
-from app.models import Event, Venue
+from app.models import Event, Venue, event_cards, event_cards_by_id
 from app.search import MatchQuery
+from app.utils import cached_page, read_only
 
 
 @main.route("/")
+@cached_page("events")
+@read_only
 def index():
     """Return the home page of the application."""
     form = AdvancedSearchForm()
     page = request.args.get("page", 1, type=int)
-    pagination = Event.query.filter(Event.is_ongoing() == True).paginate(
+    pagination = event_cards(Event.is_ongoing()).paginate(
         page, per_page=current_app.config["EVENTS_PER_PAGE"], error_out=False
     )
-    events = [(event.main_image(), event) for event in pagination.items]
     return render_template(
-        "main/index.html", events=events, form=form, pagination=pagination
+        "main/index.html", events=pagination.items, form=form, pagination=pagination
     )
 
 
 @main.route("/advanced-search")
+@read_only
 def advanced_search():
     """View function to handle queries from the advanced search form
     on the home page."""
@@ -38,7 +41,7 @@ def advanced_search():
         form_data["state"] = AdvancedSearchForm.convert_choice_to_value(form.state.data, "STATES")
         search_query = services.create_advanced_event_search_query(form_data)
         search_response, pagination = current_app.sqlalchemy_search_middleware.search(
-            Event, search_query
+            Event, search_query, load=event_cards_by_id
         )
         fragment = (
             f"state={state_id}"
@@ -47,30 +50,26 @@ def advanced_search():
             + f"&end_date={form_data['end_date']}"
             + f"&category={form_data['category']}&"
         )
-        events = [
-            (event.main_image(), event)
-            for event in pagination.items
-        ]
-        
         return render_template(
             "main/search.html",
-            events=events,
+            events=pagination.items,
             endpoint=search_endpoint,
             pagination=pagination,
             fragment=fragment,
+            facets=services.create_search_facets(search_response),
         )
-    pagination = Event.query.filter(Event.is_ongoing() == True).paginate(
+    pagination = event_cards(Event.is_ongoing()).paginate(
         page, per_page=current_app.config["EVENTS_PER_PAGE"], error_out=False
-    ) 
-    events = [(event.main_image(), event) for event in pagination.items]
+    )
     return render_template(
-        "main/index.html", events=events, form=form, pagination=pagination
+        "main/index.html", events=pagination.items, form=form, pagination=pagination
     )
     
     
 
 
 @main.route("/search")
+@read_only
 def search_events_by_title():
     """Return search results for searching for events
     by title.
@@ -78,20 +77,17 @@ def search_events_by_title():
     search_endpoint = "main.search_events_by_title"
     page = request.args.get("page", 1, type=int)
     match_query = MatchQuery("title", g.search_form.query.data, from_=page-1)
+    services.add_event_search_facets(match_query)
     fragment = f"query={g.search_form.query.data}&"
     search_response, pagination = current_app.sqlalchemy_search_middleware.search(
-        Event, match_query
+        Event, match_query, load=event_cards_by_id
     )
-    events = [
-        (event.main_image(), event)
-        for event in pagination.items
-    ]
-    
     return render_template(
         "main/search.html",
-        events=events,
+        events=pagination.items,
         endpoint=search_endpoint,
         pagination=pagination,
-        fragment=fragment
+        fragment=fragment,
+        facets=services.create_search_facets(search_response),
     )
 
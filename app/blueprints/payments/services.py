@@ -4,6 +4,7 @@ the payment blueprint.
 import uuid
 from datetime import datetime
 from http import HTTPStatus
+from flask import current_app
 from app.models import Event, Sponsorship, Package
 
 
@@ -11,6 +12,16 @@ class OutOfStock(Exception):
     pass
 
 
+def get_stripe():
+    """Return the stripe module configured with the application's secret
+    key. It is imported on first use since only checkouts need it.
+    """
+    import stripe
+
+    stripe.api_key = current_app.config["STRIPE_SECRET_KEY"]
+    return stripe
+
+
 def validate_checkout_success(data, current_user, user_session):
     if not data:
         return {"message": "Request missing JSON body", "code": HTTPStatus.BAD_REQUEST}
@@ -17,6 +17,7 @@ from sqlalchemy import exc
 from app.blueprints.payments import payments, services
 from flask_login import login_required, current_user
 from app.utils import permission_required
+from app.metrics import observe_payment
 from app.models import Permission, Event
 
 
@@ -46,9 +47,10 @@ def create_payment_intent():
     if "orderTotal" not in json_data:
         return jsonify({"error": "Missing 'order_total' field"}), HTTPStatus.BAD_REQUEST
     try:
-        intent = current_app.stripe.PaymentIntent.create(
-            amount=json_data["orderTotal"], currency="usd"
-        )
+        with observe_payment("create_payment_intent"):
+            intent = services.get_stripe().PaymentIntent.create(
+                amount=json_data["orderTotal"], currency="usd"
+            )
         return jsonify({"clientSecret": intent["client_secret"]}), HTTPStatus.CREATED
     except Exception as err:
         return jsonify({"error": str(err)}), HTTPStatus.BAD_REQUEST
@@ -16,6 +16,7 @@ from app.blueprints.settings.forms import (
 from app.blueprints.users.forms import EditProfileForm
 from app.utils import permission_required
 from app.blueprints.settings import services
+from app.throttling import throttle
 
 
 @settings.route("/change-password", methods=["GET", "POST"])
@@ -55,8 +56,11 @@ def change_email():
     heading = title
     form = ChangeEmailForm()
     if form.validate_on_submit():
+        throttle("change_email", current_user.id)
         if current_user.verify_password(form.password.data):
             services.change_email_request(current_user, form.email.data)
+            # saves the password if verify_password hashed it again
+            db.session.commit()
             flash(
                 "An email with instructions on how to change your email has been sent to you.",
                 "info",
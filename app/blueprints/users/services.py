@@ -2,7 +2,16 @@
 operations in the user blueprint.
 """
 
-from app.models import EventStatus, SponsorshipStatus, Event, Sponsorship, User, Permission
+from sqlalchemy import func
+from app.models import (
+    EventStatus,
+    SponsorshipStatus,
+    Event,
+    Sponsorship,
+    User,
+    Permission,
+    event_cards,
+)
 
 
 class InvalidUserType(Exception):
@@ -40,10 +49,7 @@ def get_event_organizer_profile_data(user, page, results_per_page, past):
         "user": user, 
         "pagination": pagination, 
         "tab": tab,
-        "events": [
-            (event.main_image(), event)
-            for event in pagination.items
-        ]
+        "events": pagination.items,
     }
     return profile_data
 
@@ -63,10 +69,7 @@ def get_sponsor_profile_data(user, page, results_per_page, past):
         "user": user, 
         "pagination": pagination, 
         "tab": tab,
-        "events": [
-            (event.main_image(), event)
-            for event in pagination.items
-        ]
+        "events": pagination.items,
     }
     return profile_data
 
@@ -76,34 +79,69 @@ def get_user_events_by_status(status, user, page, results_per_page):
     status.
     """
     if status == EventStatus.PAST:
-        query = Event.query.filter(Event.user_id == user.id, Event.has_ended() == True)
+        query = event_cards(Event.user_id == user.id, Event.has_ended())
     elif status == EventStatus.LIVE:
-        query = Event.query.filter(Event.user_id == user.id, Event.is_ongoing() == True)
+        query = event_cards(Event.user_id == user.id, Event.is_ongoing())
 
     pagination = query.paginate(page=page, per_page=results_per_page, error_out=False)
     return pagination
 
 
+def sponsored_event_cards(user, *criterion):
+    """Return a query for the cards of the events the user sponsors
+    that match the given criteria. Each event is returned once however
+    many of its packages the user bought.
+    """
+    # a semi-join rather than a join, which would return a card per package
+    sponsored_event_ids = Sponsorship.query.with_entities(Sponsorship.event_id).filter(
+        Sponsorship.sponsor_id == user.id
+    )
+    return event_cards(Event.id.in_(sponsored_event_ids.subquery()), *criterion)
+
+
 def get_user_sponsored_events_by_status(status, user, page, results_per_page):
     """Return a pagination object containing sponsorships based on
     the given status.
     """
     if status == SponsorshipStatus.PAST:
-        query = (
-            Event.query.join(Sponsorship, Sponsorship.event_id == Event.id)
-            .filter(Event.is_past() == True)
-            .filter(Sponsorship.sponsor_id == user.id)
-        )
+        query = sponsored_event_cards(user, Event.has_ended())
     elif status == SponsorshipStatus.CURRENT:
-        query = (
-            Event.query.join(Sponsorship, Sponsorship.event_id == Event.id)
-            .filter(Event.is_ongoing() == True)
-            .filter(Sponsorship.sponsor_id == user.id)
-        )
+        query = sponsored_event_cards(user, Event.is_ongoing())
     pagination = query.paginate(page=page, per_page=results_per_page, error_out=False)
     return pagination
 
 
+def get_user_profile_validators(company):
+    """Return the values the profile page's ETag is built from and the
+    time the page last changed, or None if there is no such user.
+    """
+    user = (
+        User.query.with_entities(User.id, User.updated_at)
+        .filter_by(company=company)
+        .first()
+    )
+    if user is None:
+        return None
+    aggregates = (
+        func.count(Event.id),
+        func.coalesce(func.sum(Event.version), 0),
+        func.max(Event.updated_at),
+    )
+    hosted = Event.query.with_entities(*aggregates).filter(Event.user_id == user.id)
+    sponsored = (
+        Event.query.join(Sponsorship)
+        .with_entities(*aggregates)
+        .filter(Sponsorship.sponsor_id == user.id)
+    )
+    hosted, sponsored = tuple(hosted.one()), tuple(sponsored.one())
+    last_modified = max(
+        updated_at
+        for updated_at in (user.updated_at, hosted[2], sponsored[2])
+        if updated_at is not None
+    )
+    return (user.updated_at, hosted, sponsored), last_modified
+
+
 def upload_user_profile_photo(user, image, file_uploader, os):
     """Upload the given photo to the filesystem."""
     filename = file_uploader.save(image)
@@ -22,15 +22,20 @@ from app.models import (
     Permission,
     Sponsorship,
     EventStatus,
-    SponsorshipStatus
+    SponsorshipStatus,
+    event_cards,
 )
 from app.blueprints.events.forms import UploadImageForm, RemoveImageForm
 from app.blueprints.users.forms import EditProfileForm, EditProfileAdminForm
-from app.utils import admin_required
+from app.cache import tag_page
+from app.utils import admin_required, cached_page, conditional, read_only
 
 
 
 @users.route("/<company>")
+@conditional(services.get_user_profile_validators)
+@cached_page("events")
+@read_only
 def user_profile(company):
     """Return a page that allows someone to view a user's profile."""
     page = request.args.get("page", 1, type=int)
@@ -41,6 +46,7 @@ def user_profile(company):
         current_app.config["EVENTS_PER_PAGE"], 
         past
     )
+    tag_page("user:%d" % profile_data["user"].id)
     return render_template(
         "users/user_profile.html",
         tab=profile_data["tab"],
@@ -52,29 +58,28 @@ def user_profile(company):
 
 
 @users.route("/<int:id>/events/<status>")
+@read_only
 def user_events_by_status(id, status):
     """Return a list of events organized by a given user."""
     if status not in (EventStatus.LIVE, EventStatus.PAST):
         abort(404)
     user = User.query.get_or_404(id)
-    events = [
-        (event.main_image(), event)
-        for event in user.get_events_by_status(status)
-    ]
+    events = event_cards(Event.user_id == user.id, Event.status == status).all()
     return render_template("events/_events.html", events=events)
 
 
 @users.route("/<int:id>/sponsorships/<status>")
+@read_only
 def user_sponsored_events_by_status(id, status):
     """Return a list of events sponsored by a given user."""
     if status not in (SponsorshipStatus.PAST, SponsorshipStatus.CURRENT):
         abort(404)
     user = User.query.get_or_404(id)
-    sponsorships = user.get_sponsorships_by_status(status)
-    events = [
-        (sponsorship.event.main_image(), sponsorship.event) 
-        for sponsorship in sponsorships
-    ]
+    if status == SponsorshipStatus.CURRENT:
+        status_filter = Event.is_ongoing()
+    else:
+        status_filter = Event.has_ended()
+    events = services.sponsored_event_cards(user, status_filter).all()
     return render_template("events/_events.html", events=events)
 
 
@@ -0,0 +1,380 @@
+"""This module contains the application's caches: an in-process LRU
+cache with a Jinja extension that caches rendered template fragments
+in it, a page cache shared by the workers on a host that stores
+whole responses for anonymous visitors, and the validators that let
+browsers revalidate the pages they already have.
+
+Fragments are cached with {% cache key, version %} ... {% endcache %}.
+Every expression after the tag becomes part of the key, so a fragment
+is rendered again as soon as one of them, usually a version number
+that is bumped on every change, is different.
+
+Cached pages are tagged with the rows they show, e.g. "event:3", and
+are dropped when a commit changes a row with one of their tags. Models
+list the tags their rows affect in a cache_tags property.
+"""
+
+
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask import (
+    current_app,
+    g,
+    has_app_context,
+    request,
+    session as flask_session,
+)
+from flask_login import current_user
+from jinja2 import nodes
+from jinja2.ext import Extension
+from sqlalchemy import event
+from app.database import RoutingSession
+
+
+PAGE_CACHE_TAGS_KEY = "page_cache_tags"
+
+
+class LRUCache:
+    """Thread-safe cache that evicts the least recently used entry
+    once it holds max_size entries.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value stored under key, or None if there isn't one."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store the value under key, evicting the oldest entry if full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """Remove the value stored under key, if there is one."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def to_dict(self):
+        """Return statistics about the cache as a dictionary."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def fragment_key(parts):
+    """Return the cache key for a fragment from the values after the tag."""
+    return "fragment:" + ":".join(str(part) for part in parts)
+
+
+class FragmentCacheExtension(Extension):
+    """Jinja extension that adds the {% cache %} tag. The rendered
+    fragments are stored in the environment's fragment_cache, which
+    can be any object with get and set methods. Fragments are always
+    rendered when it is None.
+    """
+
+    tags = {"cache"}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(["name:endcache"], drop_needle=True)
+        call = self.call_method("_render_fragment", [nodes.List(parts)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _render_fragment(self, parts, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        key = fragment_key(parts)
+        fragment = cache.get(key)
+        if fragment is None:
+            fragment = caller()
+            cache.set(key, fragment)
+        return fragment
+
+
+def init_fragment_cache(app):
+    """Add the {% cache %} tag to the application's templates and give
+    it a cache of FRAGMENT_CACHE_SIZE entries. A size of 0 turns
+    fragment caching off.
+    """
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    size = app.config["FRAGMENT_CACHE_SIZE"]
+    app.fragment_cache = LRUCache(size) if size > 0 else None
+    app.jinja_env.fragment_cache = app.fragment_cache
+
+
+class SQLiteCache:
+    """Cache stored in a SQLite file so that every worker process on
+    the host shares it. Entries expire after a timeout and can also be
+    deleted by any of the tags they were stored with.
+    """
+
+    def __init__(self, path, default_timeout=300):
+        self.path = path
+        self.default_timeout = default_timeout
+        # WAL lets workers read while another one writes
+        connection = sqlite3.connect(self.path, timeout=5)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.close()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_entries_expires ON entries (expires)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entry_tags "
+                "(tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key))"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_entry_tags_key ON entry_tags (key)"
+            )
+
+    def _connect(self, write=True):
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        return _Transaction(connection, write)
+
+    def get(self, key):
+        """Return the value stored under key, or None if there isn't
+        one or it has expired.
+        """
+        with self._connect(write=False) as connection:
+            row = connection.execute(
+                "SELECT value FROM entries WHERE key = ? AND expires > ?",
+                (key, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0])
+
+    def set(self, key, value, tags=(), timeout=None):
+        """Store the value under key with the given tags."""
+        if timeout is None:
+            timeout = self.default_timeout
+        now = time.time()
+        with self._connect() as connection:
+            self._delete_keys(
+                connection,
+                "SELECT key FROM entries WHERE expires <= ? OR key = ?",
+                (now, key),
+            )
+            connection.execute(
+                "INSERT INTO entries (key, value, expires) VALUES (?, ?, ?)",
+                (key, pickle.dumps(value), now + timeout),
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO entry_tags (tag, key) VALUES (?, ?)",
+                [(tag, key) for tag in set(tags)],
+            )
+
+    def delete(self, key):
+        """Delete the value stored under key, if there is one."""
+        with self._connect() as connection:
+            self._delete_keys(connection, "SELECT key FROM entries WHERE key = ?", (key,))
+
+    def invalidate(self, tags):
+        """Delete every entry stored with any of the given tags."""
+        tags = list(set(tags))
+        if not tags:
+            return
+        placeholders = ", ".join("?" for _ in tags)
+        with self._connect() as connection:
+            self._delete_keys(
+                connection,
+                "SELECT key FROM entry_tags WHERE tag IN (%s)" % placeholders,
+                tags,
+            )
+
+    def clear(self):
+        """Delete every entry."""
+        with self._connect() as connection:
+            connection.execute("DELETE FROM entries")
+            connection.execute("DELETE FROM entry_tags")
+
+    @staticmethod
+    def _delete_keys(connection, select, parameters):
+        keys = [(key,) for key, in connection.execute(select, parameters)]
+        connection.executemany("DELETE FROM entries WHERE key = ?", keys)
+        connection.executemany("DELETE FROM entry_tags WHERE key = ?", keys)
+
+
+class _Transaction:
+    """Context manager that runs the statements of a with block in a
+    transaction and closes the connection afterwards. Transactions that
+    write take the write lock up front so they don't fail on upgrade.
+    """
+
+    def __init__(self, connection, write):
+        self.connection = connection
+        self.write = write
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE" if self.write else "BEGIN")
+        return self.connection
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.connection.close()
+
+
+def init_page_cache(app):
+    """Give the application a page cache stored at PAGE_CACHE_PATH.
+    Pages aren't cached when it isn't set.
+    """
+    path = app.config["PAGE_CACHE_PATH"]
+    if path:
+        app.page_cache = SQLiteCache(path, app.config["PAGE_CACHE_TIMEOUT"])
+    else:
+        app.page_cache = None
+
+
+def page_cache_key():
+    """Return the key the response to the current request is cached under."""
+    return "page:%s:%s" % (
+        request.full_path,
+        request.headers.get("Accept-Encoding", ""),
+    )
+
+
+def can_serve_cached_page():
+    """Return True if the current request can be answered with a
+    cached page. Only anonymous GET and HEAD requests with no flashed
+    messages waiting to be shown can.
+    """
+    return (
+        current_app.page_cache is not None
+        and request.method in ("GET", "HEAD")
+        and not current_user.is_authenticated
+        and not flask_session.get("_flashes")
+    )
+
+
+def can_cache_page(response):
+    """Return True if the response can be shown to every anonymous
+    visitor. Responses that carry a CSRF token, or that change the
+    visitor's session or set cookies, can't be.
+    """
+    csrf_field_name = current_app.config.get("WTF_CSRF_FIELD_NAME", "csrf_token")
+    return (
+        response.status_code == 200
+        and not response.direct_passthrough
+        and "Set-Cookie" not in response.headers
+        and not flask_session.modified
+        and csrf_field_name not in g
+    )
+
+
+def tag_page(*tags):
+    """Add tags to the page being rendered by a cached_page view."""
+    if "page_cache_tags" in g:
+        g.page_cache_tags.update(tags)
+
+
+def can_validate_request():
+    """Return True if the current request may be answered with
+    304 Not Modified.
+    """
+    return request.method in ("GET", "HEAD") and not flask_session.get("_flashes")
+
+
+def make_etag(*parts):
+    """Return an ETag for the current request's page built from the given
+    values, which have to change whenever the page does. The page also
+    depends on the URL and on who is viewing it.
+    """
+    if current_user.is_authenticated:
+        viewer = "user:%d:%d" % (current_user.id, current_user.role_id)
+    else:
+        viewer = "anonymous"
+    csrf_field_name = current_app.config.get("WTF_CSRF_FIELD_NAME", "csrf_token")
+    validator = repr(
+        (request.full_path, viewer, flask_session.get(csrf_field_name)) + parts
+    )
+    return hashlib.sha1(validator.encode()).hexdigest()
+
+
+def is_not_modified(etag, last_modified):
+    """Return True if the copy of the page the client has is current.
+    If-Modified-Since is only trusted for anonymous visitors, since the
+    time a page changed doesn't tell apart pages rendered for others.
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if_modified_since = request.if_modified_since
+    if if_modified_since is None or last_modified is None:
+        return False
+    if current_user.is_authenticated:
+        return False
+    return last_modified.replace(microsecond=0) <= if_modified_since
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def collect_page_cache_tags(session, flush_context):
+    """Remember the tags of the rows changed by the flush so that the
+    pages showing them can be dropped once the changes are committed.
+    """
+    tags = session.info.setdefault(PAGE_CACHE_TAGS_KEY, set())
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+            if session.is_modified(obj) or obj not in session.dirty:
+                tags.update(getattr(obj, "cache_tags", ()))
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def invalidate_cached_pages(session):
+    """Drop the cached pages that show rows changed by the commit."""
+    tags = session.info.pop(PAGE_CACHE_TAGS_KEY, None)
+    if tags and has_app_context():
+        page_cache = getattr(current_app, "page_cache", None)
+        if page_cache is not None:
+            page_cache.invalidate(tags)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def forget_page_cache_tags(session):
+    """Forget the tags of changes that were rolled back."""
+    session.info.pop(PAGE_CACHE_TAGS_KEY, None)
@@ -0,0 +1,328 @@
+"""This module contains a Flask-SQLAlchemy extension that routes reads
+from read-only views to replica databases, keeps statistics about
+each engine's connection pool and counts the statements run by each
+request.
+"""
+
+
+import random
+import threading
+import time
+from contextlib import contextmanager
+from flask import (
+    current_app,
+    g,
+    has_request_context,
+    request,
+    session as flask_session,
+)
+from flask_sqlalchemy import SQLAlchemy, SignallingSession, get_state
+from sqlalchemy import event, exc, orm
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from app.metrics import observe_statement
+from app.search.telemetry import Histogram
+
+
+LAST_WRITE_SESSION_KEY = "_database_last_write"
+
+
+class RoutingSession(SignallingSession):
+    """Session that sends SELECT statements issued by a read-only view
+    to one of the configured replicas and everything else to the
+    primary database.
+    """
+
+    def get_bind(self, mapper=None, clause=None):
+        """Return the engine the given statement should be run with."""
+        bind_key = self._replica_bind_key(clause)
+        if bind_key is not None:
+            return get_state(self.app).db.get_engine(self.app, bind=bind_key)
+        return super().get_bind(mapper, clause)
+
+    def _replica_bind_key(self, clause):
+        """Return the bind key of the replica to read from, or None
+        if the statement has to go to the primary.
+        """
+        replicas = self.app.config["SQLALCHEMY_REPLICA_BINDS"]
+        if not replicas or not has_request_context() or not g.get("read_only"):
+            return None
+        if self._flushing or isinstance(clause, UpdateBase):
+            return None
+        if g.get("database_written") or recently_written(self.app):
+            return None
+        if "replica_bind_key" not in g:
+            # use the same replica for the whole request
+            g.replica_bind_key = random.choice(replicas)
+        return g.replica_bind_key
+
+
+def recently_written(app):
+    """Return True if the current user committed a write recently
+    enough that a replica may not have caught up yet.
+    """
+    last_write = flask_session.get(LAST_WRITE_SESSION_KEY)
+    if last_write is None:
+        return False
+    return time.time() - last_write < app.config["REPLICA_STICKY_SECONDS"]
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def mark_written(session, flush_context):
+    """Keep the rest of the request on the primary after a write."""
+    if has_request_context():
+        g.database_written = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def remember_write(session):
+    """Keep the user's reads on the primary for a short while after
+    they commit a write. Nothing is stored in the user's session when
+    there are no replicas, so the response doesn't set a cookie.
+    """
+    if (
+        has_request_context()
+        and g.get("database_written")
+        and session.app.config["SQLALCHEMY_REPLICA_BINDS"]
+    ):
+        flask_session[LAST_WRITE_SESSION_KEY] = time.time()
+
+
+class PoolStatistics:
+    """Class to keep track of how a connection pool is being used."""
+
+    def __init__(self):
+        self.connections = 0
+        self.invalidations = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.checkout_wait = Histogram()
+        self._lock = threading.Lock()
+
+    def listen(self, engine):
+        """Register pool event listeners on the given engine."""
+
+        def connect(dbapi_connection, connection_record):
+            with self._lock:
+                self.connections += 1
+
+        def checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._lock:
+                self.checkouts += 1
+                self.in_use += 1
+                self.peak_in_use = max(self.peak_in_use, self.in_use)
+                pool = engine.pool
+                if isinstance(pool, QueuePool) and self.in_use > pool.size():
+                    self.overflow_checkouts += 1
+
+        def checkin(dbapi_connection, connection_record):
+            with self._lock:
+                self.checkins += 1
+                self.in_use -= 1
+
+        def invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidations += 1
+
+        event.listen(engine, "connect", connect)
+        event.listen(engine, "checkout", checkout)
+        event.listen(engine, "checkin", checkin)
+        event.listen(engine, "invalidate", invalidate)
+
+    def record_wait(self, wait_time, timed_out=False):
+        """Record how long a checkout waited for a connection in seconds."""
+        with self._lock:
+            self.checkout_wait.observe(wait_time * 1000)
+            if timed_out:
+                self.timeouts += 1
+
+    def to_dict(self):
+        """Return the statistics as a dictionary."""
+        with self._lock:
+            return {
+                "connections": self.connections,
+                "invalidations": self.invalidations,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "checkout_wait": self.checkout_wait.to_dict(),
+            }
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a
+    connection to become available.
+    """
+
+    def __init__(self, creator, statistics=None, **kwargs):
+        super().__init__(creator, **kwargs)
+        self.statistics = statistics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self._record_wait(start, timed_out=True)
+            raise
+        self._record_wait(start)
+        return connection
+
+    def _record_wait(self, start, timed_out=False):
+        if self.statistics is not None:
+            self.statistics.record_wait(time.perf_counter() - start, timed_out)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.statistics = self.statistics
+        return pool
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a request runs more statements than its budget allows."""
+
+    pass
+
+
+class QueryCounter:
+    """Class to hold the statements run inside a count_queries block."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+
+@contextmanager
+def count_queries():
+    """Count the statements run by every engine inside the with block."""
+    counter = QueryCounter()
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        counter.statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(Engine, "before_cursor_execute", before_cursor_execute)
+
+
+def listen_for_queries(engine):
+    """Register listeners on the given engine that add the number of
+    statements it runs, and the time they take, to the current request.
+    """
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        observe_statement(statement, elapsed)
+        if has_request_context():
+            g.query_count = g.get("query_count", 0) + 1
+            g.query_time = g.get("query_time", 0) + elapsed
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def add_server_timing(response):
+    """Add the number of statements run by the request and the time spent
+    on them to the response, and check them against the endpoint's budget.
+    """
+    query_count = g.get("query_count", 0)
+    query_time = g.get("query_time", 0) * 1000
+    response.headers.add(
+        "Server-Timing", 'db;dur=%.2f;desc="%d queries"' % (query_time, query_count)
+    )
+    budget = current_app.config["QUERY_BUDGETS"].get(
+        request.endpoint, current_app.config["DEFAULT_QUERY_BUDGET"]
+    )
+    if budget is not None and query_count > budget:
+        message = "%s ran %d queries, over its budget of %d" % (
+            request.endpoint,
+            query_count,
+            budget,
+        )
+        if current_app.config["QUERY_BUDGET_RAISE"]:
+            raise QueryBudgetExceeded(message)
+        current_app.logger.warning(message)
+    return response
+
+
+def clear_request_state(exception=None):
+    """Forget the routing decisions and query counts of the request,
+    since g outlives the request when an app context was already pushed.
+    """
+    for name in [
+        "read_only",
+        "database_written",
+        "replica_bind_key",
+        "query_count",
+        "query_time",
+    ]:
+        g.pop(name, None)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    """Flask-SQLAlchemy extension that uses the routing session."""
+
+    def init_app(self, app):
+        """Register the extension with the application."""
+        super().init_app(app)
+        app.after_request(add_server_timing)
+        app.teardown_request(clear_request_state)
+
+    def create_engine(self, sa_url, engine_opts):
+        """Return an engine that counts the statements it runs and has
+        pool statistics attached to it. When the engine uses a QueuePool,
+        the pool also times checkouts.
+        """
+        statistics = PoolStatistics()
+        if engine_opts.get("poolclass", QueuePool) in (QueuePool, TimedQueuePool):
+            engine_opts = dict(
+                engine_opts, poolclass=TimedQueuePool, statistics=statistics
+            )
+        engine = super().create_engine(sa_url, engine_opts)
+        statistics.listen(engine)
+        listen_for_queries(engine)
+        engine.pool_statistics = statistics
+        return engine
+
+    def pool_statistics(self, app=None):
+        """Return the pool statistics of the primary database and each
+        bind, keyed by bind name.
+        """
+        app = self.get_app(app)
+        binds = [None] + list(app.config.get("SQLALCHEMY_BINDS") or ())
+        statistics = {}
+        for bind in binds:
+            engine = self.get_engine(app, bind)
+            statistics[bind or "primary"] = dict(
+                engine.pool_statistics.to_dict(), status=engine.pool.status()
+            )
+        return statistics
+
+    def dispose_engines(self, app=None):
+        """Close the connections of every engine the application has
+        created, so that a forked worker opens its own instead of sharing
+        the sockets of its parent.
+        """
+        app = self.get_app(app)
+        for connector in get_state(app).connectors.values():
+            connector.get_engine().dispose()
+
+    def create_session(self, options):
+        """Return a session factory that creates routing sessions."""
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
@@ -5,6 +5,29 @@ occur in the application.
 
 from flask import render_template
 from http import HTTPStatus
+from werkzeug.exceptions import (
+    NotFound,
+    InternalServerError,
+    BadRequest,
+    Forbidden,
+    ServiceUnavailable,
+    TooManyRequests,
+)
+
+
+class RetryAfterMixin:
+    """Mixin for HTTP exceptions that tell the client how many seconds
+    to wait before retrying in a Retry-After header, when retry_after
+    is set.
+    """
+
+    retry_after = None
+
+    def get_headers(self, environ=None):
+        headers = super().get_headers(environ)
+        if self.retry_after:
+            headers.append(("Retry-After", str(self.retry_after)))
+        return headers
 
 
 def page_not_found(error):
@@ -59,3 +82,46 @@ def bad_request(error):
         + "Please double check your information and try again."
     )
     return render_template("errors/error.html", title=title, message=message), HTTPStatus.BAD_REQUEST
+
+
+def render_retry_error_page(title, error, status):
+    """Render an error page with the description of the error and
+    return it with the status code and, if the error says how long
+    to wait before retrying, a Retry-After header.
+    """
+    headers = {}
+    if getattr(error, "retry_after", None):
+        headers["Retry-After"] = str(error.retry_after)
+    return (
+        render_template("errors/error.html", title=title, message=error.description),
+        status,
+        headers,
+    )
+
+
+def service_unavailable(error):
+    """Render a 503 error page to the user and return the error
+    status code, with the seconds to wait before retrying if known.
+    """
+    return render_retry_error_page(
+        "Service Unavailable", error, HTTPStatus.SERVICE_UNAVAILABLE
+    )
+
+
+def too_many_requests(error):
+    """Render a 429 error page to the user and return the error
+    status code, with the seconds to wait before retrying if known.
+    """
+    return render_retry_error_page(
+        "Too Many Requests", error, HTTPStatus.TOO_MANY_REQUESTS
+    )
+
+
+def register_error_handlers(app):
+    """Register the error handlers with the application."""
+    app.register_error_handler(NotFound, page_not_found)
+    app.register_error_handler(InternalServerError, internal_server_error)
+    app.register_error_handler(BadRequest, bad_request)
+    app.register_error_handler(Forbidden, forbidden)
+    app.register_error_handler(ServiceUnavailable, service_unavailable)
+    app.register_error_handler(TooManyRequests, too_many_requests)
@@ -1,13 +1,24 @@
 """This module is used for development purposes only.
 It is to be used to generate fake user data for the
 application.
+
+Rows are generated in partitions of consecutive ids, each from a random
+generator seeded with the seed of the generator and the first id of the
+partition, so the same seed produces the same rows however many worker
+processes generate them. Calling Faker for every row would take most of
+the time, so names and texts are drawn from pools of Faker values that
+are created once. The rows are inserted in bulk, with COPY on
+PostgreSQL, and the events are indexed in Elasticsearch at the end.
 """
+import io
+import itertools
+import multiprocessing
 import os
 import random
 import uuid
-import itertools
-from datetime import datetime, timedelta
-from sqlalchemy.exc import IntegrityError
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask import current_app
 from faker import Faker
 from app.forms import PEOPLE_RANGES, TIMES, TIME_FORMAT
 from app.search import ElasticsearchClient, FlaskSQLAlchemyMiddleware
@@ -17,6 +28,7 @@ from app.models import (
     Role,
     Event,
     EventCategory,
+    EventStatus,
     EventType,
     Venue,
     Package,
@@ -24,7 +36,7 @@ from app.models import (
     Image,
     Sponsorship,
 )
-DEFAULT_EVENT_IMAGE_DIR = "/app/static/images/default_event_images"
+DEFAULT_EVENT_IMAGE_DIR = os.path.dirname(__file__) + "/static/images/default_event_images"
 LOCATIONS = [
     ("New York", "New York"),
     ("Philadelphia", "Pennsylvania"),
@@ -45,8 +57,202 @@ CATEGORIES = [
 
 CATEGORIES_AND_LOCATIONS = list(itertools.product(CATEGORIES, LOCATIONS))
 
-es_client = ElasticsearchClient(os.environ["ELASTICSEARCH_URL"])
-search_middleware = FlaskSQLAlchemyMiddleware(es_client, db)
+PASSWORD = "password"
+PARTITION_SIZE = 5000
+CHUNK_SIZE = 5000
+POOL_SIZE = 500
+
+# the pools of Faker values used by the process generating rows
+_pools = None
+
+
+def create_pools(seed, size=POOL_SIZE):
+    """Return lists of Faker values to draw names and texts from."""
+    faker = Faker()
+    faker.seed_instance(seed)
+    return {
+        "first_name": [faker.first_name() for _ in range(size)],
+        "last_name": [faker.last_name() for _ in range(size)],
+        "company": [faker.company() for _ in range(size)],
+        "job": [faker.job() for _ in range(size)],
+        "domain": [faker.free_email_domain() for _ in range(size)],
+        "street_name": [faker.street_name() for _ in range(size)],
+        "zipcode": [faker.zipcode() for _ in range(size)],
+        "color_name": [faker.color_name() for _ in range(size)],
+        "text": [faker.text() for _ in range(size)],
+    }
+
+
+def set_pools(pools):
+    """Set the pools of the process, e.g. in a new worker process."""
+    global _pools
+    _pools = pools
+
+
+def partition_rng(seed, name, start):
+    """Return the random generator of the partition starting at the
+    given id of the given table.
+    """
+    return random.Random(f"{seed}-{name}-{start}")
+
+
+def random_uuid(rng):
+    """Return a random UUID drawn from the given generator."""
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate_users(task):
+    """Return the rows of a partition of users. The first user is an
+    event organizer and the second a sponsor, so there's always at
+    least one of each.
+    """
+    seed, start, stop, context = task
+    rng = partition_rng(seed, "users", start)
+    pick = lambda name: rng.choice(_pools[name])
+    rows = []
+    for user_id in range(start, stop):
+        first_name = pick("first_name")
+        last_name = pick("last_name")
+        if user_id - context["first_id"] < 2:
+            role_id = context["role_ids"][user_id - context["first_id"]]
+        else:
+            role_id = rng.choice(context["role_ids"])
+        # the id keeps the columns with a unique constraint unique
+        rows.append(
+            {
+                "id": user_id,
+                "first_name": first_name,
+                "last_name": last_name,
+                "company": "%s %d" % (pick("company"), user_id),
+                "email": (
+                    "%s.%s%d@%s" % (first_name, last_name, user_id, pick("domain"))
+                ).lower(),
+                "password_hash": context["password_hash"],
+                "member_since": context["now"],
+                "updated_at": context["now"],
+                "job_title": pick("job"),
+                "website": "https://www.%s%d.com/" % (last_name.lower(), user_id),
+                "about": pick("text"),
+                "role_id": role_id,
+            }
+        )
+    return {User.__table__.name: rows}
+
+
+def generate_events(task):
+    """Return the rows of a partition of events, along with their
+    venues, packages and sponsorships, and the default image each
+    event was given.
+    """
+    seed, start, stop, context = task
+    rng = partition_rng(seed, "events", start)
+    pick = lambda name: rng.choice(_pools[name])
+    packages_per_event = context["packages_per_event"]
+    venues, events, packages, sponsorships, images = [], [], [], [], []
+    for event_id in range(start, stop):
+        index = event_id - context["first_id"]
+        venue_id = context["first_venue_id"] + index
+        category, (city, state) = rng.choice(CATEGORIES_AND_LOCATIONS)
+        venues.append(
+            {
+                "id": venue_id,
+                "name": pick("company"),
+                "address": "%d %s" % (venue_id, pick("street_name")),
+                "city": city,
+                "state": state,
+                "zip_code": pick("zipcode"),
+            }
+        )
+        start_date = context["today"] + timedelta(days=rng.randint(1, 120))
+        start_time = datetime.strptime(rng.choice(TIMES[:40])[1], TIME_FORMAT)
+        start_datetime = datetime.combine(start_date, start_time.time())
+        events.append(
+            {
+                "id": event_id,
+                "title": pick("company") + rng.choice([" Party", " Gala"]),
+                "start_datetime": start_datetime,
+                "end_datetime": start_datetime + timedelta(days=1),
+                "attendees": rng.choice(PEOPLE_RANGES[1:])[1],
+                "male_to_female": "50-50",
+                "description": pick("text"),
+                "pitch": pick("text"),
+                "published": True,
+                "status": EventStatus.LIVE,
+                "version": 1,
+                "updated_at": context["now"],
+                "user_id": rng.choice(context["organizer_ids"]),
+                "venue_id": venue_id,
+                "event_type_id": rng.choice(context["event_type_ids"]),
+                "event_category_id": context["category_ids"][category],
+            }
+        )
+        images.append((event_id, rng.choice(context["image_filenames"])))
+        first_package_id = context["first_package_id"] + index * packages_per_event
+        event_packages = [
+            {
+                "id": package_id,
+                "name": pick("color_name") + " Package",
+                "price": Decimal(rng.randrange(100, 1000000)) / 100,
+                "audience": rng.choice(PEOPLE_RANGES[1:])[1],
+                "description": pick("text"),
+                "num_purchased": 0,
+                "available_packages": rng.randint(1, 20),
+                "package_type": rng.choice(["Cash", "In-Kind"]),
+                "event_id": event_id,
+            }
+            for package_id in range(first_package_id, first_package_id + packages_per_event)
+        ]
+        num_sponsors = min(context["sponsors_per_event"], len(context["sponsor_ids"]))
+        # sponsors are distinct so that nobody buys the same package twice
+        for sponsor_id in rng.sample(context["sponsor_ids"], num_sponsors):
+            package = rng.choice(event_packages)
+            package["num_purchased"] += 1
+            package["available_packages"] = max(
+                package["available_packages"], package["num_purchased"]
+            )
+            sponsorships.append(
+                {
+                    "event_id": event_id,
+                    "sponsor_id": sponsor_id,
+                    "package_id": package["id"],
+                    "timestamp": context["now"],
+                    "confirmation_code": random_uuid(rng),
+                }
+            )
+        packages.extend(event_packages)
+    return {
+        Venue.__table__.name: venues,
+        Event.__table__.name: events,
+        Package.__table__.name: packages,
+        Sponsorship.__table__.name: sponsorships,
+        "images": images,
+    }
+
+
+def csv_field(value):
+    """Return the value as a field of a CSV line for COPY. None is
+    written as an unquoted empty field, which COPY loads as null,
+    and every other value that isn't a number is quoted, so that
+    empty strings stay empty strings.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    return '"%s"' % str(value).replace('"', '""')
+
+
+def copy_rows(table, rows):
+    """Insert the rows into the table with PostgreSQL's COPY."""
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(",".join(csv_field(row[column]) for column in columns) + "\n")
+    buffer.seek(0)
+    cursor = db.session.connection().connection.cursor()
+    cursor.copy_expert(
+        "COPY %s (%s) FROM STDIN WITH CSV" % (table.name, ", ".join(columns)), buffer
+    )
 
 
 class FakeDataGenerator:
@@ -57,169 +263,177 @@ class FakeDataGenerator:
         num_users,
         num_events,
         packages_per_event=4,
-        sponsors_per_event=3
+        sponsors_per_event=3,
+        seed=0,
+        workers=1,
     ):
-        self.faker = Faker()
         self.num_users = num_users
         self.num_events = num_events
         self.packages_per_event = packages_per_event
         self.sponsors_per_event = sponsors_per_event
+        self.seed = seed
+        self.workers = workers
 
-    def add_all(self):
-        """Create all necessary tables and create all resources."""
+    @property
+    def search_middleware(self):
+        """Return the application's search middleware, or one for the
+        configured Elasticsearch URL if the application doesn't use search.
+        """
+        middleware = getattr(current_app, "sqlalchemy_search_middleware", None)
+        if middleware is None:
+            es_client = ElasticsearchClient(current_app.config["ELASTICSEARCH_URL"])
+            middleware = FlaskSQLAlchemyMiddleware(es_client, db)
+        return middleware
+
+    def add_all(self, index=True):
+        """Create all resources, then index the events in Elasticsearch."""
         print("Generating fake data...")
         self.add_users()
         self.add_events()
-        self.add_packages()
-        self.add_sponsorships()
-        print("Indexing Elasticsearch data...")
-        search_middleware.reindex(Event)
+        if index:
+            print("Indexing Elasticsearch data...")
+            self.search_middleware.reindex(Event)
         print("Done!")
 
     def add_users(self):
         """Add fake user data to the database."""
         print("Adding users...")
-        i = 0
-        while i < self.num_users:
-            role = Role.query.filter_by(
-                name=random.choice(["Event Organizer", "Sponsor"])
-            ).first()
-            user = User(
-                first_name=self.faker.first_name(),
-                last_name=self.faker.last_name(),
-                company=self.faker.company(),
-                email=self.faker.email(),
-                password="password",
-                job_title=self.faker.job(),
-                website=self.faker.url(),
-                about=self.faker.text(),
-                role=role,
-            )
-            db.session.add(user)
-            try:
-                db.session.commit()
-                i += 1
-            except IntegrityError:  # the unique constraint was violated
-                db.session.rollback()
+        roles = dict(Role.query.with_entities(Role.name, Role.id))
+        now = datetime.utcnow()
+        context = {
+            "first_id": self.next_id(User),
+            "role_ids": [roles["Event Organizer"], roles["Sponsor"]],
+            # hashing is slow on purpose, and every user has the same password
+            "password_hash": current_app.password_hasher.hash(PASSWORD),
+            "now": now,
+        }
+        self.generate(generate_users, self.num_users, context)
 
     def add_events(self):
-        """Add fake event data to the database."""
-        print("Add events...")
-        user_count = User.query.count()
-        category_count = EventCategory.query.count()
-        type_count = EventType.query.count()
-        role = Role.query.filter_by(name="Event Organizer").first()
-        users = User.query.filter_by(role=role).all()
-        for index in range(self.num_events):
-            user = random.choice(users)
-            
-            event_type = EventType.query.get(random.randint(1, type_count))
-            category, location = random.choice(CATEGORIES_AND_LOCATIONS)
-            event_category = EventCategory.query.filter_by(name=category).first()
-            venue = Venue(
-                name=self.faker.company(),
-                address=self.faker.street_address(),
-                city=location[0],
-                state=location[1],
-                zip_code=self.faker.zipcode(),
-            )
-            random_start_date = datetime.now() + timedelta(days=random.randint(1, 90))
-            start_date = self.faker.date_between(
-                start_date=random_start_date,
-                end_date=random_start_date + timedelta(days=30),
-            )
-            string_time = random.choice(TIMES[:40])[1]
-            start_time = datetime.strptime(string_time, TIME_FORMAT)
-            start_datetime = datetime.combine(start_date, start_time.time())
-
-            event = Event(
-                title=self.faker.company() + random.choice([" Party", " Gala"]),
-                start_datetime=start_datetime,
-                end_datetime=start_datetime + timedelta(days=1),
-                attendees=random.choice(PEOPLE_RANGES[1:])[1],
-                male_to_female="50-50",
-                description=self.faker.text(),
-                pitch=self.faker.text(),
-                published=True,
-                user=user,
-                venue=venue,
-                event_type=event_type,
-                event_category=event_category,
-            )
-            image = self.get_random_event_image(event)
-            event.image = image
-            db.session.add(event)
-        db.session.commit()
+        """Add fake events to the database, each with a venue, packages,
+        sponsorships and one of the default event images.
+        """
+        print("Adding events...")
+        organizer_ids, sponsor_ids = self.user_ids_by_role()
+        if not organizer_ids:
+            raise ValueError("Events can't be added without event organizers.")
+        now = datetime.utcnow()
+        context = {
+            "first_id": self.next_id(Event),
+            "first_venue_id": self.next_id(Venue),
+            "first_package_id": self.next_id(Package),
+            "packages_per_event": self.packages_per_event,
+            "sponsors_per_event": self.sponsors_per_event,
+            "organizer_ids": organizer_ids,
+            "sponsor_ids": sponsor_ids,
+            "event_type_ids": [
+                event_type.id for event_type in EventType.query.order_by(EventType.id)
+            ],
+            "category_ids": dict(
+                EventCategory.query.with_entities(EventCategory.name, EventCategory.id)
+            ),
+            "image_filenames": self.default_event_images(),
+            "today": date.today(),
+            "now": now,
+        }
+        self.image_type_id = (
+            ImageType.query.filter_by(name="Main Event Image").first().id
+        )
+        self.used_image_paths = {path for path, in Image.query.with_entities(Image.path)}
+        self.generate(generate_events, self.num_events, context)
 
-    def add_packages(self):
-        """Add fake package data to the database."""
-        print("Adding packages...")
-        event_count = Event.query.count()
-        for count in range(1, event_count + 1):
-            event = Event.query.get(count)
-            for num in range(self.packages_per_event):
-                package = Package(
-                    name=self.faker.color_name() + " Package",
-                    price=self.faker.pydecimal(
-                        left_digits=5, right_digits=2, positive=True, min_value=1.0
-                    ),
-                    audience=random.choice(PEOPLE_RANGES[1:])[1],
-                    description=self.faker.text(),
-                    available_packages=self.faker.pyint(
-                        min_value=1, max_value=20, step=1
-                    ),
-                    package_type=random.choice(["Cash", "In-Kind"]),
-                    event=event,
-                )
-                db.session.add(package)
+    def generate(self, function, num_rows, context):
+        """Generate the rows in partitions, with worker processes if
+        there's more than one worker, and insert each partition as soon
+        as it's generated.
+        """
+        first_id = context["first_id"]
+        tasks = [
+            (self.seed, start, min(start + PARTITION_SIZE, first_id + num_rows), context)
+            for start in range(first_id, first_id + num_rows, PARTITION_SIZE)
+        ]
+        pools = create_pools(self.seed)
+        if self.workers > 1 and len(tasks) > 1:
+            with multiprocessing.Pool(
+                self.workers, initializer=set_pools, initargs=(pools,)
+            ) as pool:
+                for tables in pool.imap(function, tasks):
+                    self.insert(tables)
+        else:
+            set_pools(pools)
+            for task in tasks:
+                self.insert(function(task))
+        self.reset_sequences()
+
+    def insert(self, tables):
+        """Insert the rows of a partition and commit them."""
+        images = tables.pop("images", [])
+        for table in db.metadata.sorted_tables:
+            rows = tables.get(table.name)
+            if rows:
+                self.insert_rows(table, rows)
+        self.insert_images(images)
         db.session.commit()
 
-    def add_sponsorships(self):
-        """Add fake sponsorship deals to the database."""
-        print("Adding sponsorships...")
-        event_count = Event.query.count()
-        role = Role.query.filter_by(name="Sponsor").first()
-        users = User.query.filter_by(role=role).all()
-        for count in range(1, event_count + 1):
-            event = Event.query.get(count)
-            packages = event.packages.all()
-            i = 0
-            while i < self.sponsors_per_event:
-                user = random.choice(users)
-                try:
-                    sponsorship = Sponsorship(
-                        event=event,
-                        sponsor=user,
-                        package=random.choice(packages),
-                        timestamp=datetime.now(),
-                        confirmation_code=str(uuid.uuid4()),
-                    )
-                    db.session.add(sponsorship)
-                    db.session.commit()
-                    i += 1
-                except IntegrityError:  # a user can't buy the same package twice
-                    db.session.rollback()
-
-    def get_random_event_image(self, event):
-        """Return a random event image from the default images
-        directory.
+    def insert_images(self, images):
+        """Insert the main image of each event. Image paths are unique,
+        so each default image belongs to the first event given it.
         """
-        images_directory = os.path.dirname(__file__) + "/static/images/default_event_images"
-        default_event_images = os.listdir(images_directory)
-        # the while loop is to account for any hidden files in the directory
-        filename = ""
-        while not filename:
-            filename = random.choice(default_event_images)
-            if not filename.startswith("default_event_image"):
-                filename = ""
-        filepath = images_directory + "/" + filename
-        image = Image.query.filter_by(path=filepath).first()
-        if image is None:
-            image = Image(
-                path=filepath,
-                event=event,
-                image_type=ImageType.query.filter_by(name="Main Event Image").first(),
+        rows = []
+        for event_id, filename in images:
+            path = DEFAULT_EVENT_IMAGE_DIR + "/" + filename
+            if path not in self.used_image_paths:
+                self.used_image_paths.add(path)
+                rows.append(
+                    {
+                        "path": path,
+                        "uploaded_at": datetime.utcnow(),
+                        "image_type_id": self.image_type_id,
+                        "event_id": event_id,
+                    }
+                )
+        if rows:
+            self.insert_rows(Image.__table__, rows)
+
+    def insert_rows(self, table, rows):
+        """Insert the rows into the table in bulk."""
+        if db.session.get_bind().dialect.name == "postgresql":
+            copy_rows(table, rows)
+            return
+        for start in range(0, len(rows), CHUNK_SIZE):
+            db.session.execute(table.insert(), rows[start : start + CHUNK_SIZE])
+
+    def reset_sequences(self):
+        """Move PostgreSQL's id sequences past the inserted ids."""
+        if db.session.get_bind().dialect.name != "postgresql":
+            return
+        for model in [User, Venue, Event, Package, Image]:
+            table = model.__table__.name
+            db.session.execute(
+                "SELECT setval(pg_get_serial_sequence('%s', 'id'), "
+                "(SELECT MAX(id) FROM %s))" % (table, table)
             )
-            db.session.add(image)
-            db.session.commit()
-        return image
+        db.session.commit()
+
+    def next_id(self, model):
+        """Return the id after the largest id in the model's table."""
+        return (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+    def user_ids_by_role(self):
+        """Return the ids of the event organizers and of the sponsors."""
+        roles = dict(Role.query.with_entities(Role.name, Role.id))
+        ids = {role_id: [] for role_id in roles.values()}
+        for user_id, role_id in User.query.with_entities(User.id, User.role_id).order_by(
+            User.id
+        ):
+            ids[role_id].append(user_id)
+        return ids[roles["Event Organizer"]], ids[roles["Sponsor"]]
+
+    def default_event_images(self):
+        """Return the filenames of the default event images."""
+        # filter out any hidden files in the directory
+        return sorted(
+            filename
+            for filename in os.listdir(DEFAULT_EVENT_IMAGE_DIR)
+            if filename.startswith("default_event_image")
+        )
@@ -0,0 +1,171 @@
+"""This module contains the application's Prometheus metrics and the
+/metrics view that exposes them.
+
+Each gunicorn worker keeps its own metrics, so when the
+prometheus_multiproc_dir environment variable names a directory, which
+gunicorn.conf.py sets from PROMETHEUS_MULTIPROC_DIR before the
+application is imported, every worker writes its metrics to files there
+and /metrics adds up the files of all of them.
+
+/metrics can be scraped with the METRICS_TOKEN as a bearer token, and
+administrators can view it when they are logged in.
+"""
+
+
+import hmac
+import os
+import time
+from contextlib import contextmanager
+from flask import Response, abort, current_app, g, request
+from flask_login import current_user
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+
+MULTIPROCESS_ENVIRONMENT_VARIABLE = "prometheus_multiproc_dir"
+STATEMENT_TYPES = {"select", "insert", "update", "delete"}
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time spent handling requests.",
+    ["blueprint", "endpoint", "method"],
+)
+RESPONSES = Counter(
+    "http_responses_total",
+    "Responses sent, by status code.",
+    ["blueprint", "endpoint", "method", "status"],
+)
+STATEMENT_LATENCY = Histogram(
+    "db_statement_duration_seconds",
+    "Time spent running SQL statements.",
+    ["statement"],
+)
+SEARCH_LATENCY = Histogram(
+    "search_request_duration_seconds",
+    "Time spent on requests to Elasticsearch.",
+    ["operation"],
+)
+SEARCH_ERRORS = Counter(
+    "search_request_errors_total",
+    "Requests to Elasticsearch that raised an exception.",
+    ["operation"],
+)
+EMAIL_QUEUE_DEPTH = Gauge(
+    "email_queue_depth",
+    "Emails waiting to be sent.",
+    multiprocess_mode="livesum",
+)
+EMAIL_SEND_LATENCY = Histogram(
+    "email_send_duration_seconds", "Time spent sending emails."
+)
+EMAIL_ERRORS = Counter("email_send_errors_total", "Emails that couldn't be sent.")
+PAYMENT_LATENCY = Histogram(
+    "payment_request_duration_seconds",
+    "Time spent on requests to Stripe.",
+    ["operation"],
+)
+PAYMENT_ERRORS = Counter(
+    "payment_request_errors_total",
+    "Requests to Stripe that raised an exception.",
+    ["operation"],
+)
+
+
+def statement_type(statement):
+    """Return the kind of the SQL statement, e.g. select."""
+    words = statement.split(None, 1)
+    keyword = words[0].lower() if words else ""
+    return keyword if keyword in STATEMENT_TYPES else "other"
+
+
+def observe_statement(statement, seconds):
+    """Record a SQL statement and the time it took."""
+    STATEMENT_LATENCY.labels(statement_type(statement)).observe(seconds)
+
+
+def observe_search(operation):
+    """Decorator that records the time an Elasticsearch client method
+    takes and whether it raised an exception.
+    """
+    latency = SEARCH_LATENCY.labels(operation)
+    errors = SEARCH_ERRORS.labels(operation)
+
+    def decorator(func):
+        return errors.count_exceptions()(latency.time()(func))
+
+    return decorator
+
+
+@contextmanager
+def observe_payment(operation):
+    """Record the time the Stripe request made in the with block takes
+    and whether it raised an exception.
+    """
+    with PAYMENT_ERRORS.labels(operation).count_exceptions():
+        with PAYMENT_LATENCY.labels(operation).time():
+            yield
+
+
+def start_request_timer():
+    """Remember when the request started."""
+    g.metrics_start_time = time.perf_counter()
+
+
+def observe_request(response):
+    """Record the request's latency and response status."""
+    start_time = g.pop("metrics_start_time", None)
+    if start_time is None:
+        return response
+    labels = (
+        request.blueprint or "",
+        request.endpoint or "none",
+        request.method,
+    )
+    REQUEST_LATENCY.labels(*labels).observe(time.perf_counter() - start_time)
+    RESPONSES.labels(*labels, str(response.status_code)).inc()
+    return response
+
+
+def collect_metrics():
+    """Return the metrics of every worker in the text exposition format."""
+    if MULTIPROCESS_ENVIRONMENT_VARIABLE in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry)
+
+
+def can_view_metrics():
+    """Return True if the request carries the metrics token or was sent
+    by a logged in administrator.
+    """
+    token = current_app.config["METRICS_TOKEN"]
+    authorization = request.headers.get("Authorization", "")
+    if token and hmac.compare_digest(authorization, "Bearer " + token):
+        return True
+    return current_user.is_administrator()
+
+
+def metrics():
+    """Return the application's metrics for Prometheus to scrape."""
+    if not can_view_metrics():
+        abort(403)
+    return Response(collect_metrics(), content_type=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app):
+    """Record the latency and status of every request and add the
+    /metrics view.
+    """
+    app.before_request(start_request_timer)
+    app.after_request(observe_request)
+    app.add_url_rule("/metrics", "metrics", metrics)
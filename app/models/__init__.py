@@ -9,3 +9,4 @@ from app.models.sponsorships import Sponsorship, SponsorshipStatus
 from app.models.users import User, AnonymousUser
 from app.models.videos import Video
 from app.models.venues import Venue
+from app.models.listings import EventCard, event_cards, event_cards_by_id
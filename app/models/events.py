@@ -2,10 +2,15 @@
 
 
 import math
+from itertools import chain
 from sqlalchemy.ext.hybrid import hybrid_method
 from datetime import datetime
 from app.extensions import db
-from app.models.images import ImageType, Image
+from app.models.images import ImageType, Image, static_path
+from app.models.packages import Package
+from app.models.sponsorships import Sponsorship
+from app.models.videos import Video
+from app.models.venues import Venue
 from app.models.abstract_model import AbstractModel
 
 
@@ -23,6 +28,7 @@ saved_events = db.Table(
     db.Column("user_id", db.Integer, db.ForeignKey("users.id"), nullable=False),
     db.Column("event_id", db.Integer, db.ForeignKey("events.id"), nullable=False),
     db.PrimaryKeyConstraint("user_id", "event_id"),
+    db.Index("ix_saved_events_event_id", "event_id"),
 )
 
 
@@ -40,8 +46,18 @@ class Event(AbstractModel):
         "event_category_id",
         "event_type_id",
         "published",
+        "package_prices",
     ]
     __doctype__ = "event"
+    __table_args__ = (
+        db.Index(
+            "ix_events_live_end_datetime",
+            "end_datetime",
+            postgresql_where=db.text("status = 'live'"),
+            sqlite_where=db.text("status = 'live'"),
+        ),
+        db.Index("ix_events_user_id_status", "user_id", "status"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(64), nullable=False)
     start_datetime = db.Column(db.DateTime, index=True, nullable=True)
@@ -51,6 +67,18 @@ class Event(AbstractModel):
     description = db.Column(db.Text, nullable=True)
     pitch = db.Column(db.Text, nullable=True)
     published = db.Column(db.Boolean, default=False, nullable=False)
+    status = db.Column(
+        db.Enum(
+            EventStatus.DRAFT, EventStatus.LIVE, EventStatus.PAST, name="event_status"
+        ),
+        default=EventStatus.DRAFT,
+        nullable=False,
+    )
+    # bumped whenever the event, its venue, images, packages, video or
+    # sponsorships change so that cached fragments of its pages can be
+    # keyed on it, updated_at is set to the time of the change
+    version = db.Column(db.Integer, default=1, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     venue_id = db.Column(db.Integer, db.ForeignKey("venues.id"), nullable=False)
     event_type_id = db.Column(
@@ -75,29 +103,52 @@ class Event(AbstractModel):
     @hybrid_method
     def is_ongoing(self):
         """Return True if the event is ongoing."""
-        return self.published and self.end_datetime > datetime.now()
-
-    @is_ongoing.expression
-    def is_ongoing(cls):
-        """Return True if the event is ongoing."""
-        return db.and_(cls.published, cls.end_datetime > datetime.now())
+        return self.status == EventStatus.LIVE
 
     @hybrid_method
     def has_ended(self):
         """Return True if the event has ended."""
-        return self.published and self.end_datetime <= datetime.now()
-
-    @has_ended.expression
-    def has_ended(cls):
-        """Return True if the event has ended."""
-        return db.and_(
-            db.or_(cls.published, cls.published == False),
-            cls.end_datetime <= datetime.now(),
-        )
+        return self.status == EventStatus.PAST
 
+    @hybrid_method
     def is_draft(self):
         """Return True if the event is in draft status."""
-        return not self.published
+        return self.status == EventStatus.DRAFT
+
+    def publish(self):
+        """Publish the event, setting its status based on its end date."""
+        self.published = True
+        self.status = EventStatus.LIVE
+        self.update_status()
+
+    def update_status(self):
+        """Set a published event's status to live or past based on its
+        end date, e.g. after the end date was edited. Drafts stay drafts.
+        """
+        if self.status == EventStatus.DRAFT:
+            return
+        if self.end_datetime <= datetime.now():
+            self.status = EventStatus.PAST
+        else:
+            self.status = EventStatus.LIVE
+
+    @classmethod
+    def expire_events(cls, now=None):
+        """Move every live event that has ended to past status in a single
+        UPDATE statement and return the number of events updated.
+        """
+        if now is None:
+            now = datetime.now()
+        return cls.query.filter(
+            cls.status == EventStatus.LIVE, cls.end_datetime <= now
+        ).update(
+            {
+                cls.status: EventStatus.PAST,
+                cls.version: cls.version + 1,
+                cls.updated_at: datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
 
     def start_date(self, string_format=None):
         """Return the event's start date as a date object. If a format is passed in,
@@ -145,6 +196,13 @@ class Event(AbstractModel):
         """Return the number of packages available for this event."""
         return sum([package.available_packages for package in self.packages])
 
+    @property
+    def package_prices(self):
+        """Return the prices of the event's packages. Used to index
+        the prices along with the event in Elasticsearch.
+        """
+        return [float(package.price) for package in self.packages]
+
     def price_range(self):
         """Return the price range for the event's packages."""
         low = self.packages[0].price
@@ -159,16 +217,20 @@ class Event(AbstractModel):
 
     def main_image(self):
         """Return the filepath for the main event image."""
-        for image in self.images:
-            if image.image_type.name == "Main Event Image":
-                return "/".join(image.path.split("/")[-3:]).replace("static/", "")
-        return ""
+        image = (
+            self.images.join(ImageType)
+            .filter(ImageType.name == "Main Event Image")
+            .first()
+        )
+        if image is None:
+            return ""
+        return static_path(image.path)
 
     def misc_images(self):
         """Return the filepaths for other miscaelaneous images associated with this event."""
         images = [
-            "/".join(image.path.split("/")[-3:]).replace("static/", "")
-            for image in self.images if image.image_type.name == "Misc"
+            static_path(image.path)
+            for image in self.images.join(ImageType).filter(ImageType.name == "Misc")
         ]
         return images
 
@@ -176,6 +238,11 @@ class Event(AbstractModel):
         """Return the number of sponsors for this event."""
         return len(self.sponsorships)
 
+    @property
+    def cache_tags(self):
+        """Return the tags of the cached pages that show this event."""
+        return ["events", "event:%d" % self.id]
+
     def __repr__(self):
         """Return a string representation of an Event object.
         Useful for debugging.
@@ -183,6 +250,29 @@ class Event(AbstractModel):
         return "<Event: %r>" % self.title
 
 
+@db.event.listens_for(db.session, "before_flush")
+def bump_event_versions(session, flush_context, instances):
+    """Bump the version of every event that is changed in the flush,
+    or whose venue, images, packages, video or sponsorships are.
+    """
+    events = set()
+    with session.no_autoflush:
+        for obj in chain(session.new, session.dirty, session.deleted):
+            if isinstance(obj, Event):
+                if obj in session.new or session.is_modified(obj):
+                    events.add(obj)
+            elif isinstance(obj, (Image, Package, Video, Sponsorship)):
+                if obj.event is not None:
+                    events.add(obj.event)
+            elif isinstance(obj, Venue) and obj not in session.new:
+                events.update(obj.events)
+    now = datetime.utcnow()
+    for event in events:
+        if event not in session.deleted:
+            event.version = (event.version or 0) + 1
+            event.updated_at = now
+
+
 class EventType(db.Model):
     """Class to represent an event type"""
 
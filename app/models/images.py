@@ -5,10 +5,18 @@ from datetime import datetime
 from app.extensions import db
 
 
+def static_path(path):
+    """Return the given image path relative to the static folder."""
+    return "/".join(path.split("/")[-3:]).replace("static/", "")
+
+
 class Image(db.Model):
     """Class to represent an image"""
 
     __tablename__ = "images"
+    __table_args__ = (
+        db.Index("ix_images_event_id_image_type_id", "event_id", "image_type_id"),
+    )
     id = db.Column(db.Integer, primary_key=True)
     path = db.Column(db.Text(), unique=True, index=True, nullable=False)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -17,6 +25,11 @@ class Image(db.Model):
     )
     event_id = db.Column(db.Integer, db.ForeignKey("events.id"), nullable=False)
 
+    @property
+    def cache_tags(self):
+        """Return the tags of the cached pages that show this image."""
+        return ["events", "event:%d" % self.event_id]
+
     def __repr__(self):
         """Return a string representation of the Image class.
         Used for debugging purposes
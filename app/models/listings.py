@@ -0,0 +1,123 @@
+"""This module contains lightweight read models for pages that list
+events. They select only the columns a card needs instead of loading
+full Event objects with their text columns and relationships.
+"""
+
+
+from app.extensions import db
+from app.models.events import Event
+from app.models.images import Image, ImageType, static_path
+from app.models.venues import Venue
+
+
+MAIN_IMAGE_TYPE = "Main Event Image"
+
+
+class EventCard:
+    """Class to represent the columns of an event shown on its card."""
+
+    __slots__ = (
+        "id",
+        "version",
+        "title",
+        "start_datetime",
+        "venue_name",
+        "city",
+        "state",
+        "image_path",
+    )
+
+    def __init__(
+        self, id, version, title, start_datetime, venue_name, city, state, image_path
+    ):
+        self.id = id
+        self.version = version
+        self.title = title
+        self.start_datetime = start_datetime
+        self.venue_name = venue_name
+        self.city = city
+        self.state = state
+        self.image_path = image_path
+
+    @property
+    def main_image(self):
+        """Return the filepath for the main event image."""
+        if self.image_path is None:
+            return ""
+        return static_path(self.image_path)
+
+    def start_date(self, string_format=None):
+        """Return the event's start date as a date object. If a format is passed in,
+        then the date will be returned in the given string format.
+        """
+        if string_format:
+            return self.start_datetime.strftime(string_format)
+        return self.start_datetime.date()
+
+    def start_time(self, string_format=None):
+        """Return the event's start time as a time object. If a format is passed in,
+        then the time will be returned in the given string format.
+        """
+        if string_format:
+            return self.start_datetime.strftime(string_format)
+        return self.start_datetime.time()
+
+    def __repr__(self):
+        """Return a string representation of an event card.
+        Used for debugging purposes.
+        """
+        return "<EventCard: %r>" % self.title
+
+
+class EventCardBundle(db.Bundle):
+    """Bundle that turns the selected columns into EventCard objects."""
+
+    single_entity = True
+
+    def create_row_processor(self, query, procs, labels):
+        def process_row(row):
+            return EventCard(*[proc(row) for proc in procs])
+
+        return process_row
+
+
+def event_cards(*criterion):
+    """Return a query for the cards of the events that match the given
+    criteria, joined to their venue and main image.
+    """
+    main_image_type_id = (
+        db.session.query(ImageType.id)
+        .filter(ImageType.name == MAIN_IMAGE_TYPE)
+        .as_scalar()
+    )
+    bundle = EventCardBundle(
+        "event_card",
+        Event.id,
+        Event.version,
+        Event.title,
+        Event.start_datetime,
+        Venue.name,
+        Venue.city,
+        Venue.state,
+        Image.path,
+    )
+    return (
+        db.session.query(bundle)
+        .select_from(Event)
+        .join(Venue, Venue.id == Event.venue_id)
+        .outerjoin(
+            Image,
+            db.and_(Image.event_id == Event.id, Image.image_type_id == main_image_type_id),
+        )
+        .filter(*criterion)
+    )
+
+
+def event_cards_by_id(ids):
+    """Return the cards of the events with the given ids in the same
+    order as the ids.
+    """
+    if not ids:
+        return []
+    cards = {card.id: card for card in event_cards(Event.id.in_(ids))}
+    return [cards[id] for id in ids if id in cards]
@@ -9,6 +9,10 @@ class Package(AbstractModel):
     """Class to represent a sponsorship package."""
 
     __tablename__ = "packages"
+    # package prices are stored in the event's search document
+    # so they are reindexed when a package changes
+    __searchable_parent__ = "event"
+    __searchable_parent_fields__ = ["package_prices"]
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(64), nullable=False)
     price = db.Column(db.Numeric(6, 2), nullable=False)
@@ -19,7 +23,9 @@ class Package(AbstractModel):
         db.Integer, nullable=False
     )  # num packages made avaiable originally
     package_type = db.Column(db.String(64), nullable=False)
-    event_id = db.Column(db.Integer, db.ForeignKey("events.id"), nullable=False)
+    event_id = db.Column(
+        db.Integer, db.ForeignKey("events.id"), index=True, nullable=False
+    )
     sponsorships = db.relationship("Sponsorship", back_populates="package")
 
     def is_sold_out(self):
@@ -48,6 +54,11 @@ class Package(AbstractModel):
             "sponsorships": self.sponsorships
         }
 
+    @property
+    def cache_tags(self):
+        """Return the tags of the cached pages that show this package."""
+        return ["events", "event:%d" % self.event_id]
+
     def __repr__(self):
         """Return the string representation of a Package.
         Used for debugging purposes.
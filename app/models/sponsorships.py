@@ -18,8 +18,13 @@ class Sponsorship(AbstractModel):
 
     __tablename__ = "sponsorships"
     event_id = db.Column(db.Integer, db.ForeignKey("events.id"), primary_key=True)
-    sponsor_id = db.Column(db.Integer, db.ForeignKey("users.id"), primary_key=True)
-    package_id = db.Column(db.Integer, db.ForeignKey("packages.id"), primary_key=True)
+    # event_id is covered by the primary key since it is the leading column
+    sponsor_id = db.Column(
+        db.Integer, db.ForeignKey("users.id"), primary_key=True, index=True
+    )
+    package_id = db.Column(
+        db.Integer, db.ForeignKey("packages.id"), primary_key=True, index=True
+    )
     timestamp = db.Column(db.DateTime, nullable=True)
     confirmation_code = db.Column(db.String(64), nullable=True)
     event = db.relationship("Event", back_populates="sponsorships")
@@ -38,6 +43,11 @@ class Sponsorship(AbstractModel):
         """
         return self.event.has_ended()
 
+    @property
+    def cache_tags(self):
+        """Return the tags of the cached pages that show this sponsorship."""
+        return ["event:%d" % self.event_id, "user:%d" % self.sponsor_id]
+
     def __repr__(self):
         """Returns a string representation of a sponsorship deal. Used for debugging
         purposes.
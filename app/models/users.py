@@ -5,11 +5,10 @@ from datetime import datetime
 from flask import current_app
 from flask_login import UserMixin, AnonymousUserMixin
 from app.extensions import db, login_manager
-from werkzeug.security import generate_password_hash, check_password_hash
 from itsdangerous import TimedJSONWebSignatureSerializer as Serializer
-from app.models.events import EventStatus, saved_events
+from app.models.events import Event, EventStatus, saved_events
 from app.models.roles import Permission, Role
-from app.models.sponsorships import SponsorshipStatus
+from app.models.sponsorships import Sponsorship, SponsorshipStatus
 from app.models.abstract_model import AbstractModel
 
 
@@ -24,6 +23,9 @@ class User(UserMixin, AbstractModel):
     email = db.Column(db.String(64), unique=True, index=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
     member_since = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(
+        db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
     job_title = db.Column(db.String(64), nullable=True)
     website = db.Column(db.String(64), unique=True, nullable=True)
     about = db.Column(db.Text(), nullable=True)
@@ -78,7 +80,7 @@ class User(UserMixin, AbstractModel):
     @password.setter
     def password(self, password):
         """Set the password hash attribute."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = current_app.password_hasher.hash(password)
 
     @property
     def full_name(self):
@@ -86,8 +88,16 @@ class User(UserMixin, AbstractModel):
         return self.first_name + " " + self.last_name
 
     def verify_password(self, password):
-        """Return True if the correct password is provided by the user."""
-        return check_password_hash(self.password_hash, password)
+        """Return True if the correct password is provided by the user.
+        A correct password that was hashed with other parameters than
+        the configured ones is hashed again, for the caller to commit.
+        """
+        hasher = current_app.password_hasher
+        if not hasher.verify(self.password_hash, password):
+            return False
+        if hasher.needs_rehash(self.password_hash):
+            self.password = password
+        return True
 
     def generate_password_reset_token(self, expiration=3600):
         """Return a signed token for a user who wants to reset
@@ -179,12 +189,9 @@ class User(UserMixin, AbstractModel):
         of the given status. This method is to only be called
         for a user with the permission to create events.
         """
-        if status == EventStatus.LIVE:
-            return len([event for event in self.events if event.is_ongoing()])
-        elif status == EventStatus.PAST:
-            return len([event for event in self.events if event.has_ended()])
-        else:
-            return len([event for event in self.events if not event.is_draft()])
+        if status in (EventStatus.LIVE, EventStatus.PAST):
+            return self.events.filter(Event.status == status).count()
+        return self.events.filter(Event.status != EventStatus.DRAFT).count()
 
     def num_events_sponsored(self, status=None):
         """Return the uniquenumber of events sponsored by the user that are 
@@ -226,33 +233,23 @@ class User(UserMixin, AbstractModel):
 
     def get_events_by_status(self, status):
         """Return a list of hosted events based on the given status."""
+        query = self.events
         if status == EventStatus.LIVE:
-            events = [event for event in self.events if event.is_ongoing()]
+            query = query.filter(Event.is_ongoing())
         elif status == EventStatus.DRAFT:
-            events = [event for event in self.events if event.is_draft()]
+            query = query.filter(Event.is_draft())
         elif status == EventStatus.PAST:
-            events = [event for event in self.events if event.has_ended()]
-        else:
-            events = self.events.all()
-        return events
+            query = query.filter(Event.has_ended())
+        return query.all()
 
     def get_sponsorships_by_status(self, status):
         """Return a list of sponsorships based on the given status."""
+        query = Sponsorship.query.join(Event).filter(Sponsorship.sponsor_id == self.id)
         if status == SponsorshipStatus.CURRENT:
-            sponsorships = [
-                sponsorship
-                for sponsorship in self.sponsorships
-                if sponsorship.is_current()
-            ]
+            query = query.filter(Event.is_ongoing())
         elif status == SponsorshipStatus.PAST:
-            sponsorships = [
-                sponsorship
-                for sponsorship in self.sponsorships
-                if sponsorship.is_past()
-            ]
-        else:
-            sponsorships = self.sponsorships
-        return sponsorships
+            query = query.filter(Event.has_ended())
+        return query.all()
 
     def to_dict(self):
         """Return the attributes of a user as a dictionary."""
@@ -273,6 +270,11 @@ class User(UserMixin, AbstractModel):
             "role": self.role
         }
 
+    @property
+    def cache_tags(self):
+        """Return the tags of the cached pages that show this user."""
+        return ["user:%d" % self.id]
+
     def __repr__(self):
         """Return a string representation of a user> Used for debugging
         purposes."""
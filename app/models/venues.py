@@ -9,6 +9,10 @@ class Venue(AbstractModel):
     """Class to represent a venue"""
 
     __tablename__ = "venues"
+    # the venue's city and state are stored in the search documents
+    # of its events so they are reindexed when the venue changes
+    __searchable_parent__ = "events"
+    __searchable_parent_fields__ = ["venue.state", "venue.city"]
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(64), nullable=False)
     address = db.Column(db.String(64), unique=True, index=True, nullable=False)
@@ -29,6 +33,11 @@ class Venue(AbstractModel):
             "events": self.events,
         }
 
+    @property
+    def cache_tags(self):
+        """Return the tags of the cached pages that show this venue."""
+        return ["events"] + ["event:%d" % event.id for event in self.events]
+
     def __repr__(self):
         """Return a string representation of an Address object.
         Used for debugging purposes.
@@ -14,6 +14,11 @@ class Video(db.Model):
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     event_id = db.Column(db.Integer, db.ForeignKey("events.id"), nullable=False)
 
+    @property
+    def cache_tags(self):
+        """Return the tags of the cached pages that show this video."""
+        return ["events", "event:%d" % self.event_id]
+
     def __repr__(self):
         """Return a string representation of a Video object.
         Used for debugging purposes.
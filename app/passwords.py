@@ -0,0 +1,157 @@
+"""This module contains the password hasher, which hashes passwords
+with the method and cost set in the configuration, and checks them
+without letting a burst of logins take every thread of a worker.
+
+Hashes are stored as "method$salt$hash" like Werkzeug stores them.
+Werkzeug's methods, e.g. "pbkdf2:sha256:150000", are supported, and so
+is "scrypt:n:r:p", e.g. "scrypt:32768:8:1". Passwords hashed with other
+parameters than the configured ones can still be checked, and are
+hashed again with the current ones once they are known to be correct.
+"""
+
+
+import hashlib
+import hmac
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from werkzeug.exceptions import ServiceUnavailable
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    gen_salt,
+    generate_password_hash,
+)
+from app.error_handlers import RetryAfterMixin
+
+
+SCRYPT_PREFIX = "scrypt:"
+
+
+class PasswordHasherBusy(RetryAfterMixin, ServiceUnavailable):
+    """Raised when a password can't be checked because the worker is
+    already checking as many as it is allowed to.
+    """
+
+    description = (
+        "A lot of people are signing in right now. "
+        "Please try again in a few seconds."
+    )
+    retry_after = 5
+
+
+def normalize_method(method):
+    """Return the method the way it is written in the hashes it makes,
+    with the number of iterations of PBKDF2 filled in.
+    """
+    if method.startswith("pbkdf2:") and method.count(":") == 1:
+        return "%s:%d" % (method, DEFAULT_PBKDF2_ITERATIONS)
+    return method
+
+
+def _scrypt(password, salt, method):
+    n, r, p = (int(value) for value in method[len(SCRYPT_PREFIX) :].split(":"))
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt.encode("utf-8"),
+        n=n,
+        r=r,
+        p=p,
+        maxmem=132 * n * r * p,
+        dklen=64,
+    ).hex()
+
+
+def hash_password(password, method, salt_length):
+    """Return the hash of the password made with the given method."""
+    if method.startswith(SCRYPT_PREFIX):
+        salt = gen_salt(salt_length)
+        return "%s$%s$%s" % (method, salt, _scrypt(password, salt, method))
+    return generate_password_hash(password, method, salt_length)
+
+
+def check_password(password_hash, password):
+    """Return True if the password matches the hash."""
+    if password_hash.startswith(SCRYPT_PREFIX):
+        if password_hash.count("$") < 2:
+            return False
+        method, salt, hashval = password_hash.split("$", 2)
+        return hmac.compare_digest(_scrypt(password, salt, method), hashval)
+    return check_password_hash(password_hash, password)
+
+
+class PasswordHasher:
+    """Class that hashes passwords and checks them. At most
+    max_concurrency passwords are checked at once, on a pool of that
+    many threads or processes if pool is "thread" or "process", or
+    else on the calling thread. Callers wait up to wait seconds for
+    their turn before PasswordHasherBusy is raised.
+    """
+
+    def __init__(self, method, salt_length=8, pool=None, max_concurrency=2, wait=5):
+        if pool not in (None, "", "thread", "process"):
+            raise ValueError("Unknown password verification pool: %s" % pool)
+        self.method = normalize_method(method)
+        self.salt_length = salt_length
+        self.pool = pool or None
+        self.max_concurrency = max_concurrency
+        self.wait = wait
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+    def hash(self, password):
+        """Return the hash of the password made with the configured method."""
+        return hash_password(password, self.method, self.salt_length)
+
+    def needs_rehash(self, password_hash):
+        """Return True if the hash wasn't made with the configured
+        method and salt length.
+        """
+        method, _, rest = password_hash.partition("$")
+        salt = rest.partition("$")[0]
+        return method != self.method or len(salt) != self.salt_length
+
+    def verify(self, password_hash, password):
+        """Return True if the password matches the hash. Raises
+        PasswordHasherBusy if no slot frees up in time.
+        """
+        if not self._slots.acquire(timeout=self.wait):
+            raise PasswordHasherBusy()
+        try:
+            executor = self._get_executor()
+            if executor is None:
+                return check_password(password_hash, password)
+            return executor.submit(check_password, password_hash, password).result()
+        finally:
+            self._slots.release()
+
+    def _get_executor(self):
+        if self.pool is None:
+            return None
+        with self._lock:
+            # a pool inherited from the process that forked this one is unusable
+            if self._executor is None or self._executor_pid != os.getpid():
+                if self.pool == "process":
+                    self._executor = ProcessPoolExecutor(
+                        self.max_concurrency, multiprocessing.get_context("spawn")
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        self.max_concurrency, "password-hasher"
+                    )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+
+def init_password_hashing(app):
+    """Give the application a password hasher set up from its configuration."""
+    app.password_hasher = PasswordHasher(
+        app.config["PASSWORD_HASH_METHOD"],
+        app.config["PASSWORD_SALT_LENGTH"],
+        app.config["PASSWORD_VERIFY_POOL"],
+        app.config["PASSWORD_VERIFY_CONCURRENCY"],
+        app.config["PASSWORD_VERIFY_WAIT"],
+    )
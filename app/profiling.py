@@ -0,0 +1,257 @@
+"""This module contains the profiling mode, which is turned on with the
+PROFILING_ENABLED setting.
+
+Administrators can profile a single request by adding __profile=1 to
+its query string or sending an X-Profile: 1 header. The request is run
+under cProfile by Werkzeug's ProfilerMiddleware and the stats are saved
+to PROFILE_DIR, where the view named in the X-Profile-Id header of the
+response sends them from.
+
+When PROFILE_SAMPLE_RATE is N, one in N requests is also profiled with
+a sampling profiler, which records the stack of the thread serving the
+request every PROFILE_SAMPLE_INTERVAL milliseconds. The stacks are added
+up per endpoint in collapsed form, one "frame;frame;frame count" line
+per stack, which flamegraph.pl and speedscope turn into flame graphs.
+"""
+
+
+import itertools
+import os
+import sys
+import threading
+import uuid
+from collections import Counter
+from flask import request
+from flask_login import current_user
+from werkzeug.middleware.profiler import ProfilerMiddleware
+from werkzeug.urls import url_decode
+
+
+PROFILE_QUERY_ARG = "__profile"
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_ID_KEY = "sponsormatch.profile_id"
+ENDPOINT_KEY = "sponsormatch.endpoint"
+PROFILE_ID_LENGTH = 32
+
+
+def collapse(frame, root=None):
+    """Return the stack ending at the given frame in collapsed form,
+    starting below the root frame if it is part of the stack.
+    """
+    names = []
+    while frame is not None and frame is not root:
+        code = frame.f_code
+        names.append("%s:%s" % (frame.f_globals.get("__name__", "?"), code.co_name))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Class that records the stack of a thread at a fixed interval from
+    a background thread, which costs the sampled thread almost nothing.
+    """
+
+    def __init__(self, thread_id, interval, root=None):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root = root
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Start taking samples."""
+        self._thread.start()
+
+    def stop(self):
+        """Stop taking samples and return the number of times each stack
+        was seen.
+        """
+        self._stopped.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or self._stopped.is_set():
+                continue
+            stack = collapse(frame, self.root)
+            if stack:
+                self.stacks[stack] += 1
+
+
+class SampledResponse:
+    """Iterable that passes the body of a sampled response through to
+    the server as it is produced, so it is streamed instead of buffered.
+    The stack sampler is stopped once the server closes it.
+    """
+
+    def __init__(self, app_iter, sampler, on_close):
+        self.app_iter = app_iter
+        self.sampler = sampler
+        self.on_close = on_close
+
+    def __iter__(self):
+        # leave out the frames of the server that iterates over the body
+        self.sampler.root = sys._getframe()
+        yield from self.app_iter
+
+    def close(self):
+        """Close the response body and hand the sampled stacks to on_close."""
+        try:
+            if hasattr(self.app_iter, "close"):
+                self.app_iter.close()
+        finally:
+            self.on_close(self.sampler.stop())
+
+
+class ProfileStore:
+    """Thread-safe collection of the stacks sampled for each endpoint."""
+
+    def __init__(self):
+        self._stacks = {}
+        self._requests = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, stacks):
+        """Add the stacks sampled during a request to the endpoint."""
+        with self._lock:
+            self._requests[endpoint] += 1
+            self._stacks.setdefault(endpoint, Counter()).update(stacks)
+
+    def collapsed(self, endpoint):
+        """Return the stacks of the endpoint in collapsed form, or None
+        if none of its requests were sampled.
+        """
+        with self._lock:
+            stacks = self._stacks.get(endpoint)
+            if stacks is None:
+                return None
+            return "".join(
+                "%s %d\n" % (stack, count) for stack, count in stacks.most_common()
+            )
+
+    def clear(self):
+        """Forget every sample."""
+        with self._lock:
+            self._stacks.clear()
+            self._requests.clear()
+
+    def to_dict(self):
+        """Return the number of sampled requests and samples per endpoint."""
+        with self._lock:
+            return {
+                endpoint: {
+                    "requests": self._requests[endpoint],
+                    "samples": sum(stacks.values()),
+                }
+                for endpoint, stacks in self._stacks.items()
+            }
+
+
+def profile_filename(environ):
+    """Return the name of the file the request's stats are saved to."""
+    return environ[PROFILE_ID_KEY] + ".prof"
+
+
+def is_profile_id(profile_id):
+    """Return True if the string could be the id of a profile."""
+    return len(profile_id) == PROFILE_ID_LENGTH and all(
+        character in "0123456789abcdef" for character in profile_id
+    )
+
+
+class ProfilingMiddleware(ProfilerMiddleware):
+    """Middleware that profiles the requests administrators ask for
+    with cProfile and samples the stacks of one in sample_rate requests.
+    """
+
+    def __init__(
+        self, app, flask_app, store, profile_dir, sample_rate=0, interval=0.005
+    ):
+        super().__init__(
+            app, stream=None, profile_dir=profile_dir, filename_format=profile_filename
+        )
+        self.flask_app = flask_app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self._requests = itertools.count(1)
+
+    def __call__(self, environ, start_response):
+        if self.is_requested(environ) and self.is_authorized(environ):
+            return self.profile(environ, start_response)
+        if self.sample_rate and next(self._requests) % self.sample_rate == 0:
+            return self.sample(environ, start_response)
+        return self._app(environ, start_response)
+
+    @staticmethod
+    def is_requested(environ):
+        """Return True if the request asks to be profiled."""
+        if environ.get(PROFILE_HEADER) == "1":
+            return True
+        query = url_decode(environ.get("QUERY_STRING", ""))
+        return query.get(PROFILE_QUERY_ARG) == "1"
+
+    def is_authorized(self, environ):
+        """Return True if the request was sent by an administrator."""
+        with self.flask_app.request_context(environ):
+            return current_user.is_administrator()
+
+    def profile(self, environ, start_response):
+        """Run the request under cProfile and name the saved stats in
+        the response.
+        """
+        profile_id = uuid.uuid4().hex
+        environ[PROFILE_ID_KEY] = profile_id
+
+        def profiled_start_response(status, headers, exc_info=None):
+            headers.append(("X-Profile-Id", profile_id))
+            return start_response(status, headers, exc_info)
+
+        return super().__call__(environ, profiled_start_response)
+
+    def sample(self, environ, start_response):
+        """Run the request while sampling its stack and add the stacks
+        to its endpoint once its response has been sent.
+        """
+
+        def add_stacks(stacks):
+            self.store.add(environ.get(ENDPOINT_KEY) or "unknown", stacks)
+
+        # leave out the frames of the server that called the middleware
+        sampler = StackSampler(threading.get_ident(), self.interval, sys._getframe())
+        sampler.start()
+        try:
+            app_iter = self._app(environ, start_response)
+        except BaseException:
+            add_stacks(sampler.stop())
+            raise
+        return SampledResponse(app_iter, sampler, add_stacks)
+
+
+def record_endpoint():
+    """Let the middleware know which endpoint served the request."""
+    request.environ[ENDPOINT_KEY] = request.endpoint
+
+
+def init_profiling(app):
+    """Wrap the application in the profiling middleware if profiling
+    is turned on.
+    """
+    if not app.config["PROFILING_ENABLED"]:
+        app.profiles = None
+        return
+    profile_dir = app.config["PROFILE_DIR"]
+    os.makedirs(profile_dir, exist_ok=True)
+    app.profiles = ProfileStore()
+    app.wsgi_app = ProfilingMiddleware(
+        app.wsgi_app,
+        app,
+        app.profiles,
+        profile_dir,
+        app.config["PROFILE_SAMPLE_RATE"],
+        app.config["PROFILE_SAMPLE_INTERVAL"] / 1000,
+    )
+    app.before_request(record_endpoint)
@@ -5,4 +5,11 @@ interface over the low level elasticsearch client.
 from app.search.middleware import FlaskSQLAlchemyMiddleware
 from app.search.client import ElasticsearchClient
 from app.search.query import MatchQuery, BooleanQuery
-from app.search.constants import QueryType, BooleanClause
+from app.search.telemetry import SearchTelemetry
+from app.search.constants import (
+    QueryType,
+    BooleanClause,
+    AggregationType,
+    RepairType,
+    SearchOperation,
+)
@@ -3,6 +3,9 @@ around the low level Elasticsearch client.
 """
 
 from elasticsearch import Elasticsearch
+from elasticsearch.exceptions import RequestError
+from elasticsearch import helpers
+from app.metrics import observe_search
 from app.search.response import SearchResponse
 
 
@@ -13,27 +16,108 @@ class ElasticsearchClient:
     """
 
     def __init__(self, hosts=None, transport_class=None, **kwargs):
-        if transport_class:
-            self._client = Elasticsearch(hosts, transport_class, **kwargs)
-        else:
-            self._client = Elasticsearch(hosts, **kwargs)
-    
+        self._hosts = hosts
+        self._transport_class = transport_class
+        self._kwargs = kwargs
+        self._elasticsearch = None
+
+    @property
+    def _client(self):
+        """Return the low level client, creating it on first use so that
+        building the application doesn't connect to Elasticsearch.
+        """
+        if self._elasticsearch is None:
+            if self._transport_class:
+                self._elasticsearch = Elasticsearch(
+                    self._hosts, self._transport_class, **self._kwargs
+                )
+            else:
+                self._elasticsearch = Elasticsearch(self._hosts, **self._kwargs)
+        return self._elasticsearch
+
+    def reset(self):
+        """Drop the low level client so that the next call creates a new
+        one, e.g. in a forked worker, which can't share its connections.
+        """
+        self._elasticsearch = None
+
     def create_index(self, index):
         """Create a new index if it doesn't already exist."""
         if not self._client.indices.exists(index):
             self._client.indices.create(index)
 
+    @observe_search("query_index")
     def query_index(self, index, query):
         """Query the given index and return the results of the search."""
         search_results = self._client.search(index=index, body=query.to_dict())
         return SearchResponse(search_results, query)
 
+    @observe_search("multi_query")
+    def multi_query(self, index, queries):
+        """Query the given index with several queries in a single
+        request and return a list of the results, one for each query.
+        """
+        body = []
+        for query in queries:
+            body.append({"index": index})
+            body.append(query.to_dict())
+        search_results = self._client.msearch(body=body)
+        responses = []
+        for results, query in zip(search_results["responses"], queries):
+            # msearch reports errors per query instead of raising
+            if "error" in results:
+                raise RequestError(
+                    results.get("status", 400), results["error"]["type"], results
+                )
+            responses.append(SearchResponse(results, query))
+        return responses
+
+    @observe_search("add_to_index")
     def add_to_index(self, index, doc_type, document_id, body):
         """Add fields from the given model to the given index."""
         self._client.index(
             index=index, id=document_id, doc_type=doc_type, body=body
         )
 
+    @observe_search("update_partial")
+    def update_partial(self, index, document_id, fields):
+        """Update only the given fields of a document in the given index.
+        The document is created from the fields if it doesn't exist.
+        """
+        self._client.update(
+            index=index,
+            id=document_id,
+            body={"doc": fields, "doc_as_upsert": True},
+        )
+
+    @observe_search("bulk")
+    def bulk(self, actions, chunk_size=500):
+        """Perform the given index, update and delete actions in as few
+        requests as possible. Returns the number of successful actions.
+        """
+        num_successful, _ = helpers.bulk(self._client, actions, chunk_size=chunk_size)
+        return num_successful
+
+    def iterate_index(self, index, sort_field, batch_size=1000):
+        """Yield every document in the given index sorted by the given
+        field. Documents are fetched in batches with search_after so
+        that memory usage is constant regardless of the size of the index.
+        """
+        if not self._client.indices.exists(index):
+            return
+        body = {
+            "query": {"match_all": {}},
+            "sort": [{sort_field: "asc"}],
+            "size": batch_size,
+        }
+        while True:
+            hits = self._client.search(index=index, body=body)["hits"]["hits"]
+            yield from hits
+            if len(hits) < batch_size:
+                break
+            body["search_after"] = hits[-1]["sort"]
+
+    @observe_search("remove_from_index")
     def remove_from_index(self, index, doc_type, document_id):
         """Remove a document in the given index based on the id
         of the given model
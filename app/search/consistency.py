@@ -0,0 +1,89 @@
+"""This module contains functions to find and repair differences
+between the rows of a table and the documents in its index.
+"""
+
+import hashlib
+import json
+from elasticsearch.serializer import JSONSerializer
+from sqlalchemy.orm import joinedload
+from app.search.constants import RepairType
+
+
+_serializer = JSONSerializer()
+
+
+def content_hash(document):
+    """Return a hash of the given document. Documents are serialized
+    the same way as when they're sent to Elasticsearch so that a payload
+    and the source of its indexed document have the same hash.
+    """
+    source = json.loads(_serializer.dumps(document))
+    canonical = json.dumps(source, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def stream_database_documents(model_class, extract_fields, batch_size=1000):
+    """Yield an (id, content hash, payload) tuple for every row in the
+    table of the given model, sorted by id. Rows are loaded in batches
+    so that memory usage is constant.
+    """
+    # load the related objects used by nested fields in the same query
+    relationships = {
+        field.split(".")[0] for field in model_class.__searchable__ if "." in field
+    }
+    query = (
+        model_class.query.options(
+            *[joinedload(getattr(model_class, name)) for name in relationships]
+        )
+        .order_by(model_class.id)
+        .execution_options(stream_results=True)
+        .yield_per(batch_size)
+    )
+    for model in query:
+        payload = extract_fields(model)
+        yield model.id, content_hash(payload), payload
+
+
+def stream_index_documents(elasticsearch_client, index, batch_size=1000):
+    """Yield an (id, content hash) tuple for every document in
+    the given index, sorted by id.
+    """
+    for hit in elasticsearch_client.iterate_index(index, "id", batch_size):
+        yield int(hit["_id"]), content_hash(hit["_source"])
+
+
+def find_differences(database_documents, index_documents):
+    """Merge join the two sorted streams of documents and yield a
+    (repair type, id, payload) tuple for every document that is missing
+    from the index, differs from its row, or no longer has a row.
+    """
+    database_documents = iter(database_documents)
+    index_documents = iter(index_documents)
+    row = next(database_documents, None)
+    document = next(index_documents, None)
+    while row is not None or document is not None:
+        if document is None or (row is not None and row[0] < document[0]):
+            yield RepairType.ADD, row[0], row[2]
+            row = next(database_documents, None)
+        elif row is None or document[0] < row[0]:
+            yield RepairType.DELETE, document[0], None
+            document = next(index_documents, None)
+        else:
+            if row[1] != document[1]:
+                yield RepairType.UPDATE, row[0], row[2]
+            row = next(database_documents, None)
+            document = next(index_documents, None)
+
+
+def create_bulk_actions(index, differences):
+    """Yield the bulk API actions that repair the given differences."""
+    for repair_type, document_id, payload in differences:
+        if repair_type == RepairType.DELETE:
+            yield {"_op_type": "delete", "_index": index, "_id": document_id}
+        else:
+            yield {
+                "_op_type": "index",
+                "_index": index,
+                "_id": document_id,
+                "_source": payload,
+            }
@@ -24,3 +24,33 @@ class BooleanClause:
     MUST_NOT = "must_not"
     FILTER = "filter"
     SHOULD = "should"
+
+
+class AggregationType:
+    """Class that contains constants that represent
+    different types of Elasticsearch aggregations.
+    """
+
+    TERMS = "terms"
+    DATE_HISTOGRAM = "date_histogram"
+    RANGE = "range"
+
+
+class RepairType:
+    """Class that contains constants that represent the
+    actions needed to bring an index back in sync with
+    the database.
+    """
+
+    ADD = "add"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class SearchOperation:
+    """Class that contains constants that represent the
+    operations performed on Elasticsearch.
+    """
+
+    QUERY_INDEX = "query_index"
+    MULTI_QUERY = "multi_query"
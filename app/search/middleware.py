@@ -3,28 +3,98 @@
 
 import math
 import time
+from flask import has_request_context, request
+from sqlalchemy import inspect
 from app.search.pagination import ElasticsearchPagination
+from app.search.consistency import (
+    stream_database_documents,
+    stream_index_documents,
+    find_differences,
+    create_bulk_actions,
+)
+from app.search.constants import RepairType, SearchOperation
 from app.search.utils import getattr_nested
 
 
 class FlaskSQLAlchemyMiddleware:
     """Class that acts as middleware between FlaskSQLAlchemy and Elasticsearch."""
 
-    def __init__(self, elasticsearch_client, database):
+    def __init__(self, elasticsearch_client, database, telemetry=None):
         self._elasticsearch_client = elasticsearch_client
         self._database = database
+        self._telemetry = telemetry
 
-    def search(self, model_class, search_query):
+    def search(self, model_class, search_query, load=None):
         """Perform a search on Elasticsearch and return the corresponding objects
-        as well as the number of results.
+        as well as the number of results. If a load function is given, it is
+        called with the ids of the matched documents, in order, and what it
+        returns is used as the items instead of the objects.
         """
+        start = time.perf_counter()
         response = self._elasticsearch_client.query_index(
             model_class.__tablename__, search_query
         )
-        sql_query = self._create_query(model_class, response)
-        pagination = self._create_pagination(response, sql_query)
+        wall_time = time.perf_counter() - start
+        start = time.perf_counter()
+        if load is None:
+            items = self._create_query(model_class, response).all()
+        else:
+            items = load(response.document_ids)
+        hydration_time = time.perf_counter() - start
+        self._record(SearchOperation.QUERY_INDEX, response, wall_time, hydration_time)
+        pagination = self._create_pagination(response, items)
         return response, pagination
 
+    def multi_search(self, model_class, search_queries, load=None):
+        """Perform several searches on Elasticsearch in one request and
+        return a list of (response, pagination) pairs, one for each query.
+        The objects for all of the result sets are loaded with a single query,
+        or with a single call to the load function if one is given. It is
+        called with a list of ids and returns items that have an id.
+        Meant for pages that show the results of several searches; facets
+        are aggregations of the results query, so a results page with
+        facets only needs search.
+        """
+        start = time.perf_counter()
+        responses = self._elasticsearch_client.multi_query(
+            model_class.__tablename__, search_queries
+        )
+        wall_time = time.perf_counter() - start
+        start = time.perf_counter()
+        document_ids = set()
+        for response in responses:
+            document_ids.update(response.document_ids)
+        models = {}
+        if document_ids and load is not None:
+            models = {item.id: item for item in load(list(document_ids))}
+        elif document_ids:
+            models = {
+                model.id: model
+                for model in model_class.query.filter(
+                    model_class.id.in_(document_ids)
+                ).all()
+            }
+        hydration_time = time.perf_counter() - start
+        results = []
+        for response in responses:
+            # every search shares the time of the single request and query
+            self._record(SearchOperation.MULTI_QUERY, response, wall_time, hydration_time)
+            # preserve the order of the results from Elasticsearch
+            items = [models[id_] for id_ in response.document_ids if id_ in models]
+            results.append((response, self._create_pagination(response, items)))
+        return results
+
+    def _record(self, operation, response, wall_time, hydration_time):
+        """Record the latency of a search made from the current endpoint.
+        Times are given in seconds.
+        """
+        if self._telemetry is None:
+            return
+        endpoint = request.endpoint if has_request_context() else None
+        self._telemetry.record(
+            endpoint, operation, response, wall_time * 1000, hydration_time * 1000
+        )
+
     def _create_query(self, model_class, response):
         """Return the results from the search query as a SQLAlchemy query object"""
         if response.total == 0:
@@ -59,31 +129,121 @@ class FlaskSQLAlchemyMiddleware:
         return pagination
 
     @staticmethod
-    def extract_searchable_fields(model):
+    def extract_searchable_fields(model, fields=None):
         """Return a dictionary containing all of the 
-        searchable fields in a sqlalchemy model.
+        searchable fields in a sqlalchemy model. If a list of fields
+        is given, only those fields are included.
         """
         payload = {}
         if not hasattr(model, "__searchable__"):
             return payload
-        for field in model.__searchable__:
+        for field in fields if fields is not None else model.__searchable__:
             payload[field] = getattr_nested(model, field)
         payload["id"] = model.id
         payload["index"] = model.__tablename__
         payload["doc_type"] = model.__doctype__
         return payload
 
+    @staticmethod
+    def get_changed_searchable_fields(model):
+        """Return a list of the searchable fields of the given model
+        that have pending changes. Nested fields, such as venue.city,
+        are considered changed if any object along the path has changed.
+        Must be called before the session is flushed.
+        """
+        if not hasattr(model, "__searchable__"):
+            return []
+        # loading related objects must not flush the pending changes
+        with inspect(model).session.no_autoflush:
+            return [
+                field
+                for field in model.__searchable__
+                if FlaskSQLAlchemyMiddleware._field_has_changes(model, field)
+            ]
+
+    @staticmethod
+    def _field_has_changes(model, field):
+        """Return True if any attribute along the path of the
+        given field has pending changes.
+        """
+        *path, last_attribute = field.split(".")
+        obj = model
+        for attribute in path:
+            if FlaskSQLAlchemyMiddleware._attribute_has_changes(obj, attribute):
+                return True
+            obj = getattr(obj, attribute)
+            if obj is None:
+                return False
+        return FlaskSQLAlchemyMiddleware._attribute_has_changes(obj, last_attribute)
+
+    @staticmethod
+    def _attribute_has_changes(obj, attribute):
+        """Return True if the given mapped attribute has pending changes.
+        Attributes that aren't mapped, such as properties, never do.
+        """
+        attributes = inspect(obj).attrs
+        return attribute in attributes and attributes[attribute].history.has_changes()
+
     def before_commit(self, session):
         """Method to be called before any commits to the database. Stores all new
         objects to be added to, modified, and deleted from the database to a dictionaty
-        that will persist after the commit.
+        that will persist after the commit. Only the searchable fields that changed
+        are stored for modified objects.
         """
         extract_fields = FlaskSQLAlchemyMiddleware.extract_searchable_fields
-        session._changes = {
-            "add": [extract_fields(model) for model in session.new],
-            "update": [extract_fields(model) for model in session.dirty],
-            "delete": [extract_fields(model) for model in session.deleted],
-        }
+        new = list(session.new)
+        deleted = list(session.deleted)
+        # attribute history is reset by a flush so it has to be read first
+        updates = [
+            (model, FlaskSQLAlchemyMiddleware.get_changed_searchable_fields(model))
+            for model in session.dirty
+        ]
+        # models that store fields of their children, such as an event
+        # storing the prices of its packages, need those fields reindexed too
+        with session.no_autoflush:
+            for model in new + [model for model, _ in updates] + deleted:
+                for parent in FlaskSQLAlchemyMiddleware.get_searchable_parents(model):
+                    if parent in new or parent in deleted:
+                        continue
+                    # nested fields, such as venue.city, are only
+                    # reindexed if they changed
+                    parent_fields = [
+                        field
+                        for field in model.__searchable_parent_fields__
+                        if "." not in field
+                        or FlaskSQLAlchemyMiddleware._field_has_changes(parent, field)
+                    ]
+                    for updated_model, fields in updates:
+                        if updated_model is parent:
+                            fields.extend(f for f in parent_fields if f not in fields)
+                            break
+                    else:
+                        updates.append((parent, parent_fields))
+        # only the ids are needed to remove documents from the index
+        session._changes = {"delete": [extract_fields(model, []) for model in deleted]}
+        # flush so that new models have ids and fields computed from
+        # relationships reflect the pending changes
+        session.flush()
+        session._changes["add"] = [extract_fields(model) for model in new]
+        session._changes["update"] = [
+            extract_fields(model, fields) for model, fields in updates if fields
+        ]
+
+    @staticmethod
+    def get_searchable_parents(model):
+        """Return a list of the models whose search documents contain
+        fields from the given model. The parent attribute can refer to
+        a single model, such as a package's event, or to a collection,
+        such as a venue's events.
+        """
+        if not hasattr(model, "__searchable_parent__"):
+            return []
+        parent = getattr_nested(model, model.__searchable_parent__)
+        if parent is None:
+            return []
+        if hasattr(parent, "__searchable__"):
+            return [parent]
+        return list(parent)
 
     def after_commit(self, session):
         """Method to be called after any changes are commited to the database.
@@ -98,8 +258,8 @@ class FlaskSQLAlchemyMiddleware:
                 )
         for payload in session._changes["update"]:
             if payload:
-                self._elasticsearch_client.add_to_index(
-                    payload["index"], payload["doc_type"], payload["id"], payload
+                self._elasticsearch_client.update_partial(
+                    payload["index"], payload["id"], payload
                 )
         for payload in session._changes["delete"]:
             if payload:
@@ -108,15 +268,43 @@ class FlaskSQLAlchemyMiddleware:
                 )
         self._changes = {}
 
-    def reindex(self, model_class):
-        """Refresh an index with all of the data from this model's table."""
-        extract_fields = FlaskSQLAlchemyMiddleware.extract_searchable_fields
-        for model in model_class.query.all():
-            self._elasticsearch_client.add_to_index(
-                model_class.__tablename__, 
-                model_class.__doctype__, 
-                model.id, 
-                extract_fields(model)
-            )
-            time.sleep(1)
+    def reindex(self, model_class, batch_size=1000):
+        """Refresh an index with all of the data from this model's table.
+        Rows are streamed in batches and indexed with the bulk API.
+        Returns the number of indexed documents.
+        """
+        documents = stream_database_documents(
+            model_class, self.extract_searchable_fields, batch_size
+        )
+        return self._elasticsearch_client.bulk(
+            create_bulk_actions(
+                model_class.__tablename__,
+                (
+                    (RepairType.ADD, document_id, payload)
+                    for document_id, _, payload in documents
+                ),
+            ),
+            chunk_size=batch_size,
+        )
 
+    def find_index_differences(self, model_class, batch_size=1000):
+        """Yield a (repair type, id, payload) tuple for every difference
+        between the table of the given model and its index. Both are
+        streamed in id order so memory usage is constant.
+        """
+        return find_differences(
+            stream_database_documents(
+                model_class, self.extract_searchable_fields, batch_size
+            ),
+            stream_index_documents(
+                self._elasticsearch_client, model_class.__tablename__, batch_size
+            ),
+        )
+
+    def repair_index(self, model_class, differences):
+        """Apply the given differences to the index of the given model
+        with the bulk API and return the number of repaired documents.
+        """
+        return self._elasticsearch_client.bulk(
+            create_bulk_actions(model_class.__tablename__, differences)
+        )
@@ -22,6 +22,14 @@ class Query(ABC):
         """Update the value of either the from or size pagination fields."""
         self._query["query"][field] = value
 
+    def add_aggregation(self, name, aggregation_type, field, **options):
+        """Add a named aggregation on the given field. The aggregation is
+        computed in the same request as the search results.
+        """
+        aggregation = {"field": field}
+        aggregation.update(options)
+        self._query.setdefault("aggs", {})[name] = {aggregation_type: aggregation}
+
     def to_dict(self):
         """Return the match query object as a dictionary."""
         return self._query
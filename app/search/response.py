@@ -20,12 +20,18 @@ class SearchResponse:
         self.shards = results["_shards"]
         self.max_score = results["hits"]["max_score"]
         self.document_ids = self._extract_document_ids(results["hits"]["hits"])
-
+        self.aggregations = results.get("aggregations", {})
 
     def _extract_document_ids(self, hits):
         """Return a list of ids from the documents matched in the search query."""
         return [int(hit["_id"]) for hit in hits]
 
+    def buckets(self, name):
+        """Return the buckets of the given aggregation. An empty list
+        is returned if the aggregation wasn't part of the query.
+        """
+        return self.aggregations.get(name, {}).get("buckets", [])
+
     def to_dict__(self):
         """Return the elasticsearch response as a dictionary."""
         return self._results
@@ -0,0 +1,152 @@
+"""This module contains classes to record how long searches
+take and to keep track of the slowest ones.
+"""
+
+import bisect
+import copy
+import heapq
+import itertools
+import threading
+from datetime import datetime
+
+
+# upper bounds of the histogram buckets in milliseconds
+LATENCY_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class Histogram:
+    """Class to represent a histogram of observed values."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        """Add the given value to the histogram."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self):
+        """Return the histogram as a dictionary. Bucket counts are
+        cumulative like Prometheus histograms.
+        """
+        labels = [str(bucket) for bucket in self.buckets] + ["+Inf"]
+        return {
+            "buckets": dict(zip(labels, itertools.accumulate(self.counts))),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+class EndpointStats:
+    """Class to hold the search statistics of a single endpoint."""
+
+    def __init__(self):
+        self.searches = 0
+        self.hits = 0
+        self.zero_results = 0
+        self.wall_time = Histogram()
+        self.took = Histogram()
+        self.hydration_time = Histogram()
+
+    def to_dict(self):
+        """Return the statistics as a dictionary."""
+        return {
+            "searches": self.searches,
+            "hits": self.hits,
+            "zero_results": self.zero_results,
+            "wall_time": self.wall_time.to_dict(),
+            "took": self.took.to_dict(),
+            "hydration_time": self.hydration_time.to_dict(),
+        }
+
+
+class SearchTelemetry:
+    """Class to record the latency of searches per endpoint. The
+    client wall time, the time Elasticsearch reports that it took and
+    the time spent loading the results from the database are recorded
+    separately. The slowest searches are kept along with their queries,
+    and searches slower than the threshold are logged.
+    """
+
+    def __init__(self, slow_query_threshold=None, max_slow_queries=50, logger=None):
+        if max_slow_queries < 0:
+            raise ValueError("max_slow_queries can't be negative")
+        self.slow_query_threshold = slow_query_threshold
+        self.max_slow_queries = max_slow_queries
+        self.logger = logger
+        self._endpoints = {}
+        self._slow_queries = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, operation, response, wall_time, hydration_time):
+        """Record a search made from the given endpoint. Times
+        are in milliseconds.
+        """
+        endpoint = endpoint or "unknown"
+        total_time = wall_time + hydration_time
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, EndpointStats())
+            stats.searches += 1
+            stats.hits += response.total
+            if response.total == 0:
+                stats.zero_results += 1
+            stats.wall_time.observe(wall_time)
+            stats.took.observe(response.took)
+            stats.hydration_time.observe(hydration_time)
+            # min heap so that the fastest of the slow queries is replaced first
+            if self.max_slow_queries and (
+                len(self._slow_queries) < self.max_slow_queries
+                or total_time > self._slow_queries[0][0]
+            ):
+                entry = {
+                    "endpoint": endpoint,
+                    "operation": operation,
+                    "total_time": total_time,
+                    "wall_time": wall_time,
+                    "took": response.took,
+                    "hydration_time": hydration_time,
+                    "hits": response.total,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "query": copy.deepcopy(response.query.to_dict()),
+                }
+                item = (total_time, next(self._counter), entry)
+                if len(self._slow_queries) < self.max_slow_queries:
+                    heapq.heappush(self._slow_queries, item)
+                else:
+                    heapq.heapreplace(self._slow_queries, item)
+        if (
+            self.logger is not None
+            and self.slow_query_threshold is not None
+            and total_time >= self.slow_query_threshold
+        ):
+            self.logger.warning(
+                "Slow search on %s: %.1fms total (%.1fms wall, %sms took, "
+                "%.1fms hydration), %s hits, query: %s",
+                endpoint,
+                total_time,
+                wall_time,
+                response.took,
+                hydration_time,
+                response.total,
+                response.query.to_dict(),
+            )
+
+    def slowest_queries(self):
+        """Return the slowest searches recorded, slowest first."""
+        with self._lock:
+            return [entry for _, _, entry in sorted(self._slow_queries, reverse=True)]
+
+    def to_dict(self):
+        """Return the statistics of every endpoint and the slowest
+        searches as a dictionary.
+        """
+        with self._lock:
+            endpoints = {
+                endpoint: stats.to_dict() for endpoint, stats in self._endpoints.items()
+            }
+        return {"endpoints": endpoints, "slowest_queries": self.slowest_queries()}
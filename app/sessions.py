@@ -0,0 +1,177 @@
+"""This module contains a session interface that keeps the contents of
+sessions on the server and only sends browsers a random session id.
+
+Signed cookie sessions grow with everything the views store in them,
+e.g. the pending orders of a sponsor, and every request pays to verify
+and decode them. Server-side sessions are stored in a SQLite file that
+the workers on a host share, or in Redis when SESSION_REDIS_URL is set.
+Sessions expire once they haven't been used for their timeout, and
+expired sessions are deleted from the SQLite file whenever a session
+is saved.
+"""
+
+
+import pickle
+import re
+import secrets
+import time
+from flask import session as flask_session
+from flask.sessions import SecureCookieSession, SessionInterface
+from flask_login import user_logged_in
+from app.cache import SQLiteCache
+
+
+SESSION_KEY_PREFIX = "session:"
+SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{32}")
+
+
+def create_session_id():
+    """Return a new random session id."""
+    return secrets.token_urlsafe(24)
+
+
+class ServerSideSession(SecureCookieSession):
+    """Session whose contents are stored on the server under its id.
+    The id is None until the session is saved for the first time.
+    """
+
+    def __init__(self, initial=None, sid=None, saved_at=None):
+        super().__init__(initial)
+        self.sid = sid
+        self.saved_at = saved_at
+        self.new = sid is None
+        self.previous_sid = None
+
+    def regenerate(self):
+        """Move the session to a new id, e.g. once the user logs in,
+        so that an id someone else knew no longer refers to it.
+        """
+        if self.sid is not None:
+            self.previous_sid = self.previous_sid or self.sid
+            self.sid = None
+        self.modified = True
+
+
+class RedisSessionStore:
+    """Session store kept in Redis, which expires the sessions itself."""
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        """Return the value stored under key, or None if there isn't one."""
+        value = self.client.get(key)
+        if value is None:
+            return None
+        return pickle.loads(value)
+
+    def set(self, key, value, timeout):
+        """Store the value under key for timeout seconds."""
+        self.client.set(key, pickle.dumps(value), ex=max(1, round(timeout)))
+
+    def delete(self, key):
+        """Delete the value stored under key, if there is one."""
+        self.client.delete(key)
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Session interface that stores sessions in a store with get,
+    set and delete methods, like SQLiteCache or RedisSessionStore.
+    The session cookie only holds the id, and is only sent when the
+    id changes or a permanent session's expiry is pushed back.
+
+    A session that is used but not changed is saved again once half of
+    its timeout has passed, so that active sessions don't expire.
+    """
+
+    session_class = ServerSideSession
+
+    def __init__(self, store, timeout):
+        self.store = store
+        self.timeout = timeout
+
+    def get_timeout(self, app, session):
+        """Return the seconds the session is kept after it is saved."""
+        if session.permanent:
+            return app.permanent_session_lifetime.total_seconds()
+        return self.timeout
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(app.session_cookie_name)
+        # ids that can't be ours, e.g. old signed cookies, aren't looked up
+        if sid and SESSION_ID_PATTERN.fullmatch(sid):
+            stored = self.store.get(SESSION_KEY_PREFIX + sid)
+            if stored is not None:
+                saved_at, data = stored
+                return self.session_class(data, sid, saved_at)
+        return self.session_class()
+
+    def save_session(self, app, session, response):
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.previous_sid is not None:
+            self.store.delete(SESSION_KEY_PREFIX + session.previous_sid)
+
+        # an emptied session is deleted along with its cookie
+        if not session:
+            if session.modified:
+                if session.sid is not None:
+                    self.store.delete(SESSION_KEY_PREFIX + session.sid)
+                response.delete_cookie(
+                    app.session_cookie_name, domain=domain, path=path
+                )
+            return
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        now = time.time()
+        timeout = self.get_timeout(app, session)
+        stale = session.saved_at is not None and now - session.saved_at > timeout / 2
+        if not (session.modified or stale):
+            return
+
+        set_cookie = session.sid is None or (
+            session.permanent and app.config["SESSION_REFRESH_EACH_REQUEST"]
+        )
+        if session.sid is None:
+            session.sid = create_session_id()
+        self.store.set(
+            SESSION_KEY_PREFIX + session.sid, (now, dict(session)), timeout=timeout
+        )
+        if set_cookie:
+            response.set_cookie(
+                app.session_cookie_name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+
+def regenerate_session(app, user):
+    """Move the session of a user who just logged in to a new id."""
+    flask_session.regenerate()
+
+
+def init_sessions(app):
+    """Store sessions in Redis at SESSION_REDIS_URL if it is set, or
+    else in the SQLite file at SESSION_STORE_PATH. Sessions are kept
+    in signed cookies when neither is set.
+    """
+    redis_url = app.config["SESSION_REDIS_URL"]
+    path = app.config["SESSION_STORE_PATH"]
+    timeout = app.config["SESSION_STORE_TIMEOUT"]
+    if redis_url:
+        store = RedisSessionStore(redis_url)
+    elif path:
+        store = SQLiteCache(path, timeout)
+    else:
+        return
+    app.session_interface = ServerSideSessionInterface(store, timeout)
+    user_logged_in.connect(regenerate_session, app)
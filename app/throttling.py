@@ -0,0 +1,191 @@
+"""This module contains the rate limiter that throttles attempts at
+actions that are expensive or send emails, like logging in, so that
+repeated attempts are turned away before a password is checked or an
+email is sent.
+
+Attempts are counted in a sliding window, by the client's IP address
+and by the account they are made on. Each worker counts the attempts
+it sees in memory, and workers on a host also share their counts in a
+SQLite file when RATE_LIMIT_STORE_PATH is set. The in-memory counts
+are checked first, so a client a worker already knows to be over its
+limit is turned away without touching the file.
+"""
+
+
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from flask import current_app, request
+from werkzeug.exceptions import TooManyRequests
+from app.cache import _Transaction
+from app.error_handlers import RetryAfterMixin
+
+
+class RateLimitExceeded(RetryAfterMixin, TooManyRequests):
+    """Raised when a client has used up the attempts it is allowed."""
+
+    description = "You've made too many attempts. Please try again later."
+
+    def __init__(self, retry_after):
+        super().__init__()
+        self.retry_after = retry_after
+
+
+class MemoryRateLimitStore:
+    """Thread-safe store of the times of recent attempts, by key. The
+    least recently used keys are forgotten once it holds max_keys.
+    """
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._attempts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, window):
+        """Record an attempt under key and return 0 if fewer than limit
+        were made in the last window seconds. Otherwise return the
+        seconds until the oldest of them leaves the window.
+        """
+        now = time.time()
+        with self._lock:
+            attempts = self._recent(key, now - window)
+            if len(attempts) >= limit:
+                return attempts[0] + window - now
+            attempts.append(now)
+            return 0
+
+    def retry_after(self, key, limit, window):
+        """Return the seconds until an attempt under key is allowed,
+        or 0 if it is, without recording one.
+        """
+        now = time.time()
+        with self._lock:
+            attempts = self._recent(key, now - window)
+            if len(attempts) >= limit:
+                return attempts[-limit] + window - now
+            return 0
+
+    def add(self, key):
+        """Record an attempt under key that was allowed elsewhere."""
+        with self._lock:
+            self._recent(key, 0).append(time.time())
+
+    def _recent(self, key, since):
+        attempts = self._attempts.get(key)
+        if attempts is None:
+            attempts = self._attempts[key] = deque()
+            while len(self._attempts) > self.max_keys:
+                self._attempts.popitem(last=False)
+        else:
+            self._attempts.move_to_end(key)
+        while attempts and attempts[0] <= since:
+            attempts.popleft()
+        return attempts
+
+
+class SQLiteRateLimitStore:
+    """Store of the times of recent attempts in a SQLite file, so that
+    every worker process on the host counts the same attempts.
+    Attempts are deleted once they leave their window.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # WAL lets workers read while another one writes
+        connection = sqlite3.connect(self.path, timeout=5)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.close()
+        with self._connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS attempts "
+                "(key TEXT NOT NULL, time REAL NOT NULL, expires REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_attempts_key_time ON attempts (key, time)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_attempts_expires ON attempts (expires)"
+            )
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        return _Transaction(connection, write=True)
+
+    def hit(self, key, limit, window):
+        """Record an attempt under key and return 0 if fewer than limit
+        were made in the last window seconds. Otherwise return the
+        seconds until the oldest of them leaves the window.
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("DELETE FROM attempts WHERE expires <= ?", (now,))
+            count, oldest = connection.execute(
+                "SELECT COUNT(*), MIN(time) FROM attempts WHERE key = ? AND time > ?",
+                (key, now - window),
+            ).fetchone()
+            if count >= limit:
+                return oldest + window - now
+            connection.execute(
+                "INSERT INTO attempts (key, time, expires) VALUES (?, ?, ?)",
+                (key, now, now + window),
+            )
+            return 0
+
+
+class RateLimiter:
+    """Class that counts attempts in the shared store, if there is one,
+    and in memory. Attempts the in-memory counts are already over the
+    limit for aren't counted again.
+    """
+
+    def __init__(self, shared_store=None, max_keys=10000):
+        self.local_store = MemoryRateLimitStore(max_keys)
+        self.shared_store = shared_store
+
+    def hit(self, key, limit, window):
+        """Record an attempt under key and return 0 if it is allowed,
+        or else the seconds until one will be.
+        """
+        if self.shared_store is None:
+            return self.local_store.hit(key, limit, window)
+        # the attempts this worker saw are some of those all of them saw
+        retry_after = self.local_store.retry_after(key, limit, window)
+        if retry_after:
+            return retry_after
+        retry_after = self.shared_store.hit(key, limit, window)
+        if not retry_after:
+            self.local_store.add(key)
+        return retry_after
+
+
+def throttle(action, account=None):
+    """Count an attempt at the action by the client's IP address and,
+    if given, on the account. Raises RateLimitExceeded if either has
+    used up the attempts RATE_LIMITS allows it.
+    """
+    limiter = current_app.rate_limiter
+    if limiter is None:
+        return
+    limits = current_app.config["RATE_LIMITS"][action]
+    scopes = [("ip", request.remote_addr)]
+    if account is not None:
+        scopes.append(("account", str(account).lower()))
+    for scope, value in scopes:
+        limit, window = limits[scope]
+        retry_after = limiter.hit("%s:%s:%s" % (action, scope, value), limit, window)
+        if retry_after:
+            raise RateLimitExceeded(max(1, math.ceil(retry_after)))
+
+
+def init_rate_limiting(app):
+    """Give the application a rate limiter that shares its counts in
+    the SQLite file at RATE_LIMIT_STORE_PATH, if it is set. Attempts
+    aren't limited when RATE_LIMIT_ENABLED is off.
+    """
+    if not app.config["RATE_LIMIT_ENABLED"]:
+        app.rate_limiter = None
+        return
+    path = app.config["RATE_LIMIT_STORE_PATH"]
+    app.rate_limiter = RateLimiter(SQLiteRateLimitStore(path) if path else None)
@@ -3,6 +3,12 @@ to be used in the application.
 """
 
 
-from app.utils.decorators import permission_required, admin_required
+from app.utils.decorators import (
+    permission_required,
+    admin_required,
+    read_only,
+    cached_page,
+    conditional,
+)
 from app.utils.email import send_email
 
@@ -2,8 +2,16 @@
 the application.
 """
 import functools
-from flask import abort
+from flask import abort, current_app, g, make_response, request
 from flask_login import current_user
+from app.cache import (
+    can_cache_page,
+    can_serve_cached_page,
+    can_validate_request,
+    is_not_modified,
+    make_etag,
+    page_cache_key,
+)
 from app.models.roles import Permission
 
 
@@ -24,3 +32,87 @@ def permission_required(permission):
 def admin_required(func):
     """Check if the user has admim permissions."""
     return permission_required(Permission.ADMIN)(func)
+
+
+def read_only(func):
+    """Mark a view as read-only so that the queries it runs for GET
+    and HEAD requests can be served by a read replica.
+    """
+    @functools.wraps(func)
+    def decorated_function(*args, **kwargs):
+        if request.method in ("GET", "HEAD"):
+            g.read_only = True
+        return func(*args, **kwargs)
+    return decorated_function
+
+
+def cached_page(*tags):
+    """Serve the view from the page cache to anonymous visitors and
+    store its response there with the given tags. The tags are formatted
+    with the view's arguments, e.g. "event:{id}", and the view can add
+    more with tag_page.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def decorated_function(*args, **kwargs):
+            if not can_serve_cached_page():
+                return func(*args, **kwargs)
+            key = page_cache_key()
+            cached = current_app.page_cache.get(key)
+            if cached is not None:
+                response = current_app.response_class(**cached)
+                response.headers["X-Page-Cache"] = "HIT"
+                return response
+            g.page_cache_tags = {tag.format(**kwargs) for tag in tags}
+            try:
+                response = make_response(func(*args, **kwargs))
+            finally:
+                page_tags = g.pop("page_cache_tags")
+            if can_cache_page(response):
+                current_app.page_cache.set(
+                    key,
+                    {
+                        "response": response.get_data(),
+                        "status": response.status_code,
+                        "headers": list(response.headers),
+                    },
+                    page_tags,
+                )
+            response.headers["X-Page-Cache"] = "MISS"
+            return response
+        return decorated_function
+    return decorator
+
+
+
+def conditional(validators):
+    """Answer conditional GET requests for the view with 304 Not Modified,
+    without running it, when nothing the page shows has changed.
+    validators is called with the view's arguments and returns a tuple of
+    values that change whenever the page does along with the time it
+    last changed, or None to always run the view.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def decorated_function(*args, **kwargs):
+            if not can_validate_request():
+                return func(*args, **kwargs)
+            page_validators = validators(*args, **kwargs)
+            if page_validators is None:
+                return func(*args, **kwargs)
+            parts, last_modified = page_validators
+            etag = make_etag(*parts)
+            if is_not_modified(etag, last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(func(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.last_modified = last_modified
+            # browsers have to revalidate before showing their copy
+            response.cache_control.no_cache = True
+            response.vary.add("Cookie")
+            return response
+        return decorated_function
+    return decorator
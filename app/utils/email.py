@@ -5,14 +5,19 @@ from threading import Thread
 from flask import current_app, render_template
 from flask_mail import Message
 from app.extensions import mail
+from app.metrics import EMAIL_ERRORS, EMAIL_QUEUE_DEPTH, EMAIL_SEND_LATENCY
 
 
 def send_async_email(app, msg):
     """Helper function to send asynchronous email"""
     # applcation context needs to be manually pushed since it is
     # thread local
-    with app.app_context():
-        mail.send(msg)
+    try:
+        with app.app_context(), EMAIL_ERRORS.count_exceptions():
+            with EMAIL_SEND_LATENCY.time():
+                mail.send(msg)
+    finally:
+        EMAIL_QUEUE_DEPTH.dec()
 
 
 def send_email(to, subject, template, **kwargs):
@@ -27,5 +32,6 @@ def send_email(to, subject, template, **kwargs):
     msg.body = render_template(template + ".txt", **kwargs)
     msg.html = render_template(template + ".html", **kwargs)
     thread = Thread(target=send_async_email, args=[app, msg])
+    EMAIL_QUEUE_DEPTH.inc()
     thread.start()
     return thread
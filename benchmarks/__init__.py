@@ -0,0 +1,4 @@
+"""This package contains benchmarks for performance sensitive
+parts of the application. They are run as modules from the root
+directory of the project, e.g. python -m benchmarks.search_indexing
+"""
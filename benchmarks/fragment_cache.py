@@ -0,0 +1,49 @@
+"""This module contains a benchmark that compares the time needed to
+render the event card grid with and without the fragment cache.
+"""
+
+
+import time
+import click
+from flask import render_template
+from app import create_app
+from app.cache import LRUCache
+from app.extensions import db
+from app.models import Event, event_cards
+from benchmarks.listing_projection import seed_database
+
+
+def measure(label, app, cards, renders):
+    """Render the card grid the given number of times and report the
+    average time each render took.
+    """
+    start = time.perf_counter()
+    for _ in range(renders):
+        html = render_template("events/_events.html", events=cards)
+    seconds = (time.perf_counter() - start) / renders
+    click.echo(f"{label:<16}{len(cards):>8} cards {seconds * 1000:>10.2f}ms per render")
+    return html
+
+
+@click.command()
+@click.option("--events", default=12, help="Number of cards on the page.")
+@click.option("--renders", default=1000, help="Number of times to render the page.")
+def benchmark(events, renders):
+    """Seed an in memory database with events, then render their cards
+    without the fragment cache and with a warm one.
+    """
+    app = create_app("testing", False)
+    with app.app_context(), app.test_request_context():
+        seed_database(events, description_size=10)
+        cards = event_cards(Event.is_ongoing()).all()
+        app.jinja_env.fragment_cache = None
+        uncached = measure("no cache", app, cards, renders)
+        app.jinja_env.fragment_cache = LRUCache(events)
+        cached = measure("fragment cache", app, cards, renders)
+        assert uncached == cached
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,214 @@
+"""This module contains micro-benchmarks of the model and service
+functions that every page view goes through. They are run on events
+seeded in an in memory database, and their results can be saved as
+JSON and compared with the results of another commit, e.g.
+
+    python -m benchmarks.hot_paths --json before.json
+    python -m benchmarks.hot_paths --compare before.json
+
+The comparison exits with an error when a benchmark got slower by more
+than the threshold, so that it can be run before deploying.
+"""
+
+
+import itertools
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+import click
+from app import create_app
+from app.blueprints.events.services import validate_order
+from app.blueprints.payments.services import process_order
+from app.extensions import db
+from app.forms import AbstractForm
+from app.models import Event, Package, Role, User
+from app.search import FlaskSQLAlchemyMiddleware
+from app.search.pagination import ElasticsearchPagination
+from benchmarks.listing_projection import insert_in_chunks, seed_database
+
+
+PACKAGES_PER_EVENT = 4
+
+
+def seed(num_events):
+    """Seed the database with live events that have a main image and
+    packages, and a sponsor. Returns an event and the sponsor.
+    """
+    seed_database(num_events, description_size=2000)
+    insert_in_chunks(
+        Package.__table__,
+        (
+            {
+                "name": "Package %d" % package,
+                "price": 250 * package,
+                "audience": "Everyone",
+                "description": "Description",
+                "num_purchased": 0,
+                "available_packages": 10 ** 6,
+                "package_type": "Cash",
+                "event_id": number,
+            }
+            for number in range(1, num_events + 1)
+            for package in range(1, PACKAGES_PER_EVENT + 1)
+        ),
+    )
+    sponsor = User(
+        first_name="Bench",
+        last_name="Sponsor",
+        company="Sponsor Corp",
+        email="sponsor@example.com",
+        password="password",
+        role=Role.query.filter_by(name="Sponsor").first(),
+    )
+    db.session.add(sponsor)
+    db.session.commit()
+    return Event.query.get(num_events // 2 or 1), sponsor
+
+
+def create_benchmarks(event, sponsor):
+    """Return (name, function) pairs of the code to time."""
+    organizer = event.user
+    package_ids = [package.id for package in event.packages]
+    pagination = ElasticsearchPagination.create(True, True, 10000, 5, 10, [])
+    sponsor_ids = itertools.count(sponsor.id + 1)
+    titles = itertools.cycle(["Title A", "Title B"])
+
+    def before_commit():
+        event.title = next(titles)
+        middleware.before_commit(db.session)
+
+    def place_order():
+        # a new sponsor every time, since a package can only be bought once
+        process_order(
+            [
+                {
+                    "package_id": package_ids[0],
+                    "event_id": event.id,
+                    "sponsor_id": next(sponsor_ids),
+                }
+            ],
+            db.session,
+        )
+
+    middleware = FlaskSQLAlchemyMiddleware(None, db)
+    return [
+        ("Event.main_image", event.main_image),
+        ("Event.price_range", event.price_range),
+        (
+            "User.get_events_by_status",
+            lambda: organizer.get_events_by_status("live"),
+        ),
+        (
+            "extract_searchable_fields",
+            lambda: middleware.extract_searchable_fields(event),
+        ),
+        ("before_commit", before_commit),
+        (
+            "convert_choice_to_value",
+            lambda: AbstractForm.convert_choice_to_value(44, "STATES"),
+        ),
+        (
+            "convert_choice_to_value TIMES",
+            lambda: AbstractForm.convert_choice_to_value(20, "TIMES"),
+        ),
+        ("ElasticsearchPagination.iter_pages", lambda: list(pagination.iter_pages())),
+        (
+            "validate_order",
+            lambda: validate_order(event.id, {"ids": package_ids}, sponsor),
+        ),
+        ("process_order", place_order),
+    ]
+
+
+def measure(function, repeat):
+    """Return the loops per timing and the minimum and median
+    microseconds per call of the given function.
+    """
+    timer = timeit.Timer(function)
+    loops, _ = timer.autorange()
+    timings = [seconds / loops * 10 ** 6 for seconds in timer.repeat(repeat, loops)]
+    return {
+        "loops": loops,
+        "min_us": round(min(timings), 3),
+        "median_us": round(statistics.median(timings), 3),
+    }
+
+
+def current_commit():
+    """Return the hash of the checked out commit, or None outside of git."""
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print how much each benchmark changed since the baseline and
+    return the names of those that got slower by more than the threshold.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        change = result["min_us"] / baseline[name]["min_us"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        click.echo(
+            f"{name:<36}{baseline[name]['min_us']:>12.2f}us"
+            f"{result['min_us']:>12.2f}us{change:>+9.1%}{flag}"
+        )
+    return regressions
+
+
+@click.command()
+@click.option("--events", default=1000, help="Number of events in the database.")
+@click.option("--repeat", default=5, help="Timings to take of each benchmark.")
+@click.option("--json", "json_path", help="File to write the results to.")
+@click.option("--compare", "baseline_path", help="Results to compare against.")
+@click.option("--threshold", default=0.2, help="Slowdown that counts as a regression.")
+def benchmark(events, repeat, json_path, baseline_path, threshold):
+    """Time the hot paths and report the minimum and median time per call."""
+    app = create_app("testing", False)
+    with app.test_request_context():
+        event, sponsor = seed(events)
+        results = {}
+        for name, function in create_benchmarks(event, sponsor):
+            results[name] = measure(function, repeat)
+            click.echo(
+                f"{name:<36}{results[name]['min_us']:>12.2f}us min"
+                f"{results[name]['median_us']:>12.2f}us median"
+                f"{results[name]['loops']:>10} loops"
+            )
+        db.session.rollback()
+        db.session.remove()
+        db.drop_all()
+    if json_path:
+        with open(json_path, "w") as file:
+            json.dump(
+                {
+                    "commit": current_commit(),
+                    "python": platform.python_version(),
+                    "events": events,
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+    if baseline_path:
+        with open(baseline_path) as file:
+            baseline = json.load(file)
+        click.echo(f"\nCompared with {baseline.get('commit') or baseline_path}")
+        regressions = compare(results, baseline["results"], threshold)
+        if regressions:
+            sys.exit("Slower than the baseline: " + ", ".join(regressions))
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,176 @@
+"""This module contains a benchmark that compares the time and memory
+needed to list events as full ORM objects against the EventCard
+projection used by the listing pages.
+"""
+
+
+import itertools
+import time
+import tracemalloc
+import click
+from datetime import datetime, timedelta
+from app import create_app
+from app.extensions import db
+from app.models import (
+    Event,
+    EventCategory,
+    EventType,
+    Image,
+    ImageType,
+    Role,
+    User,
+    Venue,
+    event_cards,
+)
+
+
+CHUNK_SIZE = 5000
+
+
+def insert_in_chunks(table, rows):
+    """Insert the rows generated by the given iterator in chunks."""
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, CHUNK_SIZE))
+        if not chunk:
+            break
+        db.session.execute(table.insert(), chunk)
+
+
+def seed_database(num_events, description_size):
+    """Insert live events with a venue, a main image and long text columns."""
+    db.create_all()
+    Role.insert_roles()
+    ImageType.insert_image_types()
+    EventType.insert_event_types()
+    EventCategory.insert_event_categories()
+    now = datetime.now()
+    text = "x" * description_size
+    main_image = ImageType.query.filter_by(name="Main Event Image").first()
+    user = User(
+        first_name="Bench",
+        last_name="Mark",
+        company="Benchmark Corp",
+        email="benchmark@example.com",
+        password="password",
+        role=Role.query.filter_by(name="Event Organizer").first(),
+    )
+    db.session.add(user)
+    db.session.flush()
+    insert_in_chunks(
+        Venue.__table__,
+        (
+            {
+                "id": number,
+                "name": "Venue %d" % number,
+                "address": "%d Main Street" % number,
+                "city": "Scottsdale",
+                "state": "AZ",
+                "zip_code": "12345",
+            }
+            for number in range(1, num_events + 1)
+        ),
+    )
+    insert_in_chunks(
+        Event.__table__,
+        (
+            {
+                "id": number,
+                "title": "Event %d" % number,
+                "start_datetime": now,
+                "end_datetime": now + timedelta(days=1),
+                "description": text,
+                "pitch": text,
+                "published": True,
+                "status": "live",
+                "user_id": user.id,
+                "venue_id": number,
+                "event_type_id": EventType.query.first().id,
+                "event_category_id": EventCategory.query.first().id,
+            }
+            for number in range(1, num_events + 1)
+        ),
+    )
+    insert_in_chunks(
+        Image.__table__,
+        (
+            {
+                "path": "app/static/images/event%d.jpg" % number,
+                "uploaded_at": now,
+                "image_type_id": main_image.id,
+                "event_id": number,
+            }
+            for number in range(1, num_events + 1)
+        ),
+    )
+    db.session.commit()
+
+
+def render_orm():
+    """Load events the way the listing pages used to and read the
+    values a card shows.
+    """
+    return [
+        (
+            event.main_image(),
+            event.id,
+            event.title,
+            event.start_date("%a, %b %-d"),
+            event.venue.city,
+            event.venue.state,
+        )
+        for event in Event.query.filter(Event.is_ongoing()).all()
+    ]
+
+
+def render_cards():
+    """Load event cards and read the values a card shows."""
+    return [
+        (
+            card.main_image,
+            card.id,
+            card.title,
+            card.start_date("%a, %b %-d"),
+            card.city,
+            card.state,
+        )
+        for card in event_cards(Event.is_ongoing()).all()
+    ]
+
+
+def measure(label, function):
+    """Run the given function in a fresh session and report how long it
+    took and the peak memory it allocated.
+    """
+    db.session.remove()
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = function()
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    click.echo(
+        f"{label:<16}{len(rows):>8} rows {seconds:>8.2f}s {peak / 2 ** 20:>8.1f} MiB peak"
+    )
+    return rows
+
+
+@click.command()
+@click.option("--events", default=10000, help="Number of events to list.")
+@click.option("--description-size", default=2000, help="Characters per text column.")
+def benchmark(events, description_size):
+    """Seed an in memory database with events, then compare listing
+    them as ORM objects against listing them as event cards.
+    """
+    app = create_app("testing", False)
+    with app.app_context():
+        seed_database(events, description_size)
+        orm_rows = measure("orm", render_orm)
+        card_rows = measure("event cards", render_cards)
+        assert sorted(orm_rows) == sorted(card_rows)
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    benchmark()
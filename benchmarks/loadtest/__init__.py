@@ -0,0 +1,9 @@
+"""This package contains a load test of the main user journeys:
+visitors browsing and searching for events, organizers checking their
+dashboards and sponsors buying packages. It seeds a database with a
+deterministic generator, serves it with gunicorn, with an in memory
+stand-in for Elasticsearch and a stub for Stripe, and reports the
+throughput and latency of each endpoint, e.g.
+
+    python -m benchmarks.loadtest --users 20 --duration 30 --json report.json
+"""
@@ -0,0 +1,224 @@
+"""This module runs the load test: it seeds a database, serves the
+application from it with gunicorn and sends the journeys of the virtual
+users to it, then reports the throughput and latency of each endpoint.
+"""
+
+
+import json
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import click
+from app import create_app
+from app.extensions import db
+from benchmarks.loadtest.journeys import USER_CLASSES, Recorder
+from benchmarks.loadtest.seed import seed_database
+from benchmarks.worker_classes import ROOT, free_port, wait_until_listening
+
+
+def seed(config_name, database_url, num_events, num_sponsors, seed_value):
+    """Seed the database and return what the journeys need to know
+    about the data.
+    """
+    app = create_app(config_name, False)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    with app.app_context():
+        dataset = seed_database(num_events, num_sponsors, seed_value)
+        db.session.remove()
+    return dataset
+
+
+def serve(port, config_name, database_url, worker_class, workers, stripe_latency):
+    """Start gunicorn with the load test application and return its process."""
+    environment = dict(
+        os.environ,
+        FLASK_CONFIG=config_name,
+        DATABASE_URL=database_url,
+        DEV_DATABASE_URL=database_url,
+        PAGE_CACHE_PATH="",
+        # every virtual user logs in from the same address
+        RATE_LIMIT_ENABLED="false",
+        GUNICORN_BIND="127.0.0.1:%d" % port,
+        GUNICORN_WORKER_CLASS=worker_class,
+        GUNICORN_WORKERS=str(workers),
+        LOADTEST_STRIPE_LATENCY=str(stripe_latency),
+    )
+    return subprocess.Popen(
+        [
+            "gunicorn",
+            "-c",
+            "gunicorn.conf.py",
+            "benchmarks.loadtest.server:create_server_app()",
+        ],
+        cwd=ROOT,
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def create_users(num_users, base_url, dataset, recorder, seed_value):
+    """Return the virtual users, a mix of visitors, organizers and
+    sponsors picked by the weights in USER_CLASSES. There is at least
+    one of each when there are enough users.
+    """
+    rng = random.Random(seed_value)
+    weights, classes = zip(*USER_CLASSES)
+    user_classes = list(classes[:num_users])
+    user_classes += rng.choices(classes, weights, k=num_users - len(user_classes))
+    return [
+        user_class(
+            number, base_url, dataset, recorder, random.Random(f"{seed_value}-{number}")
+        )
+        for number, user_class in enumerate(user_classes, 1)
+    ]
+
+
+def run_users(users, deadline, think_time):
+    """Run each virtual user in its own thread until the deadline.
+    Users wait for a random time around the think time between journeys.
+    """
+
+    def run(user):
+        user.start()
+        while time.time() < deadline:
+            user.take_journey()
+            if think_time:
+                time.sleep(user.rng.expovariate(1 / think_time))
+
+    threads = [threading.Thread(target=run, args=(user,)) for user in users]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def percentile(latencies, fraction):
+    """Return the latency that the given fraction of the sorted
+    latencies are at or below.
+    """
+    if not latencies:
+        return 0
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+
+def summarize(recorder, duration):
+    """Return the number of requests, errors, requests per second and
+    latency percentiles of each endpoint and of all of them.
+    """
+    names = sorted(set(recorder.latencies) | set(recorder.errors))
+    latencies = {name: sorted(recorder.latencies.get(name, [])) for name in names}
+    latencies["total"] = sorted(
+        latency for name in names for latency in latencies[name]
+    )
+    errors = dict(recorder.errors, total=sum(recorder.errors.values()))
+    return {
+        name: {
+            "requests": len(latencies[name]) + errors.get(name, 0),
+            "errors": errors.get(name, 0),
+            "rps": round(len(latencies[name]) / duration, 2),
+            "p50": round(percentile(latencies[name], 0.5), 1),
+            "p90": round(percentile(latencies[name], 0.9), 1),
+            "p99": round(percentile(latencies[name], 0.99), 1),
+        }
+        for name in names + ["total"]
+    }
+
+
+def print_report(summary):
+    """Print a table of the summary."""
+    click.echo(
+        f"{'endpoint':<36}{'requests':>9}{'errors':>8}{'req/s':>9}"
+        f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"
+    )
+    for name, row in summary.items():
+        click.echo(
+            f"{name:<36}{row['requests']:>9}{row['errors']:>8}{row['rps']:>9.1f}"
+            f"{row['p50']:>9.1f}{row['p90']:>9.1f}{row['p99']:>9.1f}"
+        )
+
+
+@click.command()
+@click.option("--users", default=20, help="Number of virtual users.")
+@click.option("--duration", default=30, help="Seconds to measure for.")
+@click.option("--warmup", default=5, help="Seconds to run before measuring.")
+@click.option("--think-time", default=0.0, help="Mean seconds between journeys.")
+@click.option("--events", default=1000, help="Number of events to seed.")
+@click.option("--seed", "seed_value", default=0, help="Seed of the data and journeys.")
+@click.option("--workers", default=2, help="Number of gunicorn workers.")
+@click.option("--worker-class", default="gthread", help="gunicorn worker class.")
+@click.option("--stripe-latency", default=0.0, help="Seconds the Stripe stub takes.")
+@click.option("--database-url", help="Empty database to seed and serve from.")
+@click.option("--json", "json_path", help="File to write the report to as JSON.")
+def loadtest(
+    users,
+    duration,
+    warmup,
+    think_time,
+    events,
+    seed_value,
+    workers,
+    worker_class,
+    stripe_latency,
+    database_url,
+    json_path,
+):
+    """Load test the main user journeys against a local server."""
+    directory = tempfile.mkdtemp()
+    config_name = "production"
+    try:
+        if database_url is None:
+            config_name = "development"
+            database_url = "sqlite:///" + os.path.join(directory, "loadtest.sqlite")
+        click.echo(f"Seeding {events} events and {users} sponsors")
+        dataset = seed(config_name, database_url, events, users, seed_value)
+        port = free_port()
+        server = serve(
+            port, config_name, database_url, worker_class, workers, stripe_latency
+        )
+        try:
+            wait_until_listening(port, timeout=300)
+            recorder = Recorder()
+            virtual_users = create_users(
+                users, "http://127.0.0.1:%d" % port, dataset, recorder, seed_value
+            )
+            start = time.time()
+            threads = run_users(virtual_users, start + warmup + duration, think_time)
+            time.sleep(max(0, start + warmup - time.time()))
+            recorder.clear()
+            for thread in threads:
+                thread.join()
+        finally:
+            server.terminate()
+            server.wait()
+        summary = summarize(recorder, duration)
+        print_report(summary)
+        if json_path:
+            with open(json_path, "w") as file:
+                json.dump(
+                    {
+                        "parameters": {
+                            "users": users,
+                            "duration": duration,
+                            "think_time": think_time,
+                            "events": events,
+                            "seed": seed_value,
+                            "workers": workers,
+                            "worker_class": worker_class,
+                            "stripe_latency": stripe_latency,
+                            "database": config_name,
+                        },
+                        "endpoints": summary,
+                    },
+                    file,
+                    indent=2,
+                )
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    loadtest()
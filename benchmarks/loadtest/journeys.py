@@ -0,0 +1,237 @@
+"""This module contains the virtual users of the load test and the
+journeys they take through the site.
+
+Each virtual user is a visitor, an event organizer or a sponsor, and
+logs in once, like a real user would, before repeatedly picking one of
+its journeys at random. The random choices are made with a generator
+seeded per user, so the same seed replays the same journeys.
+"""
+
+
+import re
+import threading
+import time
+from datetime import date, timedelta
+import requests
+from app.forms import STATES
+from benchmarks.loadtest.seed import (
+    PASSWORD,
+    TITLE_WORDS,
+    organizer_email,
+    package_ids,
+    sponsor_email,
+)
+
+
+CSRF_TOKEN = re.compile(r'name="csrf_token" type="hidden" value="([^"]*)"')
+STATE_IDS = {name: state_id for state_id, name in STATES}
+
+
+class Recorder:
+    """Class that collects the latency of every request by name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, name, milliseconds, ok):
+        """Record a response to the request with the given name."""
+        with self._lock:
+            if ok:
+                self.latencies.setdefault(name, []).append(milliseconds)
+            else:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def clear(self):
+        """Forget the requests recorded so far, e.g. during the warm up."""
+        with self._lock:
+            self.latencies = {}
+            self.errors = {}
+
+
+class VirtualUser:
+    """Class to represent a user taking journeys through the site. The
+    journeys are (weight, method name) pairs.
+    """
+
+    journeys = []
+
+    def __init__(self, number, base_url, dataset, recorder, rng):
+        self.number = number
+        self.base_url = base_url
+        self.dataset = dataset
+        self.recorder = recorder
+        self.rng = rng
+        self.session = requests.Session()
+
+    def request(self, name, method, path, expected=200, **kwargs):
+        """Send a request, record its latency under the given name and
+        return the response. Redirects aren't followed, so that a
+        redirect to the login page counts as an error.
+        """
+        start = time.perf_counter()
+        try:
+            response = self.session.request(
+                method, self.base_url + path, allow_redirects=False, timeout=60, **kwargs
+            )
+        except requests.RequestException:
+            self.recorder.record(name, 0, False)
+            return None
+        milliseconds = (time.perf_counter() - start) * 1000
+        self.recorder.record(name, milliseconds, response.status_code == expected)
+        return response
+
+    def start(self):
+        """Prepare the user before its first journey, e.g. by logging in."""
+
+    def take_journey(self):
+        """Take one of the user's journeys, picked by weight."""
+        weights, names = zip(*self.journeys)
+        getattr(self, self.rng.choices(names, weights)[0])()
+
+    def login(self, email):
+        """Log in with the given email and the seeded password."""
+        response = self.request("auth.login", "GET", "/auth/login")
+        if response is None:
+            return
+        match = CSRF_TOKEN.search(response.text)
+        self.request(
+            "auth.login",
+            "POST",
+            "/auth/login",
+            expected=302,
+            data={
+                "email": email,
+                "password": PASSWORD,
+                "csrf_token": match.group(1) if match else "",
+            },
+        )
+
+    def browse(self):
+        """Open the home page, then an event and its details."""
+        self.request("main.index", "GET", "/")
+        event_id = self.rng.choice(self.dataset["live_events"])
+        self.request("events.event", "GET", "/events/%d" % event_id)
+        self.request("events.event_tab", "GET", "/events/%d/info" % event_id)
+
+
+class Visitor(VirtualUser):
+    """Class to represent an anonymous visitor browsing and searching
+    for events.
+    """
+
+    journeys = [(3, "browse"), (2, "search"), (1, "advanced_search")]
+
+    def search(self):
+        """Search for events by a word of their title and open the
+        second page of the results.
+        """
+        word = self.rng.choice(TITLE_WORDS)
+        self.request(
+            "main.search_events_by_title", "GET", "/search", params={"query": word}
+        )
+        self.request(
+            "main.search_events_by_title",
+            "GET",
+            "/search",
+            params={"query": word, "page": 2},
+        )
+
+    def advanced_search(self):
+        """Search for the events in a city and category in the next
+        three months.
+        """
+        city, state = self.rng.choice(self.dataset["cities"])
+        today = date.today()
+        self.request(
+            "main.advanced_search",
+            "GET",
+            "/advanced-search",
+            params={
+                "start_date": today.isoformat(),
+                "end_date": (today + timedelta(days=90)).isoformat(),
+                "city": city,
+                "state": STATE_IDS[state],
+                "category": self.rng.choice(self.dataset["categories"]),
+            },
+        )
+
+
+class Organizer(VirtualUser):
+    """Class to represent an event organizer checking on their events."""
+
+    journeys = [(3, "dashboard"), (1, "browse")]
+
+    def start(self):
+        """Log in as one of the seeded organizers."""
+        organizer = (self.number - 1) % self.dataset["organizers"] + 1
+        self.login(organizer_email(organizer))
+
+    def dashboard(self):
+        """Open the events dashboard with each of its filters."""
+        for status in ["all", "live", "past", "draft"]:
+            self.request(
+                "dashboard.events_dashboard", "GET", "/dashboard/events/" + status
+            )
+
+
+class Sponsor(VirtualUser):
+    """Class to represent a sponsor buying packages. Each virtual
+    sponsor logs in as a different seeded sponsor, so that they don't
+    try to buy the same package twice.
+    """
+
+    journeys = [(2, "sponsor_event"), (1, "browse")]
+
+    def start(self):
+        """Log in as the seeded sponsor with the user's number."""
+        self.purchased = set()
+        self.login(sponsor_email(self.number))
+
+    def sponsor_event(self):
+        """Buy a package of an event: place the order, create the
+        payment intent at checkout and confirm the payment, then open
+        the sponsorships dashboard.
+        """
+        event_id = self.rng.choice(self.dataset["live_events"])
+        available = [
+            package_id
+            for package_id in package_ids(event_id)
+            if package_id not in self.purchased
+        ]
+        if not available:
+            return
+        package_id = self.rng.choice(available)
+        self.purchased.add(package_id)
+        self.request("events.event", "GET", "/events/%d" % event_id)
+        self.request(
+            "events.place_order",
+            "POST",
+            "/events/%d/place-order" % event_id,
+            json={"ids": [package_id]},
+        )
+        self.request("payments.checkout", "GET", "/payments/%d/checkout" % event_id)
+        self.request(
+            "payments.create_payment_intent",
+            "POST",
+            "/payments/create-payment-intent",
+            expected=201,
+            json={"orderTotal": 100 * self.rng.randint(250, 10000)},
+        )
+        self.request(
+            "payments.checkout_success",
+            "POST",
+            "/payments/checkout-success",
+            expected=201,
+            json={"eventId": event_id},
+        )
+        self.request(
+            "dashboard.sponsorships_dashboard",
+            "GET",
+            "/dashboard/sponsorships/all",
+        )
+
+
+# (weight, class) pairs of the mix of virtual users
+USER_CLASSES = [(6, Visitor), (1, Organizer), (3, Sponsor)]
@@ -0,0 +1,318 @@
+"""This module contains an in memory stand-in for Elasticsearch, so
+that the search pages can be load tested without a cluster.
+
+It implements the parts of the low level client that ElasticsearchClient
+calls, and the queries and aggregations the application builds: match,
+term and range queries combined with a bool query, and terms,
+date_histogram and range aggregations. Text is matched on lower case
+words, which is close enough to the standard analyzer for the titles,
+cities and states that are searched.
+"""
+
+
+import re
+import threading
+import time
+from datetime import date, datetime
+from app.search import ElasticsearchClient
+
+
+WORD = re.compile(r"\w+")
+DATE_FORMATS = {"yyyy-MM-dd": "%Y-%m-%d", "yyyy-MM": "%Y-%m"}
+
+
+def analyze(value):
+    """Return the set of lower case words in the given value."""
+    return set(WORD.findall(str(value).lower()))
+
+
+def field_values(document, field):
+    """Return the values of the given field as a list. Searchable
+    fields are stored under their full path, e.g. venue.city, and the
+    keyword sub field of a text field holds the same value.
+    """
+    if field.endswith(".keyword"):
+        field = field[: -len(".keyword")]
+    value = document.get(field)
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def to_datetime(value, format=None):
+    """Return the given date, datetime or string as a datetime."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if format in DATE_FORMATS:
+        return datetime.strptime(value, DATE_FORMATS[format])
+    return datetime.fromisoformat(value)
+
+
+def match_score(document, field, options):
+    """Return the number of words of the query found in the field."""
+    words = analyze(options["query"])
+    found = set()
+    for value in field_values(document, field):
+        found |= analyze(value)
+    return len(words & found)
+
+
+def term_score(document, field, options):
+    """Return 1 if the field holds exactly the given value, else 0."""
+    return int(options["value"] in field_values(document, field))
+
+
+def range_score(document, field, options):
+    """Return 1 if a value of the field is within the given bounds,
+    else 0. Dates are compared by day, like a range with the yyyy-MM-dd
+    format.
+    """
+    bounds = {
+        option: options[option] for option in ("gte", "gt", "lte", "lt") if option in options
+    }
+    for value in field_values(document, field):
+        if isinstance(value, (date, str)):
+            value = to_datetime(value).date()
+            bounds = {
+                option: to_datetime(bound, options.get("format")).date()
+                for option, bound in bounds.items()
+            }
+        if (
+            ("gte" not in bounds or value >= bounds["gte"])
+            and ("gt" not in bounds or value > bounds["gt"])
+            and ("lte" not in bounds or value <= bounds["lte"])
+            and ("lt" not in bounds or value < bounds["lt"])
+        ):
+            return 1
+    return 0
+
+
+SCORERS = {"match": match_score, "term": term_score, "range": range_score}
+
+
+def score(document, query):
+    """Return the score of the document for the given query, or 0 if
+    it doesn't match.
+    """
+    (query_type, body), = query.items()
+    if query_type == "match_all":
+        return 1
+    if query_type == "bool":
+        total = 0
+        for clause in body.get("must", []) + body.get("filter", []):
+            clause_score = score(document, clause)
+            if not clause_score:
+                return 0
+            total += clause_score
+        for clause in body.get("must_not", []):
+            if score(document, clause):
+                return 0
+        should = [score(document, clause) for clause in body.get("should", [])]
+        if should and not total and not any(should):
+            return 0
+        return total + sum(should) or 1
+    (field, options), = body.items()
+    return SCORERS[query_type](document, field, options)
+
+
+def terms_aggregation(documents, options):
+    """Return the buckets of the most common values of the field."""
+    counts = {}
+    for document in documents:
+        for value in set(field_values(document, options["field"])):
+            counts[value] = counts.get(value, 0) + 1
+    buckets = sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+    return {
+        "buckets": [
+            {"key": key, "doc_count": count}
+            for key, count in buckets[: options.get("size", 10)]
+        ]
+    }
+
+
+def date_histogram_aggregation(documents, options):
+    """Return a bucket per month with the number of documents in it."""
+    counts = {}
+    for document in documents:
+        months = {
+            to_datetime(value).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+            for value in field_values(document, options["field"])
+        }
+        for month in months:
+            counts[month] = counts.get(month, 0) + 1
+    return {
+        "buckets": [
+            {
+                "key_as_string": month.strftime(DATE_FORMATS[options["format"]]),
+                "key": int(month.timestamp() * 1000),
+                "doc_count": count,
+            }
+            for month, count in sorted(counts.items())
+            if count >= options.get("min_doc_count", 0)
+        ]
+    }
+
+
+def range_aggregation(documents, options):
+    """Return a bucket per range with the number of documents that
+    have a value in it.
+    """
+    buckets = []
+    for bounds in options["ranges"]:
+        bucket = dict(bounds)
+        bucket["doc_count"] = sum(
+            any(
+                bounds.get("from", float("-inf")) <= value < bounds.get("to", float("inf"))
+                for value in field_values(document, options["field"])
+            )
+            for document in documents
+        )
+        buckets.append(bucket)
+    return {"buckets": buckets}
+
+
+AGGREGATIONS = {
+    "terms": terms_aggregation,
+    "date_histogram": date_histogram_aggregation,
+    "range": range_aggregation,
+}
+
+
+class InMemoryElasticsearch:
+    """Class that stores documents in dictionaries and answers the
+    requests the low level Elasticsearch client would send.
+    """
+
+    def __init__(self):
+        self._indices = {}
+        self._lock = threading.Lock()
+        self.indices = Indices(self)
+
+    def index(self, index, body, id, doc_type=None):
+        """Add or replace a document."""
+        with self._lock:
+            self._indices.setdefault(index, {})[str(id)] = dict(body)
+
+    def update(self, index, id, body):
+        """Update the given fields of a document."""
+        with self._lock:
+            documents = self._indices.setdefault(index, {})
+            if str(id) in documents:
+                documents[str(id)].update(body["doc"])
+            elif body.get("doc_as_upsert"):
+                documents[str(id)] = dict(body["doc"])
+
+    def exists(self, index, id, doc_type=None):
+        """Return True if the document is in the index."""
+        return str(id) in self._indices.get(index, {})
+
+    def delete(self, index, id, doc_type=None):
+        """Delete a document."""
+        with self._lock:
+            self._indices.get(index, {}).pop(str(id), None)
+
+    def search(self, index, body):
+        """Return the documents matching the query, best first, and
+        the aggregations over all of the matching documents.
+        """
+        start = time.perf_counter()
+        with self._lock:
+            documents = list(self._indices.get(index, {}).items())
+        scored = []
+        for document_id, document in documents:
+            document_score = score(document, body.get("query", {"match_all": {}}))
+            if document_score:
+                scored.append((document_score, document_id, document))
+        if "sort" in body:
+            (field, _), = body["sort"][0].items()
+            scored.sort(key=lambda hit: hit[2][field])
+            after = body.get("search_after")
+            if after:
+                scored = [hit for hit in scored if hit[2][field] > after[0]]
+        else:
+            scored.sort(key=lambda hit: (-hit[0], int(hit[1])))
+        start_at = body.get("from", 0)
+        page = scored[start_at : start_at + body.get("size", 10)]
+        results = {
+            "took": int((time.perf_counter() - start) * 1000),
+            "timed_out": False,
+            "_shards": {"total": 1, "successful": 1, "skipped": 0, "failed": 0},
+            "hits": {
+                "total": {"value": len(scored), "relation": "eq"},
+                "max_score": float(scored[0][0]) if scored else None,
+                "hits": [
+                    {
+                        "_index": index,
+                        "_id": document_id,
+                        "_score": float(document_score),
+                        "_source": document,
+                        "sort": [document.get("id")],
+                    }
+                    for document_score, document_id, document in page
+                ],
+            },
+        }
+        matching = [document for _, _, document in scored]
+        aggregations = {}
+        for name, aggregation in body.get("aggs", {}).items():
+            (aggregation_type, options), = aggregation.items()
+            aggregations[name] = AGGREGATIONS[aggregation_type](matching, options)
+        if aggregations:
+            results["aggregations"] = aggregations
+        return results
+
+    def msearch(self, body):
+        """Run the searches given as (header, query) pairs."""
+        return {
+            "responses": [
+                self.search(header["index"], query)
+                for header, query in zip(body[::2], body[1::2])
+            ]
+        }
+
+
+class Indices:
+    """Class for the index operations of the in memory client."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def exists(self, index):
+        """Return True if the index was created."""
+        return index in self._client._indices
+
+    def create(self, index):
+        """Create an empty index."""
+        self._client._indices.setdefault(index, {})
+
+    def delete(self, index):
+        """Delete the index and its documents."""
+        self._client._indices.pop(index, None)
+
+
+class LocalSearchClient(ElasticsearchClient):
+    """ElasticsearchClient that keeps its documents in the memory of
+    the process instead of sending them to a cluster.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._elasticsearch = InMemoryElasticsearch()
+
+    def reset(self):
+        """Keep the documents, since a forked worker has its own copy
+        and no connections to replace.
+        """
+
+    def bulk(self, actions, chunk_size=500):
+        """Perform the given index and delete actions one at a time."""
+        num_successful = 0
+        for action in actions:
+            if action["_op_type"] == "delete":
+                self._client.delete(action["_index"], action["_id"])
+            else:
+                self._client.index(action["_index"], action["_source"], action["_id"])
+            num_successful += 1
+        return num_successful
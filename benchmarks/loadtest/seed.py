@@ -0,0 +1,215 @@
+"""This module contains a deterministic generator of the data the
+load test runs against. The same seed and sizes always produce the
+same rows, so that runs can be compared with each other.
+
+Rows are inserted with executemany in chunks instead of through the
+ORM, and every user shares one precomputed password hash, since hashing
+a password for each user would take longer than inserting the rows.
+"""
+
+
+import random
+from datetime import datetime, timedelta
+from flask import current_app
+from app.extensions import db
+from app.models import (
+    Event,
+    EventCategory,
+    EventStatus,
+    EventType,
+    Image,
+    ImageType,
+    Package,
+    Role,
+    User,
+    Venue,
+)
+from benchmarks.listing_projection import insert_in_chunks
+
+
+PASSWORD = "password"
+EVENTS_PER_ORGANIZER = 10
+PACKAGES_PER_EVENT = 3
+CITIES = [
+    ("Phoenix", "Arizona"),
+    ("Scottsdale", "Arizona"),
+    ("Los Angeles", "California"),
+    ("San Diego", "California"),
+    ("Denver", "Colorado"),
+    ("Miami", "Florida"),
+    ("Chicago", "Illinois"),
+    ("Seattle", "Washington"),
+    ("New York", "New York"),
+    ("Austin", "Texas"),
+]
+ADJECTIVES = ["Annual", "Summer", "Winter", "Global", "Local", "Charity", "Tech", "Music"]
+NOUNS = ["Festival", "Conference", "Gala", "Marathon", "Summit", "Expo", "Fair", "Concert"]
+# the words searched for by the title search journey
+TITLE_WORDS = sorted(set(word.lower() for word in ADJECTIVES + NOUNS))
+# draft and past events are listed on the organizer dashboard only
+STATUS_WEIGHTS = [(EventStatus.LIVE, 8), (EventStatus.PAST, 1), (EventStatus.DRAFT, 1)]
+
+
+def organizer_email(number):
+    """Return the email of the given event organizer."""
+    return "organizer%d@loadtest.example" % number
+
+
+def sponsor_email(number):
+    """Return the email of the given sponsor."""
+    return "sponsor%d@loadtest.example" % number
+
+
+def num_organizers(num_events):
+    """Return the number of event organizers hosting the events."""
+    return max(1, num_events // EVENTS_PER_ORGANIZER)
+
+
+def package_ids(event_id):
+    """Return the ids of the packages of the given event."""
+    first = (event_id - 1) * PACKAGES_PER_EVENT + 1
+    return list(range(first, first + PACKAGES_PER_EVENT))
+
+
+def seed_database(num_events, num_sponsors, seed=0):
+    """Insert the given number of events, spread across organizers and
+    cities, with their venues, packages and main images, and the given
+    number of sponsors. Every user's password is PASSWORD. Returns
+    what the journeys need to know about the data: the ids of the live
+    events, the number of organizers and sponsors, the (city, state)
+    pairs of the venues and the ids of the categories.
+    """
+    rng = random.Random(seed)
+    db.create_all()
+    Role.insert_roles()
+    ImageType.insert_image_types()
+    EventType.insert_event_types()
+    EventCategory.insert_event_categories()
+    roles = {role.name: role.id for role in Role.query}
+    event_type_ids = [event_type.id for event_type in EventType.query.order_by("id")]
+    category_ids = [category.id for category in EventCategory.query.order_by("id")]
+    main_image = ImageType.query.filter_by(name="Main Event Image").first()
+    password_hash = current_app.password_hasher.hash(PASSWORD)
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+
+    organizers = num_organizers(num_events)
+    insert_in_chunks(
+        User.__table__,
+        (
+            {
+                "id": number,
+                "first_name": "Organizer",
+                "last_name": str(number),
+                "company": "Organizer Company %d" % number,
+                "email": organizer_email(number),
+                "password_hash": password_hash,
+                "member_since": now,
+                "updated_at": now,
+                "role_id": roles["Event Organizer"],
+            }
+            for number in range(1, organizers + 1)
+        ),
+    )
+    insert_in_chunks(
+        User.__table__,
+        (
+            {
+                "id": organizers + number,
+                "first_name": "Sponsor",
+                "last_name": str(number),
+                "company": "Sponsor Company %d" % number,
+                "email": sponsor_email(number),
+                "password_hash": password_hash,
+                "member_since": now,
+                "updated_at": now,
+                "role_id": roles["Sponsor"],
+            }
+            for number in range(1, num_sponsors + 1)
+        ),
+    )
+    cities = [rng.choice(CITIES) for _ in range(num_events)]
+    insert_in_chunks(
+        Venue.__table__,
+        (
+            {
+                "id": number,
+                "name": "Venue %d" % number,
+                "address": "%d Main Street" % number,
+                "city": city,
+                "state": state,
+                "zip_code": "%05d" % rng.randrange(100000),
+            }
+            for number, (city, state) in enumerate(cities, 1)
+        ),
+    )
+    statuses, weights = zip(*STATUS_WEIGHTS)
+    events = []
+    for number in range(1, num_events + 1):
+        status = rng.choices(statuses, weights)[0]
+        if status == EventStatus.PAST:
+            start = now - timedelta(days=rng.randint(7, 365))
+        else:
+            start = now + timedelta(days=rng.randint(1, 90), hours=rng.randint(8, 18))
+        events.append(
+            {
+                "id": number,
+                "title": "%s %s %d"
+                % (rng.choice(ADJECTIVES), rng.choice(NOUNS), number),
+                "start_datetime": start,
+                "end_datetime": start + timedelta(days=rng.randint(0, 3), hours=4),
+                "attendees": "%d - %d" % (100, 100 * rng.randint(2, 50)),
+                "male_to_female": "50 - 50",
+                "description": "Description of event %d. " % number * 20,
+                "pitch": "Pitch of event %d. " % number * 10,
+                "published": status != EventStatus.DRAFT,
+                "status": status,
+                "version": 1,
+                "updated_at": now,
+                "user_id": (number - 1) % organizers + 1,
+                "venue_id": number,
+                "event_type_id": rng.choice(event_type_ids),
+                "event_category_id": rng.choice(category_ids),
+            }
+        )
+    insert_in_chunks(Event.__table__, events)
+    insert_in_chunks(
+        Package.__table__,
+        (
+            {
+                "id": package_id,
+                "name": "Package %d" % package_id,
+                "price": rng.choice([250, 500, 750, 1000, 2500, 5000, 10000]),
+                "audience": "Everyone",
+                "description": "Package %d of event %d" % (package_id, number),
+                "num_purchased": 0,
+                # enough that sponsors never sell an event out
+                "available_packages": num_sponsors + 1,
+                "package_type": rng.choice(["Cash", "In Kind"]),
+                "event_id": number,
+            }
+            for number in range(1, num_events + 1)
+            for package_id in package_ids(number)
+        ),
+    )
+    insert_in_chunks(
+        Image.__table__,
+        (
+            {
+                "path": "app/static/images/loadtest%d.jpg" % number,
+                "uploaded_at": now,
+                "image_type_id": main_image.id,
+                "event_id": number,
+            }
+            for number in range(1, num_events + 1)
+        ),
+    )
+    db.session.commit()
+    return {
+        "live_events": [
+            event["id"] for event in events if event["status"] == EventStatus.LIVE
+        ],
+        "organizers": organizers,
+        "sponsors": num_sponsors,
+        "cities": sorted(set(cities)),
+        "categories": category_ids,
+    }
@@ -0,0 +1,80 @@
+"""This module creates the application served during a load test, e.g.
+
+    gunicorn -c gunicorn.conf.py "benchmarks.loadtest.server:create_server_app()"
+
+Searches are answered by the in memory stand-in for Elasticsearch,
+which is filled from the database when the application is created, and
+payment intents are created by a stub instead of Stripe. When gunicorn
+preloads the application, the workers are forked with a copy of the
+index, and each keeps its copy up to date with the changes it commits.
+"""
+
+
+import os
+import time
+import uuid
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+
+from app import create_app, init_search
+from app.blueprints.payments import services as payment_services
+from app.error_handlers import register_error_handlers
+from app.extensions import db
+from app.models import Event
+from benchmarks.loadtest.search import LocalSearchClient
+
+
+class StubPaymentIntent:
+    """Class that creates payment intents the way Stripe would,
+    after waiting for as long as a request to Stripe takes.
+    """
+
+    latency = 0
+
+    @classmethod
+    def create(cls, amount, currency, **kwargs):
+        """Return a new payment intent for the given amount."""
+        time.sleep(cls.latency)
+        intent_id = "pi_" + uuid.uuid4().hex
+        return {
+            "id": intent_id,
+            "object": "payment_intent",
+            "amount": amount,
+            "currency": currency,
+            "client_secret": intent_id + "_secret_" + uuid.uuid4().hex,
+        }
+
+
+class StubStripe:
+    """Class that stands in for the stripe module."""
+
+    PaymentIntent = StubPaymentIntent
+
+
+def get_stripe():
+    """Return the Stripe stub."""
+    return StubStripe
+
+
+def create_server_app():
+    """Return the application with the search stand-in filled with the
+    events in the database and with Stripe stubbed out. The seconds a
+    request to Stripe takes are read from LOADTEST_STRIPE_LATENCY.
+    """
+    app = create_app(os.environ.get("FLASK_CONFIG", "development"), False)
+    # the development configuration is only used for its SQLite settings
+    app.debug = False
+    register_error_handlers(app)
+    init_search(app, LocalSearchClient())
+    StubPaymentIntent.latency = float(os.environ.get("LOADTEST_STRIPE_LATENCY", "0"))
+    payment_services.get_stripe = get_stripe
+    with app.app_context():
+        search_middleware = app.sqlalchemy_search_middleware
+        search_middleware.repair_index(
+            Event, search_middleware.find_index_differences(Event)
+        )
+        db.session.remove()
+    return app
@@ -0,0 +1,106 @@
+"""This module contains a load test of the login throttling. It sends
+a credential stuffing attack, wrong passwords for many accounts from a
+few IP addresses, to the login view with and without rate limiting,
+and reports how many passwords were checked and how much CPU time the
+attack cost the worker, e.g.
+
+    python -m benchmarks.login_attack --attempts 2000 --ips 5 --accounts 200
+
+With rate limiting, the number of passwords checked is bounded by the
+limits in RATE_LIMITS however many attempts are sent, and the CPU time
+per turned away attempt is a small fraction of a password check.
+"""
+
+
+import itertools
+import time
+from unittest import mock
+import click
+from app import create_app
+from app.extensions import db
+from app.models import Role, User
+from app.throttling import init_rate_limiting
+from config import Config
+
+
+def seed(num_accounts):
+    """Add the accounts the attack tries to log in to."""
+    role = Role.query.filter_by(name="Sponsor").first()
+    for number in range(num_accounts):
+        user = User(
+            first_name="Victim",
+            last_name=str(number),
+            company="Company %d" % number,
+            email="victim%d@example.com" % number,
+            role=role,
+        )
+        user.password = "password"
+        db.session.add(user)
+    db.session.commit()
+
+
+def attack(app, attempts, num_ips, num_accounts):
+    """Send the attempts round robin from the IP addresses to the
+    accounts. Returns the status codes of the responses, the number of
+    passwords checked and the CPU seconds the attack took.
+    """
+    client = app.test_client()
+    ips = itertools.cycle(["10.0.%d.%d" % divmod(number, 256) for number in range(num_ips)])
+    accounts = itertools.cycle(range(num_accounts))
+    statuses = {}
+    verify = mock.Mock(wraps=app.password_hasher.verify)
+    with mock.patch.object(app.password_hasher, "verify", verify):
+        start = time.process_time()
+        for _ in range(attempts):
+            response = client.post(
+                "/auth/login",
+                data={
+                    "email": "victim%d@example.com" % next(accounts),
+                    "password": "guess",
+                },
+                environ_base={"REMOTE_ADDR": next(ips)},
+            )
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        cpu_seconds = time.process_time() - start
+    return statuses, verify.call_count, cpu_seconds
+
+
+@click.command()
+@click.option("--attempts", default=1000, help="Login attempts to send.")
+@click.option("--ips", default=5, help="IP addresses the attack comes from.")
+@click.option("--accounts", default=100, help="Accounts the attack tries.")
+def benchmark(attempts, ips, accounts):
+    """Send the attack with and without rate limiting and compare
+    the passwords checked and the CPU time spent.
+    """
+    app = create_app("testing", False)
+    # check passwords at the cost they have in production
+    app.password_hasher.method = Config.PASSWORD_HASH_METHOD
+    with app.app_context():
+        db.create_all()
+        Role.insert_roles()
+        seed(accounts)
+        login = app.config["RATE_LIMITS"]["login"]
+        bound = min(ips * login["ip"][0], accounts * login["account"][0])
+        click.echo(
+            f"{'rate limiting':<16}{'attempts':>9}{'429s':>7}{'checks':>8}"
+            f"{'CPU s':>8}{'CPU ms/attempt':>16}"
+        )
+        for enabled in [False, True]:
+            app.config["RATE_LIMIT_ENABLED"] = enabled
+            init_rate_limiting(app)
+            statuses, checks, cpu_seconds = attack(app, attempts, ips, accounts)
+            click.echo(
+                f"{'on' if enabled else 'off':<16}{attempts:>9}"
+                f"{statuses.get(429, 0):>7}{checks:>8}{cpu_seconds:>8.2f}"
+                f"{cpu_seconds / attempts * 1000:>16.2f}"
+            )
+        click.echo(f"at most {bound} passwords can be checked per window with limiting on")
+        db.session.remove()
+        db.drop_all()
+    if checks > bound:
+        raise SystemExit("More passwords were checked than the limits allow.")
+
+
+if __name__ == "__main__":
+    benchmark()
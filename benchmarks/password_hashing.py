@@ -0,0 +1,105 @@
+"""This module contains a benchmark that helps choose the password
+hashing parameters. It reports how long hashing and checking a
+password takes with each method, then checks a burst of passwords at
+once the way a worker with the configured limits would, and measures
+how much that slows down a thread rendering pages in the meantime.
+"""
+
+
+import threading
+import time
+import click
+from app.passwords import PasswordHasher, PasswordHasherBusy
+
+
+def page_render(iterations=20000):
+    """Stand-in for rendering a page: a bit of pure Python work."""
+    return sum(number * number for number in range(iterations))
+
+
+def time_page_renders(stop):
+    """Render pages until stop is set and return how long each took."""
+    timings = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        page_render()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def time_page_renders_for(seconds):
+    """Render pages for that many seconds and return how long each took."""
+    stop = threading.Event()
+    timer = threading.Timer(seconds, stop.set)
+    timer.start()
+    return time_page_renders(stop)
+
+
+def storm(hasher, password_hash, logins):
+    """Check the password on that many threads at once while another
+    thread renders pages. Returns the seconds the burst took, how many
+    logins were turned away, and the median page render time.
+    """
+    rejected = []
+    stop = threading.Event()
+    renders = []
+    renderer = threading.Thread(
+        target=lambda: renders.extend(time_page_renders(stop))
+    )
+
+    def login():
+        try:
+            hasher.verify(password_hash, "password")
+        except PasswordHasherBusy:
+            rejected.append(1)
+
+    threads = [threading.Thread(target=login) for _ in range(logins)]
+    renderer.start()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    stop.set()
+    renderer.join()
+    renders.sort()
+    return seconds, len(rejected), renders[len(renders) // 2] if renders else 0
+
+
+@click.command()
+@click.option(
+    "--methods",
+    default="pbkdf2:sha256:150000,pbkdf2:sha256:260000,scrypt:16384:8:1,scrypt:32768:8:1",
+    help="Comma separated hashing methods to time.",
+)
+@click.option("--logins", default=16, help="Passwords checked at once in the burst.")
+@click.option("--pool", default="", help='"thread", "process" or "" for inline.')
+@click.option("--concurrency", default=2, help="Passwords checked at once.")
+@click.option("--wait", default=5.0, help="Seconds a login waits for its turn.")
+def benchmark(methods, logins, pool, concurrency, wait):
+    """Time each hashing method, then a burst of logins."""
+    method_list = methods.split(",")
+    baseline = sorted(time_page_renders_for(0.5))
+    click.echo(f"page render alone: {baseline[len(baseline) // 2] * 1000:.2f}ms")
+    click.echo(
+        f"{'method':<28}{'hash ms':>9}{'verify ms':>11}"
+        f"{'burst s':>9}{'rejected':>10}{'page ms':>9}"
+    )
+    for method in method_list:
+        hasher = PasswordHasher(method, 16, pool, concurrency, wait)
+        start = time.perf_counter()
+        password_hash = hasher.hash("password")
+        hash_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        assert hasher.verify(password_hash, "password")
+        verify_ms = (time.perf_counter() - start) * 1000
+        seconds, rejected, page = storm(hasher, password_hash, logins)
+        click.echo(
+            f"{method:<28}{hash_ms:>9.1f}{verify_ms:>11.1f}"
+            f"{seconds:>9.2f}{rejected:>10}{page * 1000:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,91 @@
+"""This module contains a benchmark that compares the throughput of
+reindexing full documents against partial updates in Elasticsearch.
+A running Elasticsearch instance is required.
+"""
+
+
+import os
+import random
+import time
+import click
+from datetime import datetime, timedelta
+from faker import Faker
+from app.search import ElasticsearchClient
+
+
+BENCHMARK_INDEX = "benchmark_events"
+
+
+def create_documents(num_documents, description_paragraphs, seed):
+    """Return a list of event documents with large descriptions."""
+    faker = Faker()
+    faker.seed_instance(seed)
+    random.seed(seed)
+    documents = []
+    for document_id in range(1, num_documents + 1):
+        start_datetime = datetime.now() + timedelta(days=random.randint(1, 90))
+        documents.append(
+            {
+                "id": document_id,
+                "title": faker.company() + " Gala",
+                "description": "\n".join(faker.paragraphs(nb=description_paragraphs)),
+                "venue.city": faker.city(),
+                "venue.state": faker.state(),
+                "start_datetime": start_datetime,
+                "end_datetime": start_datetime + timedelta(days=1),
+                "event_category_id": random.randint(1, 6),
+                "event_type_id": random.randint(1, 6),
+                "published": True,
+                "package_prices": [float(random.randint(100, 10000)) for _ in range(4)],
+            }
+        )
+    return documents
+
+
+def report(label, num_documents, seconds):
+    """Print the throughput of a benchmark run."""
+    click.echo(
+        f"{label:<32}{num_documents:>8} docs {seconds:>8.2f}s "
+        f"{num_documents / seconds:>10.1f} docs/s"
+    )
+
+
+@click.command()
+@click.option("--url", default=lambda: os.environ.get("ELASTICSEARCH_URL"))
+@click.option("--documents", default=1000, help="Number of documents to index.")
+@click.option("--paragraphs", default=20, help="Paragraphs per description.")
+@click.option("--seed", default=0, help="Seed for the generated documents.")
+def benchmark(url, documents, paragraphs, seed):
+    """Index a corpus of events with large descriptions, then compare
+    reindexing the full documents against partial updates that
+    only toggle the published field.
+    """
+    client = ElasticsearchClient(url)
+    client.delete_index(BENCHMARK_INDEX)
+    client.create_index(BENCHMARK_INDEX)
+    corpus = create_documents(documents, paragraphs, seed)
+
+    try:
+        start = time.perf_counter()
+        for document in corpus:
+            client.add_to_index(BENCHMARK_INDEX, "event", document["id"], document)
+        report("initial index", documents, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for document in corpus:
+            document["published"] = False
+            client.add_to_index(BENCHMARK_INDEX, "event", document["id"], document)
+        report("full reindex (published)", documents, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for document in corpus:
+            client.update_partial(
+                BENCHMARK_INDEX, document["id"], {"published": True}
+            )
+        report("partial update (published)", documents, time.perf_counter() - start)
+    finally:
+        client.delete_index(BENCHMARK_INDEX)
+
+
+if __name__ == "__main__":
+    benchmark()
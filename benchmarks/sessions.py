@@ -0,0 +1,114 @@
+"""This module contains a benchmark that compares the time requests
+spend loading and saving the session, and the size of the session
+cookie, when sessions are kept in signed cookies and when they are
+stored on the server, as sponsors add pending orders to them.
+"""
+
+
+import os
+import shutil
+import tempfile
+import time
+import click
+from flask import session
+from app import create_app
+from app.sessions import init_sessions
+
+
+# browsers drop cookies bigger than this
+COOKIE_SIZE_LIMIT = 4096
+
+
+def pending_order(event_id, packages):
+    """Return a pending order like the ones events.place_order stores."""
+    return [
+        {
+            "package_id": event_id * 10 + number,
+            "event_id": event_id,
+            "sponsor_id": 1,
+            "price": 1000.0 * number,
+            "name": "Package %d" % number,
+        }
+        for number in range(1, packages + 1)
+    ]
+
+
+def create_benchmark_app(session_store_path):
+    """Return the application with views that read and change the
+    session, storing sessions at session_store_path if it isn't None.
+    """
+    app = create_app("testing", False)
+    if session_store_path is not None:
+        app.config["SESSION_STORE_PATH"] = session_store_path
+        init_sessions(app)
+
+    @app.route("/benchmark/read")
+    def read():
+        return str(len(session))
+
+    @app.route("/benchmark/write")
+    def write():
+        session["video_url"] = str(time.time())
+        return "written"
+
+    return app
+
+
+def measure(app, orders, packages, requests):
+    """Fill a session with pending orders, then return the size of its
+    cookie and the average milliseconds requests that read it and that
+    change it take.
+    """
+    client = app.test_client()
+    with client.session_transaction() as client_session:
+        client_session["user_id"] = "1"
+        for event_id in range(1, orders + 1):
+            client_session[f"PENDING_ORDER#1#{event_id}"] = pending_order(
+                event_id, packages
+            )
+    cookie = next(
+        cookie for cookie in client.cookie_jar if cookie.name == app.session_cookie_name
+    )
+    timings = {}
+    for url in ["/benchmark/read", "/benchmark/write"]:
+        start = time.perf_counter()
+        for _ in range(requests):
+            client.get(url)
+        timings[url] = (time.perf_counter() - start) / requests * 1000
+    return len(cookie.value), timings["/benchmark/read"], timings["/benchmark/write"]
+
+
+@click.command()
+@click.option("--orders", default="0,1,5,10,25", help="Pending orders to try.")
+@click.option("--packages", default=4, help="Packages in each pending order.")
+@click.option("--requests", default=500, help="Requests to time of each kind.")
+def benchmark(orders, packages, requests):
+    """Time requests that read and change sessions holding more and
+    more pending orders, with cookie and with server-side sessions.
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        apps = [
+            ("cookie", create_benchmark_app(None)),
+            (
+                "sqlite",
+                create_benchmark_app(os.path.join(directory, "sessions.sqlite")),
+            ),
+        ]
+        click.echo(
+            f"{'store':<8}{'orders':>8}{'cookie bytes':>14}"
+            f"{'read ms':>10}{'write ms':>10}"
+        )
+        for number in [int(value) for value in orders.split(",")]:
+            for name, app in apps:
+                size, read, write = measure(app, number, packages, requests)
+                flag = "  TOO BIG" if size > COOKIE_SIZE_LIMIT else ""
+                click.echo(
+                    f"{name:<8}{number:>8}{size:>14}{read:>10.3f}{write:>10.3f}{flag}"
+                )
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    benchmark()
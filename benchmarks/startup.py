@@ -0,0 +1,73 @@
+"""This module contains a benchmark that measures the cold start time
+of the application with python -X importtime, which reports how long
+importing each module took. Every run is a fresh interpreter, so
+nothing is shared between runs except the bytecode cache.
+"""
+
+
+import os
+import statistics
+import subprocess
+import sys
+import click
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(module):
+    """Import the module in a new interpreter and return a dictionary
+    that maps each imported module to its cumulative import time in
+    microseconds.
+    """
+    environment = dict(os.environ, FLASK_CONFIG="testing", USE_ELASTICSEARCH="0")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=environment,
+        stderr=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        universal_newlines=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def report(module, runs, slowest):
+    """Import the module the given number of times and report the
+    median total and the slowest top level packages.
+    """
+    totals = []
+    packages = {}
+    for _ in range(runs):
+        times = import_times(module)
+        totals.append(times[module])
+        for name, cumulative in times.items():
+            if "." not in name and name != module:
+                packages.setdefault(name, []).append(cumulative)
+    click.echo(f"{module:<16}{statistics.median(totals) / 1000:>10.1f}ms")
+    medians = {name: statistics.median(values) for name, values in packages.items()}
+    for name in sorted(medians, key=medians.get, reverse=True)[:slowest]:
+        click.echo(f"    {name:<24}{medians[name] / 1000:>10.1f}ms")
+
+
+@click.command()
+@click.option("--runs", default=5, help="Number of interpreters to start per module.")
+@click.option("--slowest", default=8, help="Number of slowest packages to list.")
+@click.argument("modules", nargs=-1)
+def benchmark(runs, slowest, modules):
+    """Report the import time of the WSGI entry point, which is what
+    every gunicorn worker pays, and of the command line tools.
+    """
+    for module in modules or ("wsgi", "sponsormatch"):
+        report(module, runs, slowest)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,176 @@
+"""This module contains a benchmark that compares the throughput of
+gunicorn's sync, gthread and gevent worker classes on the main pages.
+Each worker class serves the application with gunicorn.conf.py while
+a pool of threads requests the pages. The production configuration is
+used with the database given by --database-url, which has to hold the
+events seeded by this benchmark; without one, a SQLite file is seeded
+and served with the development configuration, since the production
+connection pool settings don't apply to SQLite. The gevent worker is
+skipped when gevent isn't installed.
+"""
+
+
+import importlib.util
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+from urllib.parse import quote
+import click
+from app import create_app
+from app.extensions import db
+from app.models import Package
+from benchmarks.listing_projection import insert_in_chunks, seed_database
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = ["/", "/events/1", "/events/1/info", "/users/" + quote("Benchmark Corp")]
+
+
+def seed(database_url, num_events):
+    """Create the tables in the database and insert the events with a
+    package each, which the event page needs for its price range.
+    """
+    app = create_app("development", False)
+    app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+    with app.app_context():
+        seed_database(num_events, description_size=2000)
+        insert_in_chunks(
+            Package.__table__,
+            (
+                {
+                    "name": "Package",
+                    "price": 100,
+                    "audience": "Everyone",
+                    "description": "Description",
+                    "num_purchased": 0,
+                    "available_packages": 10,
+                    "package_type": "Cash",
+                    "event_id": number,
+                }
+                for number in range(1, num_events + 1)
+            ),
+        )
+        db.session.commit()
+        db.session.remove()
+
+
+def free_port():
+    """Return a port nobody is listening on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_listening(port, timeout=30):
+    """Wait for the server to accept connections."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn didn't start listening on port %d" % port)
+
+
+def load(port, concurrency, duration):
+    """Request the pages from the given number of threads for the given
+    number of seconds, and return the number of responses, the number of
+    errors and the latency of each response in milliseconds.
+    """
+    latencies = []
+    errors = []
+    deadline = time.time() + duration
+
+    def client(offset):
+        number = offset
+        while time.time() < deadline:
+            url = "http://127.0.0.1:%d%s" % (port, PATHS[number % len(PATHS)])
+            number += 1
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+            except Exception as error:
+                errors.append(error)
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies), len(errors), latencies
+
+
+def serve(worker_class, workers, port, config_name, database_url):
+    """Start gunicorn with the given worker class and return its process."""
+    environment = dict(
+        os.environ,
+        FLASK_CONFIG=config_name,
+        DATABASE_URL=database_url,
+        DEV_DATABASE_URL=database_url,
+        PAGE_CACHE_PATH="",
+        USE_ELASTICSEARCH="0",
+        GUNICORN_BIND="127.0.0.1:%d" % port,
+        GUNICORN_WORKER_CLASS=worker_class,
+        GUNICORN_WORKERS=str(workers),
+    )
+    return subprocess.Popen(
+        ["gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        cwd=ROOT,
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+@click.command()
+@click.option("--events", default=100, help="Number of events in the database.")
+@click.option("--workers", default=2, help="Number of gunicorn workers.")
+@click.option("--concurrency", default=16, help="Number of concurrent clients.")
+@click.option("--duration", default=10, help="Seconds to send requests for.")
+@click.option("--warmup", default=2, help="Seconds to send requests before measuring.")
+@click.option("--database-url", help="Seeded database to serve the pages from.")
+def benchmark(events, workers, concurrency, duration, warmup, database_url):
+    """Report the requests per second and latency of each worker class."""
+    directory = tempfile.mkdtemp()
+    config_name = "production"
+    try:
+        if database_url is None:
+            config_name = "development"
+            database_url = "sqlite:///" + os.path.join(directory, "benchmark.sqlite")
+            seed(database_url, events)
+        for worker_class in ["sync", "gthread", "gevent"]:
+            if worker_class == "gevent" and importlib.util.find_spec("gevent") is None:
+                click.echo(f"{worker_class:<10} skipped, gevent isn't installed")
+                continue
+            port = free_port()
+            server = serve(worker_class, workers, port, config_name, database_url)
+            try:
+                wait_until_listening(port)
+                load(port, concurrency, warmup)
+                count, errors, latencies = load(port, concurrency, duration)
+            finally:
+                server.terminate()
+                server.wait()
+            latencies.sort()
+            p99 = latencies[int(len(latencies) * 0.99)] if latencies else 0
+            click.echo(
+                f"{worker_class:<10}{count / duration:>10.1f} req/s"
+                f"{statistics.median(latencies or [0]):>10.1f}ms p50"
+                f"{p99:>10.1f}ms p99{errors:>8} errors"
+            )
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    benchmark()
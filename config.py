@@ -2,10 +2,48 @@
 
 
 import os
+import tempfile
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 
+def create_replica_binds(replica_urls):
+    """Return a dictionary of bind keys to replica urls from the given
+    comma separated string of urls.
+    """
+    urls = [url.strip() for url in replica_urls.split(",") if url.strip()]
+    return {"replica_%d" % number: url for number, url in enumerate(urls)}
+
+
+def create_engine_options(pool_size, max_overflow, pool_timeout=10, pool_recycle=1800):
+    """Return connection pool settings for SQLALCHEMY_ENGINE_OPTIONS.
+    Environment variables take priority over the given defaults.
+    """
+    return {
+        "pool_size": int(os.environ.get("DATABASE_POOL_SIZE", pool_size)),
+        "max_overflow": int(os.environ.get("DATABASE_MAX_OVERFLOW", max_overflow)),
+        # seconds to wait for a connection before giving up
+        "pool_timeout": float(os.environ.get("DATABASE_POOL_TIMEOUT", pool_timeout)),
+        # replace connections before the server or a proxy drops them
+        "pool_recycle": int(os.environ.get("DATABASE_POOL_RECYCLE", pool_recycle)),
+        # test connections on checkout so stale ones are replaced after
+        # the database restarts
+        "pool_pre_ping": True,
+    }
+
+
+def default_worker_count(worker_class, cpu_count=None):
+    """Return the number of gunicorn workers to run for the given worker
+    class. Sync workers handle one request at a time and spend much of
+    it waiting on the database, so there are about two per core, while
+    threaded and asynchronous workers only need about one per core.
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    if worker_class == "sync":
+        return 2 * cpu_count + 1
+    return cpu_count + 1
+
+
 class Config:
     """Base class for application configuration"""
 
@@ -31,17 +69,153 @@ class Config:
         "UPLOADS_URL", os.path.join(basedir, "app/static/images")
     )
     SSL_REDIRECT = False
+    # number of reverse proxies in front of the application whose
+    # X-Forwarded-For, -Proto and -Host headers are trusted, the client's
+    # address is only known when it is set behind a proxy
+    PROXY_FIX_X_FOR = int(os.environ.get("PROXY_FIX_X_FOR", "0"))
     HOMEPAGE_URL = os.environ.get("HOMEPAGE_URL", None)
+    # searches slower than this many milliseconds are logged with their query
+    SEARCH_SLOW_QUERY_THRESHOLD = int(os.environ.get("SEARCH_SLOW_QUERY_THRESHOLD", "500"))
+    SEARCH_SLOW_QUERY_LOG_SIZE = int(os.environ.get("SEARCH_SLOW_QUERY_LOG_SIZE", "50"))
+    # reads from read-only views are spread across these replicas
+    SQLALCHEMY_BINDS = create_replica_binds(os.environ.get("DATABASE_REPLICA_URLS", ""))
+    SQLALCHEMY_REPLICA_BINDS = list(SQLALCHEMY_BINDS)
+    # seconds a user's reads stay on the primary after they write
+    REPLICA_STICKY_SECONDS = float(os.environ.get("REPLICA_STICKY_SECONDS", "5"))
+    # maximum number of SQL statements a request may run, by endpoint
+    QUERY_BUDGETS = {
+        "main.index": 5,
+        "main.advanced_search": 10,
+        "main.search_events_by_title": 10,
+        "users.user_profile": 10,
+        "users.user_events_by_status": 5,
+        "users.user_sponsored_events_by_status": 5,
+        "events.saved_events": 5,
+        "events.event": 15,
+    }
+    DEFAULT_QUERY_BUDGET = None
+    # raise instead of logging a warning when a request is over budget
+    QUERY_BUDGET_RAISE = False
+    # number of rendered template fragments kept in memory, 0 turns it off
+    FRAGMENT_CACHE_SIZE = int(os.environ.get("FRAGMENT_CACHE_SIZE", "5000"))
+    # SQLite file shared by the workers that caches pages for anonymous
+    # visitors, pages aren't cached when it isn't set. Only processes on
+    # the same host share it, so "flask events expire" run on another
+    # host, e.g. a Heroku one-off dyno, doesn't clear it and pages can
+    # show expired events as live for up to PAGE_CACHE_TIMEOUT seconds
+    PAGE_CACHE_PATH = os.environ.get("PAGE_CACHE_PATH")
+    # seconds a cached page is kept if nothing it shows changes
+    PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", "300"))
+    # SQLite file shared by the workers that stores the contents of
+    # sessions, which are kept in signed cookies when it isn't set
+    SESSION_STORE_PATH = os.environ.get("SESSION_STORE_PATH")
+    # store sessions in Redis instead of SESSION_STORE_PATH when set
+    SESSION_REDIS_URL = os.environ.get("SESSION_REDIS_URL")
+    # seconds a stored session that isn't permanent is kept once unused
+    SESSION_STORE_TIMEOUT = int(os.environ.get("SESSION_STORE_TIMEOUT", "86400"))
+    # method and cost passwords are hashed with, e.g. "pbkdf2:sha256:150000"
+    # or "scrypt:32768:8:1", passwords hashed otherwise are hashed again
+    # when their users next log in
+    PASSWORD_HASH_METHOD = os.environ.get(
+        "PASSWORD_HASH_METHOD", "pbkdf2:sha256:150000"
+    )
+    PASSWORD_SALT_LENGTH = int(os.environ.get("PASSWORD_SALT_LENGTH", "8"))
+    # check passwords on a "thread" or "process" pool instead of the
+    # request's thread
+    PASSWORD_VERIFY_POOL = os.environ.get("PASSWORD_VERIFY_POOL", "")
+    # passwords each worker checks at once, other logins wait for their
+    # turn for up to PASSWORD_VERIFY_WAIT seconds and then get a 503
+    PASSWORD_VERIFY_CONCURRENCY = int(os.environ.get("PASSWORD_VERIFY_CONCURRENCY", "2"))
+    PASSWORD_VERIFY_WAIT = float(os.environ.get("PASSWORD_VERIFY_WAIT", "5"))
+    # throttle logins, password reset requests and email changes
+    RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() in {
+        "true",
+        "on",
+        "1",
+    }
+    # attempts allowed in a window of seconds, by IP address and by account
+    RATE_LIMITS = {
+        "login": {"ip": (30, 300), "account": (10, 300)},
+        "password_reset": {"ip": (10, 3600), "account": (3, 3600)},
+        "change_email": {"ip": (10, 3600), "account": (5, 3600)},
+    }
+    # SQLite file where the workers share their counts of attempts, each
+    # worker only counts the attempts it sees when it isn't set
+    RATE_LIMIT_STORE_PATH = os.environ.get("RATE_LIMIT_STORE_PATH")
+    # serve static assets under names with a hash of their contents in them
+    ASSET_FINGERPRINTING = os.environ.get("ASSET_FINGERPRINTING", "true").lower() in {
+        "true",
+        "on",
+        "1",
+    }
+    ASSET_DIRECTORIES = ["css", "js", "fonts", "favicons"]
+    # where "flask assets build" writes fingerprinted, compressed assets
+    ASSET_BUILD_FOLDER = os.environ.get(
+        "ASSET_BUILD_FOLDER", os.path.join(basedir, "app/static_build")
+    )
+    # let administrators profile requests with ?__profile=1
+    PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() in {
+        "true",
+        "on",
+        "1",
+    }
+    # where the stats of profiled requests are saved
+    PROFILE_DIR = os.environ.get(
+        "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "sponsormatch-profiles")
+    )
+    # sample the stacks of one in this many requests, 0 turns it off
+    PROFILE_SAMPLE_RATE = int(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+    # milliseconds between the samples of a request
+    PROFILE_SAMPLE_INTERVAL = float(os.environ.get("PROFILE_SAMPLE_INTERVAL", "5"))
+    # bearer token Prometheus scrapes /metrics with, administrators can
+    # also view it when logged in
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+    # directory where each gunicorn worker writes its metrics so that
+    # /metrics can add them up, read by gunicorn.conf.py
+    PROMETHEUS_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    # gunicorn settings read by gunicorn.conf.py
+    GUNICORN_BIND = os.environ.get(
+        "GUNICORN_BIND", "0.0.0.0:%s" % os.environ.get("PORT", "5000")
+    )
+    GUNICORN_WORKER_CLASS = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+    # computed from the worker class and the number of cores when not set,
+    # Heroku sets WEB_CONCURRENCY from the dyno's memory
+    GUNICORN_WORKERS = os.environ.get("GUNICORN_WORKERS", os.environ.get("WEB_CONCURRENCY"))
+    # threads per gthread worker, the database pool should have as many
+    # connections
+    GUNICORN_THREADS = int(os.environ.get("GUNICORN_THREADS", "4"))
+    # restart a worker after this many requests, give or take the jitter,
+    # so that memory it leaked is returned and workers don't all restart
+    # at once
+    GUNICORN_MAX_REQUESTS = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+    GUNICORN_MAX_REQUESTS_JITTER = int(
+        os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100")
+    )
+    GUNICORN_TIMEOUT = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+    GUNICORN_PRELOAD = os.environ.get("GUNICORN_PRELOAD", "true").lower() in {
+        "true",
+        "on",
+        "1",
+    }
 
     @staticmethod
     def init_app(app):
-        pass
+        # handle reverse proxy server headers
+        proxies = app.config["PROXY_FIX_X_FOR"]
+        if proxies:
+            from werkzeug.middleware.proxy_fix import ProxyFix
+
+            app.wsgi_app = ProxyFix(
+                app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies
+            )
 
 
 class DevelopmentConfig(Config):
     """Class to setup the development configuration for the application"""
 
     DEBUG = True
+    # edited assets would keep the fingerprint computed at startup
+    ASSET_FINGERPRINTING = False
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         "DEV_DATABASE_URL"
     ) or "sqlite:///" + os.path.join(basedir, "data-dev.sqlite")
@@ -52,19 +226,40 @@ class TestingConfig(Config):
 
     TESTING = True
     WTF_CSRF_ENABLED = False
+    QUERY_BUDGET_RAISE = True
     SQLALCHEMY_DATABASE_URI = "sqlite://"
+    # the tests create a lot of users
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
 
 
 class ProductionConfig(Config):
     """Class to setop the production configuration for the application"""
 
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL")
+    SQLALCHEMY_ENGINE_OPTIONS = create_engine_options(pool_size=10, max_overflow=5)
+    PAGE_CACHE_PATH = os.environ.get(
+        "PAGE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "sponsormatch-pages.sqlite")
+    )
+    SESSION_STORE_PATH = os.environ.get(
+        "SESSION_STORE_PATH",
+        os.path.join(tempfile.gettempdir(), "sponsormatch-sessions.sqlite"),
+    )
+    RATE_LIMIT_STORE_PATH = os.environ.get(
+        "RATE_LIMIT_STORE_PATH",
+        os.path.join(tempfile.gettempdir(), "sponsormatch-ratelimits.sqlite"),
+    )
+    PROMETHEUS_MULTIPROC_DIR = os.environ.get(
+        "PROMETHEUS_MULTIPROC_DIR",
+        os.path.join(tempfile.gettempdir(), "sponsormatch-metrics"),
+    )
 
     @classmethod
     def init_app(cls, app):
         Config.init_app(app)
 
-        # email errors to the administrator
+        # email errors to the administrator, if there is one to email
+        if not cls.ADMIN_EMAIL:
+            return
         import logging
         from logging.handlers import SMTPHandler
 
@@ -90,16 +285,16 @@ class HerokuConfig(ProductionConfig):
     """Class to setup configurations for heroku."""
 
     SSL_REDIRECT = True if os.environ.get("DYNO") else False
+    # requests come through the Heroku router
+    PROXY_FIX_X_FOR = int(os.environ.get("PROXY_FIX_X_FOR", "1"))
+    # Heroku Postgres caps connections per database, and each dyno
+    # runs several workers with their own pool
+    SQLALCHEMY_ENGINE_OPTIONS = create_engine_options(pool_size=3, max_overflow=2)
 
     @classmethod
     def init_app(cls, app):
         ProductionConfig.init_app(app)
 
-        # handle reverse proxy server headers
-        from werkzeug.contrib.fixers import ProxyFix
-
-        app.wsgi_app = ProxyFix(app.wsgi_app)
-
         # log to stderr
         import logging
         from logging import StreamHandler
@@ -113,7 +308,7 @@ class DockerConfig(ProductionConfig):
     """Class to setup configurations for docker deployment."""
 
     @classmethod
-    def init__app(cls, app):
+    def init_app(cls, app):
         ProductionConfig.init_app(app)
 
         # log to stderr
@@ -0,0 +1,64 @@
+"""This module contains the gunicorn settings for deployments. They are
+read from the configuration class selected by FLASK_CONFIG, e.g.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The application is loaded before the workers are forked so that they
+share the memory of the imported code, and each worker then opens its
+own database and Elasticsearch connections.
+"""
+
+
+import os
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+
+from config import CONFIG_MAPPER, default_worker_count
+
+
+settings = CONFIG_MAPPER[os.environ.get("FLASK_CONFIG", "default")]
+
+bind = settings.GUNICORN_BIND
+worker_class = settings.GUNICORN_WORKER_CLASS
+workers = int(settings.GUNICORN_WORKERS or default_worker_count(worker_class))
+# gunicorn switches sync workers with more than one thread to gthread
+threads = settings.GUNICORN_THREADS if worker_class == "gthread" else 1
+preload_app = settings.GUNICORN_PRELOAD
+max_requests = settings.GUNICORN_MAX_REQUESTS
+max_requests_jitter = settings.GUNICORN_MAX_REQUESTS_JITTER
+timeout = settings.GUNICORN_TIMEOUT
+graceful_timeout = settings.GUNICORN_TIMEOUT
+accesslog = "-"
+errorlog = "-"
+
+# the workers write their metrics to files in this directory, which has
+# to be set up before the preloaded application imports prometheus_client,
+# without the files left by the workers of an earlier run
+metrics_dir = settings.PROMETHEUS_MULTIPROC_DIR
+if metrics_dir:
+    os.makedirs(metrics_dir, exist_ok=True)
+    for filename in os.listdir(metrics_dir):
+        os.remove(os.path.join(metrics_dir, filename))
+    os.environ["prometheus_multiproc_dir"] = metrics_dir
+
+
+def post_fork(server, worker):
+    """Give the worker its own connections instead of the ones the
+    application opened in the master process.
+    """
+    if preload_app:
+        from app import init_worker
+
+        # the preloaded application, whichever module gunicorn loaded it from
+        init_worker(server.app.wsgi())
+
+
+def child_exit(server, worker):
+    """Stop counting the live gauges of a worker that exited."""
+    if metrics_dir:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
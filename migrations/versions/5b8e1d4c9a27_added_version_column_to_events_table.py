@@ -0,0 +1,29 @@
+"""Added version column to events table
+
+Revision ID: 5b8e1d4c9a27
+Revises: 9e4b7a2c5d13
+Create Date: 2026-10-19 16:21:43.118290
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e1d4c9a27'
+down_revision = '9e4b7a2c5d13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.alter_column('version', server_default=None)
+
+
+def downgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,55 @@
+"""Added status column to events table
+
+Revision ID: 9e4b7a2c5d13
+Revises: 3c9d2f1a7b64
+Create Date: 2026-10-19 14:02:17.552731
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4b7a2c5d13'
+down_revision = '3c9d2f1a7b64'
+branch_labels = None
+depends_on = None
+
+
+event_status = sa.Enum('draft', 'live', 'past', name='event_status')
+
+
+def upgrade():
+    event_status.create(op.get_bind(), checkfirst=True)
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('status', event_status, server_default='draft', nullable=False))
+
+    # backfill the status of events that were published before this revision
+    op.execute(
+        "UPDATE events SET status = 'live' "
+        "WHERE published AND end_datetime > CURRENT_TIMESTAMP"
+    )
+    op.execute(
+        "UPDATE events SET status = 'past' "
+        "WHERE published AND end_datetime <= CURRENT_TIMESTAMP"
+    )
+
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.alter_column('status', server_default=None)
+        batch_op.drop_index('ix_events_live_end_datetime')
+        batch_op.drop_index('ix_events_user_id_end_datetime')
+        batch_op.drop_index('ix_events_published_end_datetime')
+        batch_op.create_index('ix_events_live_end_datetime', ['end_datetime'], unique=False, postgresql_where=sa.text("status = 'live'"), sqlite_where=sa.text("status = 'live'"))
+        batch_op.create_index('ix_events_user_id_status', ['user_id', 'status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('events', schema=None) as batch_op:
+        batch_op.drop_index('ix_events_user_id_status')
+        batch_op.drop_index('ix_events_live_end_datetime')
+        batch_op.create_index('ix_events_published_end_datetime', ['published', 'end_datetime'], unique=False)
+        batch_op.create_index('ix_events_user_id_end_datetime', ['user_id', 'end_datetime'], unique=False)
+        batch_op.create_index('ix_events_live_end_datetime', ['end_datetime'], unique=False, postgresql_where=sa.text('published'), sqlite_where=sa.text('published'))
+        batch_op.drop_column('status')
+
+    event_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,31 @@
+"""Added updated_at columns to events and users tables
+
+Revision ID: d1f6a3b8e520
+Revises: 5b8e1d4c9a27
+Create Date: 2026-10-19 18:05:12.640215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd1f6a3b8e520'
+down_revision = '5b8e1d4c9a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('events', 'users'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False))
+
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column('updated_at', server_default=None)
+
+
+def downgrade():
+    for table in ('users', 'events'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -6,14 +6,9 @@ convenient command line tools
 import os
 import click
 import sys
-from dotenv import load_dotenv
-
-
-load_dotenv()
-
-
-from app import create_app
-from app.fake import FakeDataGenerator
+from flask_migrate import Migrate
+from wsgi import app
+from app.assets import build_assets
 from app.models import (
     User,
     Role,
@@ -28,36 +23,12 @@ from app.models import (
     Permission,
     Sponsorship,
 )
-from flask_migrate import upgrade
-from app.extensions import db, migrate
-from app.error_handlers import (
-    page_not_found,
-    internal_server_error,
-    bad_request,
-    forbidden,
-)
-from werkzeug.exceptions import (
-    NotFound,
-    InternalServerError,
-    BadRequest,
-    Forbidden,
-)
-from app.search import MatchQuery, BooleanQuery, ElasticsearchClient
+from app.extensions import db
+from app.search import MatchQuery, BooleanQuery, ElasticsearchClient, RepairType
 
 
-app = create_app(
-    os.environ.get("FLASK_CONFIG", "default"),
-    os.environ.get("USE_ELASTICSEARCH", 1) == 1,
-)
-
-# Register application wide error handlers
-app.register_error_handler(NotFound, page_not_found)
-app.register_error_handler(InternalServerError, internal_server_error)
-app.register_error_handler(BadRequest, bad_request)
-app.register_error_handler(Forbidden, forbidden)
-
-# Register with Flask-Migrate
-migrate.init_app(app, db)
+# Register with Flask-Migrate, which is only needed by the command line tools
+migrate = Migrate(app, db)
 
 
 @app.shell_context_processor
@@ -120,6 +91,8 @@ def setup_environment(fake_data):
 
     # add fake data to the database
     if fake_data:
+        from app.fake import FakeDataGenerator
+
         fake = FakeDataGenerator(48, 48)
         fake.add_all()
 
@@ -134,6 +107,8 @@ def setup_environment(fake_data):
 )
 def deploy(fake_data):
     """Run the below set of tasks before deployment."""
+    from flask_migrate import upgrade
+
     # migrate database to latest revision
     upgrade()
 
@@ -147,8 +122,117 @@ def deploy(fake_data):
     es_client.create_index("events")
     # add fake data to the database if there isn't already fake data in the tables
     if fake_data:
+        from app.fake import FakeDataGenerator
+
         fake = FakeDataGenerator(48, 48)
-        fake.add_all()        
+        fake.add_all()
+
+
+@app.cli.command("fake-data")
+@click.option("--users", default=48, help="Number of users to add.")
+@click.option("--events", default=48, help="Number of events to add.")
+@click.option("--seed", default=0, help="Seed of the generated data.")
+@click.option(
+    "--workers", default=os.cpu_count() or 1, help="Processes generating rows."
+)
+@click.option(
+    "--index/--no-index", default=True, help="Index the events in Elasticsearch."
+)
+def fake_data(users, events, seed, workers, index):
+    """Add generated users and events, with their venues, packages,
+    images and sponsorships, to the database.
+    """
+    from app.fake import FakeDataGenerator
+
+    fake = FakeDataGenerator(users, events, seed=seed, workers=workers)
+    fake.add_all(index=index)
+
+
+@app.cli.group()
+def assets():
+    """Commands to manage static assets."""
+
+
+@assets.command()
+def build():
+    """Write fingerprinted and precompressed copies of the static assets,
+    and their manifest, to ASSET_BUILD_FOLDER. Meant to be run when
+    deploying, before the application starts.
+    """
+    manifest = build_assets(
+        app.static_folder,
+        app.config["ASSET_DIRECTORIES"],
+        app.config["ASSET_BUILD_FOLDER"],
+    )
+    click.echo(f"{len(manifest.assets)} assets written to {manifest.folder}")
+
+
+@app.cli.group()
+def events():
+    """Commands to manage events."""
+
+
+@events.command()
+def expire():
+    """Move live events that have ended to past status. Meant to be
+    run periodically, e.g. every few minutes from cron or the Heroku
+    Scheduler.
+
+    Only the page cache at this process's PAGE_CACHE_PATH is cleared,
+    so the command has to run on the host that serves the pages to
+    clear theirs. Elsewhere, e.g. on a Heroku one-off dyno, which has its
+    own temporary directory, the web processes keep serving cached pages
+    that list the expired events as live for up to PAGE_CACHE_TIMEOUT
+    seconds.
+    """
+    num_expired = Event.expire_events()
+    db.session.commit()
+    # the bulk update bypasses the session, so drop the cached pages here
+    if num_expired and app.page_cache is not None:
+        app.page_cache.clear()
+    click.echo(f"{num_expired} events moved to past")
+
+
+@app.cli.group()
+def search():
+    """Commands to manage the Elasticsearch indices."""
+
+
+@search.command()
+@click.option(
+    "--apply/--no-apply",
+    default=False,
+    help="Apply the repairs to the index instead of only reporting them.",
+)
+@click.option(
+    "--batch-size", default=1000, help="Number of rows and documents loaded at a time."
+)
+def verify(apply, batch_size):
+    """Compare the events table with its index and report the documents
+    that are missing, stale or orphaned. Use --apply to repair them
+    with the bulk API.
+    """
+    search_middleware = app.sqlalchemy_search_middleware
+    counts = {RepairType.ADD: 0, RepairType.UPDATE: 0, RepairType.DELETE: 0}
+
+    def report(differences):
+        for difference in differences:
+            repair_type, document_id, _ = difference
+            counts[repair_type] += 1
+            click.echo(f"{repair_type} {Event.__tablename__} {document_id}")
+            yield difference
+
+    differences = report(search_middleware.find_index_differences(Event, batch_size))
+    if apply:
+        search_middleware.repair_index(Event, differences)
+    else:
+        for _ in differences:
+            pass
+    click.echo(
+        f"{counts[RepairType.ADD]} missing, {counts[RepairType.UPDATE]} stale, "
+        f"{counts[RepairType.DELETE]} orphaned"
+        + (" - repaired" if apply else "")
+    )
 
 
 if __name__ == "__main__":
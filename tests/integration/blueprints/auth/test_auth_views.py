@@ -2,10 +2,13 @@
 
 
 import unittest
+from unittest import mock
 from tests.integration.testing_data import ViewFunctionTestData, TestModelFactory
 from app import create_app
 from app.extensions import db
 from app.models import User, Role
+from app.passwords import PasswordHasherBusy
+from config import TestingConfig
 
 
 class AuthViewsTestCase(unittest.TestCase):
@@ -271,6 +274,121 @@ class AuthViewsTestCase(unittest.TestCase):
                     self.assertEqual(response.status_code, 403)
                     self.assertTrue("Forbidden" in response.get_data(as_text=True))
 
+    def test_login_rehashes_password(self):
+        """Test that logging in hashes the password again when the
+        hashing parameters changed, and only then.
+        """
+        user = TestModelFactory.create_user(password="password")
+        user.role = Role.query.filter_by(name="Sponsor").first()
+        db.session.add(user)
+        db.session.commit()
+        old_hash = user.password_hash
+        self.app.password_hasher.method = "pbkdf2:sha256:2000"
+        self.client.post(
+            "/auth/login", data={"email": user.email, "password": "password"}
+        )
+        user = User.query.get(user.id)
+        self.assertTrue(user.password_hash.startswith("pbkdf2:sha256:2000$"))
+        self.assertTrue(user.verify_password("password"))
+        new_hash = user.password_hash
+        self.client.get("/auth/logout")
+        self.client.post(
+            "/auth/login", data={"email": user.email, "password": "password"}
+        )
+        self.assertEqual(User.query.get(user.id).password_hash, new_hash)
+        self.assertNotEqual(new_hash, old_hash)
+
+    def test_login_busy(self):
+        """Test that a login is turned away with a 503 when the worker
+        is already checking as many passwords as it is allowed to.
+        """
+        user = TestModelFactory.create_user(password="password")
+        user.role = Role.query.filter_by(name="Sponsor").first()
+        db.session.add(user)
+        db.session.commit()
+        with mock.patch.object(
+            self.app.password_hasher, "verify", side_effect=PasswordHasherBusy()
+        ):
+            response = self.client.post(
+                "/auth/login", data={"email": user.email, "password": "password"}
+            )
+        self.assertEqual(response.status_code, 503)
+
+    def test_login_throttled(self):
+        """Test that once an account or an IP address has used up its
+        login attempts, further attempts are turned away before the
+        password is checked.
+        """
+        user = TestModelFactory.create_user(password="password")
+        user.role = Role.query.filter_by(name="Sponsor").first()
+        db.session.add(user)
+        db.session.commit()
+        self.app.config["RATE_LIMITS"] = {"login": {"ip": (4, 60), "account": (2, 60)}}
+        verify = mock.Mock(wraps=self.app.password_hasher.verify)
+        with mock.patch.object(self.app.password_hasher, "verify", verify):
+            statuses = [
+                self.client.post(
+                    "/auth/login", data={"email": user.email, "password": "wrong"}
+                ).status_code
+                for _ in range(3)
+            ]
+            self.assertEqual(statuses, [200, 200, 429])
+            self.assertEqual(verify.call_count, 2)
+            for email in ["a@example.com", "b@example.com", "c@example.com"]:
+                response = self.client.post(
+                    "/auth/login", data={"email": email, "password": "wrong"}
+                )
+            self.assertEqual(response.status_code, 429)
+            self.assertGreater(int(response.headers["Retry-After"]), 0)
+            response = self.client.post(
+                "/auth/login",
+                data={"email": email, "password": "wrong"},
+                environ_base={"REMOTE_ADDR": "10.0.0.2"},
+            )
+            self.assertEqual(response.status_code, 200)
+
+    def test_password_reset_throttled(self):
+        """Test that password reset emails stop being sent to an
+        account that asked for too many.
+        """
+        user = TestModelFactory.create_user(password="password")
+        user.role = Role.query.filter_by(name="Sponsor").first()
+        db.session.add(user)
+        db.session.commit()
+        self.app.config["RATE_LIMITS"] = {
+            "password_reset": {"ip": (10, 60), "account": (1, 60)}
+        }
+        with mock.patch("app.blueprints.auth.services.send_email") as send_email:
+            for _ in range(3):
+                response = self.client.post(
+                    "/auth/request-password-reset", data={"email": user.email}
+                )
+        self.assertEqual(response.status_code, 429)
+        send_email.assert_called_once()
+
+    def test_login_throttled_by_forwarded_address(self):
+        """Test that behind a reverse proxy, clients are counted by the
+        address the proxy forwards instead of the proxy's own.
+        """
+        self.app.config["PROXY_FIX_X_FOR"] = 1
+        TestingConfig.init_app(self.app)
+        self.app.config["RATE_LIMITS"] = {
+            "login": {"ip": (1, 60), "account": (10, 60)}
+        }
+        client = self.app.test_client()
+
+        def login(forwarded_for):
+            return client.post(
+                "/auth/login",
+                data={"email": "user@example.com", "password": "wrong"},
+                headers={"X-Forwarded-For": forwarded_for},
+                environ_base={"REMOTE_ADDR": "10.0.0.1"},
+            ).status_code
+
+        self.assertEqual(login("203.0.113.1"), 200)
+        self.assertEqual(login("203.0.113.2"), 200)
+        self.assertEqual(login("203.0.113.1"), 429)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -201,6 +201,45 @@ class EventViewsTestCase(unittest.TestCase):
         self.assertIsNone(event)
         self.assertIsNone(user.events.first())
 
+    def test_edit_basic_info_updates_status(self):
+        """Test that moving a past event's end date into the future
+        makes it live again, and that drafts stay drafts.
+        """
+        role = Role.query.filter_by(name="Event Organizer").first()
+        user = TestModelFactory.create_user(password="password")
+        user.role = role
+        past = TestModelFactory.create_event("Past Event", "past")
+        draft = TestModelFactory.create_event("Draft Event", "draft", "Type", "Category")
+        for event in [past, draft]:
+            event.user = user
+            event.venue = TestModelFactory.create_venue(f"{event.title} Ave")
+            event.start_datetime = datetime.now() - timedelta(days=3)
+            event.end_datetime = datetime.now() - timedelta(days=1)
+        db.session.add_all([user, past, draft])
+        db.session.commit()
+
+        with self.client:
+            self.client.post(
+                "/auth/login",
+                data={"email": user.email, "password": "password"},
+                follow_redirects=True,
+            )
+            for event in [past, draft]:
+                data = dict(
+                    ViewFunctionTestData.VALID_EVENT_DATA,
+                    event_type=1,
+                    category=1,
+                    address=event.venue.address,
+                )
+                response = self.client.post(
+                    f"/events/{event.id}/basic-info", data=data, follow_redirects=True
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertIn("Your changes were saved.", response.get_data(as_text=True))
+
+        self.assertTrue(Event.query.get(past.id).is_ongoing())
+        self.assertTrue(Event.query.get(draft.id).is_draft())
+
     def test_packages_valid_input(self):
         """Test sending valid input to the packages
         view function.
@@ -0,0 +1,82 @@
+"""This module contains tests for the view functions in the internal blueprint."""
+
+
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models import Role
+from tests.integration.testing_data import TestModelFactory
+
+
+class InternalViewsTestCase(unittest.TestCase):
+    """Class to test view functions in the internal blueprint."""
+
+    def setUp(self):
+        """Create application instance and insert necessary
+        information into the database before each test.
+        """
+        self.app = create_app("testing", False)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        Role.insert_roles()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Pop application context, remove the db session,
+        and drop all tables in the database.
+        """
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, role_name):
+        """Create a user with the given role and log them in."""
+        user = TestModelFactory.create_user(password="password")
+        user.role = Role.query.filter_by(name=role_name).first()
+        db.session.add(user)
+        db.session.commit()
+        self.client.post(
+            "/auth/login", data={"email": user.email, "password": "password"}
+        )
+
+    def test_search_metrics_requires_admin(self):
+        """Test that only administrators can view the search metrics."""
+        response = self.client.get("/internal/search-metrics")
+        self.assertEqual(response.status_code, 302)
+
+        self.login("Sponsor")
+        response = self.client.get("/internal/search-metrics")
+        self.assertEqual(response.status_code, 403)
+
+    def test_search_metrics(self):
+        """Test that administrators can view the search metrics."""
+        self.login("Administrator")
+        response = self.client.get("/internal/search-metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.get_json(), {"endpoints": {}, "slowest_queries": []}
+        )
+
+    def test_db_pool_requires_admin(self):
+        """Test that only administrators can view the pool statistics."""
+        response = self.client.get("/internal/db-pool")
+        self.assertEqual(response.status_code, 302)
+
+        self.login("Sponsor")
+        response = self.client.get("/internal/db-pool")
+        self.assertEqual(response.status_code, 403)
+
+    def test_db_pool(self):
+        """Test that administrators can view the pool statistics."""
+        self.login("Administrator")
+        response = self.client.get("/internal/db-pool")
+        self.assertEqual(response.status_code, 200)
+        statistics = response.get_json()["primary"]
+        self.assertGreater(statistics["checkouts"], 0)
+        self.assertIn("checkout_wait", statistics)
+        self.assertIn("status", statistics)
+
+
+if __name__ == "__main__":
+    unittest.main()
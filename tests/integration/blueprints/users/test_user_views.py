@@ -0,0 +1,68 @@
+"""This module contains tests for the view functions in the users blueprint."""
+
+
+import unittest
+from app import create_app
+from app.extensions import db
+from app.blueprints.users import services
+from tests.integration.testing_data import TestModelFactory
+from app.models import Role, SponsorshipStatus
+
+
+class UserViewsTestCase(unittest.TestCase):
+    """Class to test view functions in the users blueprint."""
+
+    def setUp(self):
+        """Create application instance and insert necessary
+        information into the database before each test.
+        """
+        self.app = create_app("testing", False)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        Role.insert_roles()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Pop application context, remove the db session,
+        and drop all tables in the database.
+        """
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_sponsored_events_listed_once(self):
+        """Test that an event is listed once for a sponsor who bought
+        several of its packages.
+        """
+        organizer = TestModelFactory.create_user(email="organizer@gmail.com")
+        organizer.role = Role.query.filter_by(name="Event Organizer").first()
+        sponsor = TestModelFactory.create_user(email="sponsor@gmail.com", company="XYZ Corp")
+        sponsor.role = Role.query.filter_by(name="Sponsor").first()
+        event = TestModelFactory.create_event("Foo", "live")
+        event.user = organizer
+        event.venue = TestModelFactory.create_venue()
+        for _ in range(2):
+            package = TestModelFactory.create_package()
+            package.event = event
+            sponsorship = TestModelFactory.create_sponsorship(SponsorshipStatus.CURRENT)
+            sponsorship.event = event
+            sponsorship.sponsor = sponsor
+            sponsorship.package = package
+            db.session.add(sponsorship)
+        db.session.add_all([organizer, sponsor, event])
+        db.session.commit()
+
+        pagination = services.get_user_sponsored_events_by_status(
+            SponsorshipStatus.CURRENT, sponsor, 1, 20
+        )
+        self.assertEqual([card.id for card in pagination.items], [event.id])
+        self.assertEqual(pagination.total, 1)
+
+        response = self.client.get(f"/users/{sponsor.id}/sponsorships/current")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_data(as_text=True).count("Foo"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
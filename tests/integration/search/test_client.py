@@ -4,9 +4,10 @@ the elasticsearch low level client."""
 
 import unittest
 from app import create_app
+from app.extensions import db
 from tests.integration.testing_data import TestModelFactory
 from app.models import Event
-from app.search import FlaskSQLAlchemyMiddleware, ElasticsearchClient
+from app.search import FlaskSQLAlchemyMiddleware, ElasticsearchClient, MatchQuery
 
 
 class ElasticsearchClientTestCase(unittest.TestCase):
@@ -19,6 +20,14 @@ class ElasticsearchClientTestCase(unittest.TestCase):
         information into the database before each test.
         """
         self.app = create_app("testing", True)
+        # the search listeners are added to every session, so remove
+        # them to keep them from syncing the indices in later tests
+        middleware = self.app.sqlalchemy_search_middleware
+        for name, listener in [
+            ("before_commit", middleware.before_commit),
+            ("after_commit", middleware.after_commit),
+        ]:
+            self.addCleanup(db.event.remove, db.session, name, listener)
         self.app_context = self.app.app_context()
         self.app_context.push()
         self.es_client = ElasticsearchClient(self.app.config["ELASTICSEARCH_URL"])
@@ -59,6 +68,53 @@ class ElasticsearchClientTestCase(unittest.TestCase):
         self.es_client.delete_index("testing_index")
         self.assertFalse(self.es_client._client.indices.exists("testing_index"))
 
+    def test_update_partial(self):
+        """Test that partial updates only change the given fields
+        and create the document if it doesn't exist.
+        """
+        venue = TestModelFactory.create_venue()
+        event = TestModelFactory.create_event("Foobar", "live", id=1)
+        event.venue = venue
+        document_body = FlaskSQLAlchemyMiddleware.extract_searchable_fields(event)
+        self.es_client.add_to_index("testing_index", "testing", event.id, document_body)
+
+        self.es_client.update_partial("testing_index", event.id, {"published": False})
+        document = self.es_client._client.get(index="testing_index", id=event.id)
+        self.assertFalse(document["_source"]["published"])
+        self.assertEqual(document["_source"]["title"], "Foobar")
+
+        # upsert a document that isn't in the index yet
+        self.es_client.update_partial("testing_index", 2, {"title": "Eric's Party"})
+        document = self.es_client._client.get(index="testing_index", id=2)
+        self.assertEqual(document["_source"], {"title": "Eric's Party"})
+
+    def test_multi_query(self):
+        """Test that multiple queries can be sent in a single request
+        and that a response is returned for each query in order.
+        """
+        venue = TestModelFactory.create_venue()
+        event_one = TestModelFactory.create_event("Foobar", "live", id=1)
+        event_two = TestModelFactory.create_event("Eric's Party", "live", id=2)
+        for event in (event_one, event_two):
+            event.venue = venue
+            document_body = FlaskSQLAlchemyMiddleware.extract_searchable_fields(event)
+            self.es_client.add_to_index(
+                "testing_index", "testing", event.id, document_body
+            )
+        self.es_client._client.indices.refresh("testing_index")
+
+        queries = [
+            MatchQuery("title", "Foobar"),
+            MatchQuery("title", "Party"),
+            MatchQuery("title", "Philly"),
+        ]
+        responses = self.es_client.multi_query("testing_index", queries)
+        self.assertEqual(len(responses), 3)
+        self.assertEqual(responses[0].document_ids, [1])
+        self.assertEqual(responses[1].document_ids, [2])
+        self.assertEqual(responses[2].total, 0)
+        self.assertIs(responses[0].query, queries[0])
+
 
 
 if __name__ == "__main__":
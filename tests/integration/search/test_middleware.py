@@ -24,10 +24,21 @@ class SearhcMiddlewareTestCase(unittest.TestCase):
         information into the database before each test.
         """
         self.app = create_app("testing", True)
+        # the search listeners are added to every session, so remove
+        # them to keep them from syncing the indices in later tests
+        middleware = self.app.sqlalchemy_search_middleware
+        for name, listener in [
+            ("before_commit", middleware.before_commit),
+            ("after_commit", middleware.after_commit),
+        ]:
+            self.addCleanup(db.event.remove, db.session, name, listener)
         self.app_context = self.app.app_context()
         self.app_context.push()
         self.search_middleware = self.app.sqlalchemy_search_middleware
         db.create_all()
+        # restore the index the other tests expect events to be in
+        self.addCleanup(setattr, Event, "__tablename__", Event.__tablename__)
+        self.addCleanup(setattr, Event, "__doctype__", Event.__doctype__)
         Event.__tablename__ = "testing_index"
         Event.__doctype__ = "testing"
 
@@ -62,13 +73,13 @@ class SearhcMiddlewareTestCase(unittest.TestCase):
         time.sleep(2)
         match_query1 = MatchQuery("title", "Eric's Party")
         response, pagination = self.search_middleware.search(Event, match_query1)
-        self.assertEqual(pagination.items.first(), event)
+        self.assertEqual(pagination.items[0], event)
         self.assertEqual(response.total, 1)
 
         # lowercase should work too
         match_query2 = MatchQuery("title", "Eeric's Party")
         response, pagination = self.search_middleware.search(Event, match_query2)
-        self.assertEqual(pagination.items.first(), event)
+        self.assertEqual(pagination.items[0], event)
         self.assertEqual(response.total, 1)
 
     def test_no_search_results(self):
@@ -93,7 +104,7 @@ class SearhcMiddlewareTestCase(unittest.TestCase):
         # search should return nothing
         match_query1 = MatchQuery("title", "Philly")
         response, pagination = self.search_middleware.search(Event, match_query1)
-        self.assertIsNone(pagination.items.first())
+        self.assertEqual(pagination.items, [])
         self.assertEqual(response.total, 0)
 
     def test_search_partial_matches(self):
@@ -122,23 +133,23 @@ class SearhcMiddlewareTestCase(unittest.TestCase):
 
         match_query1 = MatchQuery("title", "Foo")
         response, pagination = self.search_middleware.search(Event, match_query1)
-        self.assertIsNone(pagination.items.first())
+        self.assertEqual(pagination.items, [])
         self.assertEqual(response.total, 0)
 
         match_query2 = MatchQuery("title", "Part")
         response, pagination = self.search_middleware.search(Event, match_query2)
-        self.assertIsNone(pagination.items.first())
+        self.assertEqual(pagination.items, [])
         self.assertEqual(response.total, 0)
 
         match_query3 = MatchQuery("title", "Eric's Fooba")
         response, pagination = self.search_middleware.search(Event, match_query3)
-        self.assertEqual(pagination.items.all(), [event_one, event_two])
+        self.assertEqual(pagination.items, [event_one, event_two])
         self.assertEqual(response.total, 2)
 
         match_query4 = MatchQuery("title", "Party")
         response, pagination = self.search_middleware.search(Event, match_query4)
-        self.assertEqual(pagination.items.first(), event_two)
-        self.assertNotEqual(pagination.items.first(), event_one)
+        self.assertEqual(pagination.items[0], event_two)
+        self.assertNotEqual(pagination.items[0], event_one)
         self.assertEqual(response.total, 1)
 
     def test_event_search_invalid_parameters(self):
@@ -189,7 +200,7 @@ class SearhcMiddlewareTestCase(unittest.TestCase):
 
         match_query = MatchQuery("title", "Foobar")
         response, pagination = self.search_middleware.search(Event, match_query)
-        self.assertEqual(pagination.items.first(), event)
+        self.assertEqual(pagination.items[0], event)
         self.assertEqual(response.total, 1)
 
     def test_delete_after_commit(self):
@@ -212,7 +223,7 @@ class SearhcMiddlewareTestCase(unittest.TestCase):
 
         match_query1 = MatchQuery("title", "Foobar")
         response, pagination = self.search_middleware.search(Event, match_query1)
-        self.assertEqual(pagination.items.first(), event)
+        self.assertEqual(pagination.items[0], event)
         self.assertEqual(response.total, 1)
 
         db.session.delete(event)
@@ -222,7 +233,7 @@ class SearhcMiddlewareTestCase(unittest.TestCase):
 
         match_query2 = MatchQuery("title", "Foobar")
         response, pagination = self.search_middleware.search(Event, match_query2)
-        self.assertIsNone(pagination.items.first())
+        self.assertEqual(pagination.items, [])
         self.assertEqual(response.total, 0)
 
     def test_update_after_commit(self):
@@ -245,7 +256,7 @@ class SearhcMiddlewareTestCase(unittest.TestCase):
         # confirm that the event is in Elasticsearch
         match_query1 = MatchQuery("title", "Foobar")
         response, pagination = self.search_middleware.search(Event, match_query1)
-        self.assertEqual(pagination.items.first(), event)
+        self.assertEqual(pagination.items[0], event)
         self.assertEqual(response.total, 1)
 
         # update title
@@ -257,9 +268,52 @@ class SearhcMiddlewareTestCase(unittest.TestCase):
         # check that the update was recognized
         match_query2 = MatchQuery("title", "Eric's Party")
         response, pagination = self.search_middleware.search(Event, match_query2)
-        self.assertEqual(pagination.items.first(), event)
+        self.assertEqual(pagination.items[0], event)
         self.assertEqual(response.total, 1)
 
+    def test_multi_search(self):
+        """Test that multiple searches return a pagination object
+        for each query with the matching events in order.
+        """
+        role = TestModelFactory.create_role("Event Organizer")
+        user = TestModelFactory.create_user(
+            password="password_one", email="dave@gmail.com", company="ABC Corp"
+        )
+        user.role = role
+        venue_one = TestModelFactory.create_venue(address="123 Main St.")
+        venue_two = TestModelFactory.create_venue(address="456 Main St.")
+        event_one = TestModelFactory.create_event("Eric's Foobar", "live", id=1)
+        event_two = TestModelFactory.create_event(
+            "Eric's Party", "live", event_type="Convention", event_category="Sports", id=2
+        )
+        event_one.user = user
+        event_two.user = user
+        event_one.venue = venue_one
+        event_two.venue = venue_two
+        db.session.add_all([user, event_one, event_two])
+        db.session.commit()
+
+        time.sleep(2)
+
+        queries = [
+            MatchQuery("title", "Party"),
+            MatchQuery("title", "Eric's Fooba"),
+            MatchQuery("title", "Philly"),
+        ]
+        results = self.search_middleware.multi_search(Event, queries)
+        self.assertEqual(len(results), 3)
+
+        response, pagination = results[0]
+        self.assertEqual(pagination.items, [event_two])
+        self.assertEqual(response.total, 1)
+
+        response, pagination = results[1]
+        self.assertEqual(pagination.items, [event_one, event_two])
+        self.assertEqual(response.total, 2)
+
+        response, pagination = results[2]
+        self.assertEqual(pagination.items, [])
+        self.assertEqual(response.total, 0)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,164 @@
+"""This module contains tests for answering conditional GET requests
+for event and profile pages.
+"""
+
+
+import unittest
+from datetime import datetime, timedelta
+from werkzeug.http import http_date
+from app import create_app
+from app.extensions import db
+from app.models import ImageType, Role, SponsorshipStatus
+from tests.integration.testing_data import TestModelFactory, assert_query_count
+
+
+class ConditionalRequestTestCase(unittest.TestCase):
+    """Class to test ETags, Last-Modified and 304 responses."""
+
+    def setUp(self):
+        """Create application instance and insert an event with its
+        organizer and a sponsor.
+        """
+        self.app = create_app("testing", False)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.session.remove()
+        db.create_all()
+        Role.insert_roles()
+        ImageType.insert_image_types()
+        self.client = self.app.test_client()
+        self.organizer = TestModelFactory.create_user()
+        self.organizer.role = Role.query.filter_by(name="Event Organizer").first()
+        self.sponsor = TestModelFactory.create_user(
+            email="sponsor@gmail.com", company="Sponsor Corp"
+        )
+        self.sponsor.role = Role.query.filter_by(name="Sponsor").first()
+        self.event = TestModelFactory.create_event("Event", "live")
+        self.event.user = self.organizer
+        self.event.venue = TestModelFactory.create_venue()
+        self.event.packages.append(TestModelFactory.create_package())
+        db.session.add_all([self.event, self.sponsor])
+        db.session.commit()
+
+    def tearDown(self):
+        """Pop application context, remove the db session,
+        and drop all tables in the database.
+        """
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def revalidate(self, url, response, client=None):
+        """Request the url again with the ETag of the given response."""
+        return (client or self.client).get(
+            url, headers={"If-None-Match": response.headers["ETag"]}
+        )
+
+    def test_event_page(self):
+        """Test that the event page is answered with 304 without being
+        rendered until the event, its packages or its organizer change.
+        """
+        response = self.client.get("/events/1")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["ETag"].startswith('W/"'))
+        self.assertIn("Last-Modified", response.headers)
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+
+        # only the statement that reads the validators is run
+        with assert_query_count(self, 1):
+            not_modified = self.revalidate("/events/1", response)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.get_data(), b"")
+        self.assertEqual(not_modified.headers["ETag"], response.headers["ETag"])
+
+        for change in [
+            lambda: setattr(self.event, "title", "New Title"),
+            lambda: setattr(self.event.packages.first(), "price", 2000),
+            lambda: setattr(self.organizer, "company", "New Corp"),
+        ]:
+            change()
+            db.session.commit()
+            modified = self.revalidate("/events/1", response)
+            self.assertEqual(modified.status_code, 200)
+            self.assertNotEqual(modified.headers["ETag"], response.headers["ETag"])
+            response = modified
+
+    def test_if_modified_since(self):
+        """Test that anonymous visitors get a 304 when the page hasn't
+        changed since the given date.
+        """
+        response = self.client.get(
+            "/events/1", headers={"If-Modified-Since": http_date(datetime.utcnow())}
+        )
+        self.assertEqual(response.status_code, 304)
+        earlier = datetime.utcnow() - timedelta(days=1)
+        response = self.client.get(
+            "/events/1", headers={"If-Modified-Since": http_date(earlier)}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_viewer_is_part_of_etag(self):
+        """Test that an anonymous visitor's copy isn't reused once they
+        log in, since the page shows them different buttons.
+        """
+        response = self.client.get("/events/1")
+        self.client.post(
+            "/auth/login", data={"email": self.organizer.email, "password": "password"}
+        )
+        self.assertEqual(self.revalidate("/events/1", response).status_code, 200)
+
+    def test_missing_event(self):
+        """Test that the view still returns a 404 for a missing event."""
+        response = self.client.get("/events/10")
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("ETag", response.headers)
+
+    def test_profile_page(self):
+        """Test that profile pages are answered with 304 until the user,
+        their events or their sponsorships change.
+        """
+        response = self.client.get("/users/ABC Corp")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.revalidate("/users/ABC Corp", response).status_code, 304)
+        self.assertEqual(
+            self.client.get(
+                "/users/ABC Corp?past=1",
+                headers={"If-None-Match": response.headers["ETag"]},
+            ).status_code,
+            200,
+        )
+
+        event = TestModelFactory.create_event("Another Event", "live", "Type", "Cat")
+        event.user = self.organizer
+        event.venue = TestModelFactory.create_venue("1 Main St")
+        db.session.add(event)
+        db.session.commit()
+        self.assertEqual(self.revalidate("/users/ABC Corp", response).status_code, 200)
+
+        response = self.client.get("/users/Sponsor Corp")
+        self.assertEqual(
+            self.revalidate("/users/Sponsor Corp", response).status_code, 304
+        )
+        package = self.event.packages.first()
+        sponsorship = TestModelFactory.create_sponsorship(SponsorshipStatus.CURRENT)
+        sponsorship.package = package
+        sponsorship.event = self.event
+        sponsorship.sponsor = self.sponsor
+        db.session.add(sponsorship)
+        db.session.commit()
+        self.assertEqual(
+            self.revalidate("/users/Sponsor Corp", response).status_code, 200
+        )
+
+        self.sponsor.about = "About"
+        db.session.commit()
+        response = self.client.get("/users/Sponsor Corp")
+        self.sponsor.about = "Changed"
+        db.session.commit()
+        self.assertEqual(
+            self.revalidate("/users/Sponsor Corp", response).status_code, 200
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
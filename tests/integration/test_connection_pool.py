@@ -0,0 +1,133 @@
+"""This module contains a stress test that saturates the connection pool
+and checks the statistics that are kept about it.
+"""
+
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+from app import create_app
+from app.database import TimedQueuePool
+from app.extensions import db
+
+
+POOL_SIZE = 2
+MAX_OVERFLOW = 1
+POOL_TIMEOUT = 1
+
+
+class ConnectionPoolTestCase(unittest.TestCase):
+    """Class to test the connection pool settings and statistics."""
+
+    def setUp(self):
+        """Create an application instance with a small connection pool."""
+        self.directory = tempfile.mkdtemp()
+        self.app = create_app("testing", False)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(
+            self.directory, "pool.sqlite"
+        )
+        # SQLite files get a NullPool unless a QueuePool is asked for
+        self.app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            "poolclass": QueuePool,
+            "pool_size": POOL_SIZE,
+            "max_overflow": MAX_OVERFLOW,
+            "pool_timeout": POOL_TIMEOUT,
+            "connect_args": {"check_same_thread": False},
+        }
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.engine = db.get_engine(self.app)
+
+    def tearDown(self):
+        """Pop application context and delete the database."""
+        self.engine.dispose()
+        self.app_context.pop()
+        shutil.rmtree(self.directory)
+
+    def hold_connections(self, num_connections):
+        """Check out the given number of connections and return them."""
+        return [self.engine.connect() for _ in range(num_connections)]
+
+    def test_pool_settings(self):
+        """Test that the engine options are applied to the pool."""
+        self.assertIsInstance(self.engine.pool, TimedQueuePool)
+        self.assertEqual(self.engine.pool.size(), POOL_SIZE)
+        self.assertEqual(self.engine.pool._max_overflow, MAX_OVERFLOW)
+
+    def test_saturated_pool(self):
+        """Test that checkouts past the pool size are counted as overflow,
+        that a checkout waits for a connection to be returned when the
+        pool is exhausted and that it times out when none is returned.
+        """
+        connections = self.hold_connections(POOL_SIZE + MAX_OVERFLOW)
+        statistics = self.engine.pool_statistics.to_dict()
+        self.assertEqual(statistics["in_use"], POOL_SIZE + MAX_OVERFLOW)
+        self.assertEqual(statistics["peak_in_use"], POOL_SIZE + MAX_OVERFLOW)
+        self.assertEqual(statistics["overflow_checkouts"], MAX_OVERFLOW)
+
+        # nothing is returned to the pool, so the next checkout times out
+        with self.assertRaises(exc.TimeoutError):
+            self.engine.connect()
+        self.assertEqual(self.engine.pool_statistics.timeouts, 1)
+
+        # a connection returned by another thread ends the wait
+        release = threading.Timer(0.2, connections[0].close)
+        release.start()
+        start = time.perf_counter()
+        connection = self.engine.connect()
+        waited = time.perf_counter() - start
+        release.join()
+        self.assertGreaterEqual(waited, 0.1)
+
+        wait_buckets = self.engine.pool_statistics.checkout_wait.to_dict()["buckets"]
+        self.assertEqual(self.engine.pool_statistics.checkout_wait.count, 5)
+        # the three immediate checkouts are fast, the last two waited
+        self.assertEqual(wait_buckets["100"], 3)
+        self.assertEqual(wait_buckets["+Inf"], 5)
+
+        for held in connections[1:] + [connection]:
+            held.close()
+        statistics = self.engine.pool_statistics.to_dict()
+        self.assertEqual(statistics["in_use"], 0)
+        self.assertEqual(statistics["checkouts"], statistics["checkins"])
+
+    def test_many_threads(self):
+        """Test that more threads than connections can share the pool
+        without timing out when each holds a connection briefly.
+        """
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(5):
+                    with self.engine.connect() as connection:
+                        connection.execute("SELECT 1")
+                        time.sleep(0.01)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        statistics = self.engine.pool_statistics.to_dict()
+        self.assertEqual(errors, [])
+        self.assertEqual(statistics["checkouts"], 50)
+        self.assertEqual(statistics["in_use"], 0)
+        self.assertLessEqual(statistics["peak_in_use"], POOL_SIZE + MAX_OVERFLOW)
+        self.assertEqual(statistics["timeouts"], 0)
+
+    def test_recreated_pool_keeps_statistics(self):
+        """Test that disposing of the engine keeps its statistics."""
+        self.engine.connect().close()
+        self.engine.dispose()
+        self.engine.connect().close()
+        self.assertIs(self.engine.pool.statistics, self.engine.pool_statistics)
+        self.assertEqual(self.engine.pool_statistics.checkouts, 2)
@@ -0,0 +1,125 @@
+"""This module contains tests for the fake data generator."""
+
+
+import unittest
+from unittest import mock
+from app import create_app
+from app.extensions import db
+from app.fake import FakeDataGenerator, csv_field
+from app.models import (
+    Event,
+    EventCategory,
+    EventType,
+    Image,
+    ImageType,
+    Package,
+    Role,
+    Sponsorship,
+    User,
+)
+from app.search import FlaskSQLAlchemyMiddleware
+
+
+class FakeDataGeneratorTestCase(unittest.TestCase):
+    """Class to test generating fake data in bulk."""
+
+    def setUp(self):
+        """Create application instance and insert the lookup tables."""
+        self.app = create_app("testing", False)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.session.remove()
+        db.create_all()
+        Role.insert_roles()
+        EventType.insert_event_types()
+        EventCategory.insert_event_categories()
+        ImageType.insert_image_types()
+
+    def tearDown(self):
+        """Pop application context, remove the db session,
+        and drop all tables in the database.
+        """
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def generate(self, workers):
+        """Generate users and events in partitions of ten rows and
+        return the rows that don't depend on the time or on a salt.
+        """
+        with mock.patch("app.fake.PARTITION_SIZE", 10):
+            fake = FakeDataGenerator(25, 30, seed=1, workers=workers)
+            fake.add_all(index=False)
+        rows = [
+            User.query.with_entities(User.id, User.email, User.company, User.role_id),
+            Event.query.with_entities(
+                Event.id, Event.title, Event.start_datetime, Event.user_id
+            ),
+            Package.query.with_entities(Package.id, Package.price, Package.event_id),
+            Sponsorship.query.with_entities(
+                Sponsorship.event_id,
+                Sponsorship.sponsor_id,
+                Sponsorship.package_id,
+                Sponsorship.confirmation_code,
+            ),
+            Image.query.with_entities(Image.path, Image.event_id),
+        ]
+        return [sorted(query.all()) for query in rows]
+
+    def test_deterministic(self):
+        """Test that the same seed generates the same rows, whether or
+        not they are generated by several processes.
+        """
+        rows = self.generate(workers=1)
+        db.drop_all()
+        db.create_all()
+        Role.insert_roles()
+        EventType.insert_event_types()
+        EventCategory.insert_event_categories()
+        ImageType.insert_image_types()
+        self.assertEqual(self.generate(workers=2), rows)
+
+    def test_rows(self):
+        """Test that the events have packages and sponsorships from
+        different sponsors, and that every user can log in.
+        """
+        self.generate(workers=1)
+        self.assertEqual(User.query.count(), 25)
+        self.assertEqual(Event.query.count(), 30)
+        self.assertEqual(Package.query.count(), 30 * 4)
+        organizer = Role.query.filter_by(name="Event Organizer").first()
+        self.assertTrue(all(event.user.role == organizer for event in Event.query))
+        for event in Event.query:
+            sponsors = [sponsorship.sponsor_id for sponsorship in event.sponsorships]
+            self.assertEqual(len(sponsors), len(set(sponsors)))
+        for package in Package.query:
+            self.assertEqual(package.num_purchased, len(package.sponsorships))
+            self.assertLessEqual(package.num_purchased, package.available_packages)
+        self.assertTrue(User.query.get(1).verify_password("password"))
+
+    def test_csv_field(self):
+        """Test that only None is written as an unquoted empty field,
+        which COPY loads as null, and that strings are quoted.
+        """
+        self.assertEqual(csv_field(None), "")
+        self.assertEqual(csv_field(""), '""')
+        self.assertEqual(csv_field('Say "hi", Bob'), '"Say ""hi"", Bob"')
+        self.assertEqual(csv_field(12), "12")
+
+    def test_index(self):
+        """Test that the events are indexed with the bulk API."""
+        fake = FakeDataGenerator(5, 8, seed=1)
+        client = mock.Mock()
+        client.bulk.side_effect = lambda actions, chunk_size: len(list(actions))
+        with mock.patch.object(
+            FakeDataGenerator,
+            "search_middleware",
+            mock.PropertyMock(return_value=FlaskSQLAlchemyMiddleware(client, db)),
+        ):
+            fake.add_all()
+        client.bulk.assert_called_once()
+        client.add_to_index.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+"""This module contains tests for the Prometheus metrics."""
+
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from flask_mail import Message
+from prometheus_client import REGISTRY
+from app import create_app
+from app.extensions import db
+from app.metrics import EMAIL_QUEUE_DEPTH, observe_payment, observe_search
+from app.models import Role
+from app.utils.email import send_async_email
+from tests.integration.testing_data import TestModelFactory
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def sample(name, **labels):
+    """Return the current value of the sample, or 0 if it isn't set."""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTestCase(unittest.TestCase):
+    """Class to test recording and exposing metrics."""
+
+    def setUp(self):
+        """Create application instance and insert the roles."""
+        self.app = create_app("testing", False)
+        self.app.config["METRICS_TOKEN"] = "token"
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.session.remove()
+        db.create_all()
+        Role.insert_roles()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Pop application context, remove the db session,
+        and drop all tables in the database.
+        """
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_requests(self):
+        """Test that the latency and status of requests are recorded
+        per endpoint.
+        """
+        labels = {"blueprint": "main", "endpoint": "main.index", "method": "GET"}
+        requests = sample("http_request_duration_seconds_count", **labels)
+        responses = sample("http_responses_total", status="200", **labels)
+        not_found = sample(
+            "http_responses_total",
+            blueprint="",
+            endpoint="none",
+            method="GET",
+            status="404",
+        )
+        selects = sample("db_statement_duration_seconds_count", statement="select")
+        self.client.get("/")
+        self.client.get("/missing")
+        self.assertEqual(
+            sample("http_request_duration_seconds_count", **labels), requests + 1
+        )
+        self.assertEqual(
+            sample("http_responses_total", status="200", **labels), responses + 1
+        )
+        self.assertEqual(
+            sample(
+                "http_responses_total",
+                blueprint="",
+                endpoint="none",
+                method="GET",
+                status="404",
+            ),
+            not_found + 1,
+        )
+        self.assertGreater(
+            sample("db_statement_duration_seconds_count", statement="select"), selects
+        )
+
+    def test_access(self):
+        """Test that the metrics can only be viewed with the token or
+        by an administrator.
+        """
+        self.assertEqual(self.client.get("/metrics").status_code, 403)
+        response = self.client.get(
+            "/metrics", headers={"Authorization": "Bearer wrong"}
+        )
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.get("/metrics", headers={"Authorization": "Bearer token"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain; version=0.0.4"))
+        self.assertIn(b"http_request_duration_seconds_bucket", response.get_data())
+
+        user = TestModelFactory.create_user(password="password")
+        user.role = Role.query.filter_by(name="Administrator").first()
+        db.session.add(user)
+        db.session.commit()
+        self.client.post(
+            "/auth/login", data={"email": user.email, "password": "password"}
+        )
+        self.assertEqual(self.client.get("/metrics").status_code, 200)
+
+    def test_email(self):
+        """Test that sending an email leaves the queue and is timed."""
+        sent = sample("email_send_duration_seconds_count")
+        depth = sample("email_queue_depth")
+        message = Message("Subject", sender="sender@gmail.com", recipients=["a@b.com"])
+        # send_email adds the message to the queue before starting its thread
+        EMAIL_QUEUE_DEPTH.inc()
+        self.assertEqual(sample("email_queue_depth"), depth + 1)
+        send_async_email(self.app, message)
+        self.assertEqual(sample("email_queue_depth"), depth)
+        self.assertEqual(sample("email_send_duration_seconds_count"), sent + 1)
+
+    def test_search_and_payments(self):
+        """Test that calls to Elasticsearch and Stripe are timed and
+        that their failures are counted.
+        """
+        queries = sample("search_request_duration_seconds_count", operation="test")
+
+        @observe_search("test")
+        def query():
+            return "results"
+
+        self.assertEqual(query(), "results")
+        self.assertEqual(
+            sample("search_request_duration_seconds_count", operation="test"),
+            queries + 1,
+        )
+
+        errors = sample("payment_request_errors_total", operation="test")
+        payments = sample("payment_request_duration_seconds_count", operation="test")
+        with self.assertRaises(ValueError):
+            with observe_payment("test"):
+                raise ValueError()
+        self.assertEqual(
+            sample("payment_request_errors_total", operation="test"), errors + 1
+        )
+        self.assertEqual(
+            sample("payment_request_duration_seconds_count", operation="test"),
+            payments + 1,
+        )
+
+
+class MultiprocessMetricsTestCase(unittest.TestCase):
+    """Class to test adding up the metrics of several workers."""
+
+    def setUp(self):
+        """Create the directory the processes write their metrics to."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Delete the directory."""
+        shutil.rmtree(self.directory)
+
+    def run_python(self, code):
+        """Run the code in a new process that writes its metrics to the
+        directory and return what it printed.
+        """
+        environment = dict(os.environ, prometheus_multiproc_dir=self.directory)
+        return subprocess.check_output(
+            [sys.executable, "-c", code], cwd=ROOT, env=environment
+        )
+
+    def test_workers_are_added_up(self):
+        """Test that the metrics of every process are collected."""
+        code = (
+            "from app.metrics import RESPONSES; "
+            "RESPONSES.labels('main', 'main.index', 'GET', '200').inc()"
+        )
+        self.run_python(code)
+        self.run_python(code)
+        metrics = self.run_python(
+            "import sys; from app.metrics import collect_metrics; "
+            "sys.stdout.buffer.write(collect_metrics())"
+        )
+        self.assertIn(
+            b'http_responses_total{blueprint="main",endpoint="main.index",'
+            b'method="GET",status="200"} 2.0',
+            metrics,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,187 @@
+"""This module contains tests for the page cache that serves public
+pages to anonymous visitors.
+"""
+
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from app import create_app
+from app.cache import SQLiteCache, init_page_cache
+from app.extensions import db
+from app.models import ImageType, Role
+from tests.integration.testing_data import TestModelFactory
+
+
+class SQLiteCacheTestCase(unittest.TestCase):
+    """Class to test the cache stored in a SQLite file."""
+
+    def setUp(self):
+        """Create a cache in a temporary directory."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "cache.sqlite")
+        self.cache = SQLiteCache(self.path)
+
+    def tearDown(self):
+        """Delete the cache."""
+        shutil.rmtree(self.directory)
+
+    def test_shared_between_instances(self):
+        """Test that a value stored by one worker can be read by another."""
+        self.cache.set("key", {"value": 1})
+        self.assertEqual(SQLiteCache(self.path).get("key"), {"value": 1})
+
+    def test_expiry(self):
+        """Test that values are not returned once they expire."""
+        self.cache.set("key", "value", timeout=0.05)
+        self.assertEqual(self.cache.get("key"), "value")
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get("key"))
+
+    def test_invalidate(self):
+        """Test that invalidating a tag deletes only the values stored
+        with that tag.
+        """
+        self.cache.set("a", 1, tags=["event:1", "events"])
+        self.cache.set("b", 2, tags=["event:2", "events"])
+        self.cache.set("c", 3, tags=["user:1"])
+        self.cache.invalidate(["event:1"])
+        self.assertIsNone(self.cache.get("a"))
+        self.assertEqual(self.cache.get("b"), 2)
+        self.cache.invalidate(["events", "unknown"])
+        self.assertIsNone(self.cache.get("b"))
+        self.assertEqual(self.cache.get("c"), 3)
+        self.cache.clear()
+        self.assertIsNone(self.cache.get("c"))
+
+
+class PageCacheTestCase(unittest.TestCase):
+    """Class to test caching pages for anonymous visitors."""
+
+    def setUp(self):
+        """Create application instance with a page cache and insert
+        an event with its organizer.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.app = create_app("testing", False)
+        self.app.config["PAGE_CACHE_PATH"] = os.path.join(
+            self.directory, "pages.sqlite"
+        )
+        init_page_cache(self.app)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        Role.insert_roles()
+        ImageType.insert_image_types()
+        self.client = self.app.test_client()
+        self.user = TestModelFactory.create_user()
+        self.user.role = Role.query.filter_by(name="Event Organizer").first()
+        self.events = []
+        for number in range(2):
+            event = TestModelFactory.create_event(
+                f"Event {number}", "live", f"Type {number}", f"Category {number}"
+            )
+            event.user = self.user
+            event.venue = TestModelFactory.create_venue(f"{number} Ford Ave")
+            event.packages.append(TestModelFactory.create_package())
+            self.events.append(event)
+        db.session.add_all(self.events)
+        db.session.commit()
+
+    def tearDown(self):
+        """Pop application context, remove the db session,
+        drop all tables in the database and delete the page cache.
+        """
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.directory)
+
+    def assertCache(self, url, status, client=None, **kwargs):
+        """Request the url and check whether it was served from the cache."""
+        response = (client or self.client).get(url, **kwargs)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers.get("X-Page-Cache"), status)
+        return response
+
+    def test_anonymous_pages_are_cached(self):
+        """Test that public pages are rendered once and then served
+        from the cache to every anonymous visitor.
+        """
+        for url in ["/", "/events/1", "/events/1/info", "/users/ABC Corp"]:
+            first = self.assertCache(url, "MISS")
+            second = self.assertCache(url, "HIT", client=self.app.test_client())
+            self.assertEqual(first.get_data(), second.get_data())
+
+    def test_key(self):
+        """Test that the query string and Accept-Encoding header are
+        part of the key.
+        """
+        self.assertCache("/", "MISS")
+        self.assertCache("/?page=2", "MISS")
+        self.assertCache("/", "MISS", headers={"Accept-Encoding": "gzip"})
+        self.assertCache("/", "HIT")
+
+    def test_commit_invalidates_pages(self):
+        """Test that pages that show a changed row are dropped from
+        the cache and that other pages are kept.
+        """
+        for url in ["/", "/events/1", "/events/2", "/users/ABC Corp"]:
+            self.assertCache(url, "MISS")
+        self.events[0].title = "New Title"
+        db.session.commit()
+        response = self.assertCache("/", "MISS")
+        self.assertIn("New Title", response.get_data(as_text=True))
+        self.assertCache("/events/1", "MISS")
+        self.assertCache("/events/2", "HIT")
+        self.assertCache("/users/ABC Corp", "MISS")
+
+        self.user.about = "About"
+        db.session.commit()
+        self.assertCache("/users/ABC Corp", "MISS")
+        self.assertCache("/events/2", "HIT")
+
+        self.events[1].packages.first().price = 2000
+        db.session.commit()
+        self.assertCache("/events/2", "MISS")
+
+    def test_rollback_keeps_pages(self):
+        """Test that changes that are rolled back don't drop pages."""
+        self.assertCache("/events/1", "MISS")
+        self.events[0].title = "New Title"
+        db.session.flush()
+        db.session.rollback()
+        db.session.commit()
+        self.assertCache("/events/1", "HIT")
+
+    def test_authenticated_users_bypass_cache(self):
+        """Test that logged in users neither read nor fill the cache."""
+        self.client.post(
+            "/auth/login", data={"email": self.user.email, "password": "password"}
+        )
+        response = self.client.get("/")
+        self.assertNotIn("X-Page-Cache", response.headers)
+        self.assertCache("/", "MISS", client=self.app.test_client())
+
+    def test_flashed_messages_bypass_cache(self):
+        """Test that visitors with flashed messages get a rendered page."""
+        self.assertCache("/", "MISS")
+        with self.client.session_transaction() as session:
+            session["_flashes"] = [("success", "Message")]
+        response = self.client.get("/")
+        self.assertNotIn("X-Page-Cache", response.headers)
+        self.assertIn("Message", response.get_data(as_text=True))
+
+    def test_pages_with_csrf_tokens_are_not_cached(self):
+        """Test that pages with a CSRF protected form are not stored,
+        since the token is tied to the visitor's session.
+        """
+        self.app.config["WTF_CSRF_ENABLED"] = True
+        self.assertCache("/events/1", "MISS")
+        self.assertCache("/events/1", "MISS", client=self.app.test_client())
+
+
+if __name__ == "__main__":
+    unittest.main()
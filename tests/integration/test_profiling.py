@@ -0,0 +1,200 @@
+"""This module contains tests for profiling requests."""
+
+
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from app import create_app
+from app.extensions import db
+from app.models import Role
+from app.profiling import (
+    ENDPOINT_KEY,
+    ProfileStore,
+    ProfilingMiddleware,
+    StackSampler,
+    collapse,
+    init_profiling,
+)
+from tests.integration.testing_data import TestModelFactory
+
+
+class StackSamplerTestCase(unittest.TestCase):
+    """Class to test sampling the stacks of a thread."""
+
+    def test_collapse(self):
+        """Test that stacks are collapsed from the outermost frame in."""
+
+        def inner():
+            return collapse(sys._getframe())
+
+        stack = inner()
+        self.assertTrue(
+            stack.endswith(__name__ + ":test_collapse;" + __name__ + ":inner")
+        )
+        frame = sys._getframe()
+        self.assertEqual(collapse(frame, frame.f_back), __name__ + ":test_collapse")
+
+    def test_sampler(self):
+        """Test that the stacks of the given thread are counted."""
+        sampler = StackSampler(threading.get_ident(), 0.001)
+        sampler.start()
+        deadline = time.time() + 0.1
+        while time.time() < deadline:
+            sum(range(1000))
+        stacks = sampler.stop()
+        self.assertGreater(sum(stacks.values()), 0)
+        self.assertTrue(all("test_sampler" in stack for stack in stacks))
+
+    def test_store(self):
+        """Test that the stacks are added up per endpoint."""
+        store = ProfileStore()
+        store.add("main.index", {"a;b": 2, "a;c": 1})
+        store.add("main.index", {"a;b": 1})
+        self.assertEqual(store.collapsed("main.index"), "a;b 3\na;c 1\n")
+        self.assertIsNone(store.collapsed("events.event"))
+        self.assertEqual(
+            store.to_dict(), {"main.index": {"requests": 2, "samples": 4}}
+        )
+
+
+class ProfilingTestCase(unittest.TestCase):
+    """Class to test the profiling mode."""
+
+    def setUp(self):
+        """Create application instance with profiling turned on."""
+        self.profile_dir = tempfile.mkdtemp()
+        self.app = create_app("testing", False)
+        self.app.config["PROFILING_ENABLED"] = True
+        self.app.config["PROFILE_DIR"] = self.profile_dir
+        self.app.config["PROFILE_SAMPLE_INTERVAL"] = 0.5
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.session.remove()
+        db.create_all()
+        Role.insert_roles()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Pop application context, remove the db session, drop all
+        tables in the database and delete the profiles.
+        """
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.profile_dir)
+
+    def login(self, role_name):
+        """Create a user with the given role and log them in."""
+        user = TestModelFactory.create_user(password="password")
+        user.role = Role.query.filter_by(name=role_name).first()
+        db.session.add(user)
+        db.session.commit()
+        self.client.post(
+            "/auth/login", data={"email": user.email, "password": "password"}
+        )
+
+    def test_disabled(self):
+        """Test that requests aren't profiled unless profiling is on."""
+        self.login("Administrator")
+        response = self.client.get("/?__profile=1")
+        self.assertNotIn("X-Profile-Id", response.headers)
+        self.assertEqual(self.client.get("/internal/profiles").status_code, 404)
+
+    def test_profile_request(self):
+        """Test that an administrator's request is profiled and its
+        stats can be downloaded.
+        """
+        init_profiling(self.app)
+        self.login("Administrator")
+        for response in [
+            self.client.get("/?__profile=1"),
+            self.client.get("/", headers={"X-Profile": "1"}),
+        ]:
+            self.assertEqual(response.status_code, 200)
+            profile_id = response.headers["X-Profile-Id"]
+            path = os.path.join(self.profile_dir, profile_id + ".prof")
+            self.assertGreater(pstats.Stats(path).total_calls, 0)
+
+        response = self.client.get("/internal/profiles/requests/" + profile_id)
+        self.assertEqual(response.status_code, 200)
+        response.close()
+        response = self.client.get("/internal/profiles/requests/../../etc")
+        self.assertEqual(response.status_code, 404)
+
+    def test_only_administrators_can_profile(self):
+        """Test that other users' requests aren't profiled."""
+        init_profiling(self.app)
+        response = self.client.get("/?__profile=1")
+        self.assertNotIn("X-Profile-Id", response.headers)
+        self.login("Sponsor")
+        response = self.client.get("/?__profile=1")
+        self.assertNotIn("X-Profile-Id", response.headers)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+        self.assertEqual(self.client.get("/internal/profiles").status_code, 403)
+
+    def test_sampled_requests(self):
+        """Test that one in every N requests is sampled and that the
+        stacks are collected per endpoint.
+        """
+        self.app.config["PROFILE_SAMPLE_RATE"] = 2
+        init_profiling(self.app)
+        index = self.app.view_functions["main.index"]
+
+        def slow_index():
+            # take long enough for the sampler to see the view
+            deadline = time.time() + 0.02
+            while time.time() < deadline:
+                pass
+            return index()
+
+        self.app.view_functions["main.index"] = slow_index
+        for _ in range(4):
+            # the stacks are added once the server closes the response
+            self.client.get("/").close()
+        self.login("Administrator")
+        profiles = self.client.get("/internal/profiles").get_json()
+        self.assertEqual(profiles["main.index"]["requests"], 2)
+        response = self.client.get("/internal/profiles/main.index")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/plain")
+        stacks = response.get_data(as_text=True).splitlines()
+        # samples can also land in the frames between the middleware and Flask
+        self.assertTrue(any(stack.startswith("flask.app:wsgi_app;") for stack in stacks))
+        self.assertTrue(any(__name__ + ":slow_index" in stack for stack in stacks))
+        response = self.client.get("/internal/profiles/users.user_profile")
+        self.assertEqual(response.status_code, 404)
+
+    def test_sampled_response_streamed(self):
+        """Test that the body of a sampled response is streamed rather
+        than buffered, and that its stacks are added once it is closed.
+        """
+        store = ProfileStore()
+        sent = []
+
+        def app(environ, start_response):
+            environ[ENDPOINT_KEY] = "main.stream"
+            start_response("200 OK", [("Content-Type", "text/plain")])
+            for chunk in [b"a", b"b"]:
+                sent.append(chunk)
+                yield chunk
+
+        middleware = ProfilingMiddleware(
+            app, self.app, store, self.profile_dir, sample_rate=1, interval=0.001
+        )
+        app_iter = middleware({}, lambda status, headers, exc_info=None: None)
+        self.assertEqual(sent, [])
+        body = iter(app_iter)
+        self.assertEqual(next(body), b"a")
+        self.assertEqual(sent, [b"a"])
+        self.assertEqual(store.to_dict(), {})
+        app_iter.close()
+        self.assertEqual(store.to_dict()["main.stream"]["requests"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
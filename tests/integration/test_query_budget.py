@@ -0,0 +1,107 @@
+"""This module contains tests for counting the statements run by each
+request and checking them against a budget.
+"""
+
+
+import unittest
+from app import create_app
+from app.database import QueryBudgetExceeded
+from app.extensions import db
+from app.models import Event, ImageType, Role, User
+from tests.integration.testing_data import TestModelFactory, assert_query_count
+
+
+class QueryBudgetTestCase(unittest.TestCase):
+    """Class to test the query counts and budgets of requests."""
+
+    def setUp(self):
+        """Create application instance and insert necessary
+        information into the database before each test.
+        """
+        self.app = create_app("testing", False)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        Role.insert_roles()
+        ImageType.insert_image_types()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Pop application context, remove the db session,
+        and drop all tables in the database.
+        """
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_live_events(self, num_events):
+        """Add the given number of live events with a venue, main image
+        and package each.
+        """
+        user = User.query.first()
+        if user is None:
+            user = TestModelFactory.create_user()
+            user.role = Role.query.filter_by(name="Event Organizer").first()
+        main_image = ImageType.query.filter_by(name="Main Event Image").first()
+        first = Event.query.count()
+        for number in range(first, first + num_events):
+            event = TestModelFactory.create_event(
+                f"Event {number}", "live", f"Type {number}", f"Category {number}"
+            )
+            event.user = user
+            event.venue = TestModelFactory.create_venue(f"{number} Ford Ave")
+            event.images.append(
+                TestModelFactory.create_image(
+                    f"app/static/images/event{number}.jpg", main_image
+                )
+            )
+            event.packages.append(TestModelFactory.create_package())
+            db.session.add(event)
+        db.session.commit()
+
+    def test_server_timing_header(self):
+        """Test that responses report the number of statements run
+        and the time spent on them.
+        """
+        self.add_live_events(2)
+        with assert_query_count(self, 2):
+            response = self.client.get("/")
+        self.assertRegex(
+            response.headers["Server-Timing"], r'^db;dur=\d+\.\d{2};desc="2 queries"$'
+        )
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        """Test that the home page runs the same number of statements
+        however many events are on the page.
+        """
+        self.add_live_events(1)
+        with assert_query_count(self, 2):
+            self.client.get("/")
+        self.add_live_events(5)
+        with assert_query_count(self, 2):
+            self.client.get("/")
+
+    def test_budget_exceeded_raises_in_testing(self):
+        """Test that going over an endpoint's budget fails the request
+        when testing.
+        """
+        self.add_live_events(3)
+        self.app.config["QUERY_BUDGETS"] = {"main.index": 1}
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get("/")
+
+    def test_budget_exceeded_logs_warning(self):
+        """Test that going over the default budget logs a warning
+        when not raising.
+        """
+        self.add_live_events(3)
+        self.app.config["QUERY_BUDGETS"] = {}
+        self.app.config["DEFAULT_QUERY_BUDGET"] = 1
+        self.app.config["QUERY_BUDGET_RAISE"] = False
+        with self.assertLogs(self.app.logger, "WARNING") as logs:
+            response = self.client.get("/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("main.index ran 2 queries, over its budget of 1", logs.output[0])
+
+if __name__ == "__main__":
+    unittest.main()
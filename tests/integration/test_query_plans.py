@@ -0,0 +1,335 @@
+"""This module contains an EXPLAIN based harness that checks that the
+listing queries in the main, users and dashboard blueprints are served
+by an index rather than a full table scan.
+
+The number of seeded events can be set with the QUERY_PLAN_ROWS
+environment variable (QUERY_PLAN_ROWS=1000000 reproduces the million row
+dataset). By default the harness runs against an in memory SQLite
+database; set QUERY_PLAN_DATABASE_URL to point it at PostgreSQL.
+"""
+
+
+import itertools
+import os
+import re
+import unittest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import event as sqlalchemy_event
+from app import create_app
+from app.extensions import db
+from app.models import (
+    Event,
+    EventCategory,
+    EventStatus,
+    EventType,
+    Image,
+    ImageType,
+    Package,
+    Role,
+    Sponsorship,
+    SponsorshipStatus,
+    User,
+    Venue,
+)
+from app.models.events import saved_events
+from app.blueprints.users import services as user_services
+
+
+NUM_EVENTS = int(os.environ.get("QUERY_PLAN_ROWS", 20000))
+NUM_USERS = max(NUM_EVENTS // 100, 10)
+CHUNK_SIZE = 50000
+
+# tables large enough that a full scan would show up in production
+LARGE_TABLES = ["events", "images", "packages", "sponsorships", "saved_events"]
+
+
+@contextmanager
+def captured_statements():
+    """Record every SELECT statement, along with its parameters,
+    that is executed inside the with block.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    sqlalchemy_event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        sqlalchemy_event.remove(
+            db.engine, "before_cursor_execute", before_cursor_execute
+        )
+
+
+def explain(statement, parameters):
+    """Return the query plan for the given statement as a list of lines."""
+    connection = db.session.connection().connection
+    cursor = connection.cursor()
+    if db.engine.dialect.name == "sqlite":
+        cursor.execute("EXPLAIN QUERY PLAN " + statement, parameters)
+        plan = [row[-1] for row in cursor.fetchall()]
+    else:
+        cursor.execute("EXPLAIN " + statement, parameters)
+        plan = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return plan
+
+
+def find_full_scans(plan):
+    """Return the lines in the given plan that scan one of the large
+    tables without using an index.
+    """
+    tables = "|".join(LARGE_TABLES)
+    if db.engine.dialect.name == "sqlite":
+        pattern = re.compile(r"^SCAN (TABLE )?(%s)\b(?!.*USING)" % tables)
+    else:
+        pattern = re.compile(r"Seq Scan on (%s)\b" % tables)
+    return [line for line in plan if pattern.search(line.strip())]
+
+
+def event_status(i, now):
+    """Return the status of the i-th seeded event."""
+    if i % 4 == 0:
+        return EventStatus.DRAFT
+    if (i % 730) - 365 <= 0:
+        return EventStatus.PAST
+    return EventStatus.LIVE
+
+
+def insert_in_chunks(table, rows):
+    """Insert the rows generated by the given iterator in chunks."""
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, CHUNK_SIZE))
+        if not chunk:
+            break
+        db.session.execute(table.insert(), chunk)
+
+
+class QueryPlanTestCase(unittest.TestCase):
+    """Class to test the query plans of the listing queries."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Create an application instance and seed the database once
+        for all of the tests in this class.
+        """
+        database_url = os.environ.get("QUERY_PLAN_DATABASE_URL")
+        cls.app = create_app("testing", False)
+        if database_url:
+            cls.app.config["SQLALCHEMY_DATABASE_URI"] = database_url
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+        # the session is scoped to the thread, not the app, so make sure
+        # one left over from a previous test case isn't reused
+        db.session.remove()
+        db.create_all()
+        Role.insert_roles()
+        ImageType.insert_image_types()
+        EventType.insert_event_types()
+        EventCategory.insert_event_categories()
+        cls.seed_database()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the db session, drop all tables and pop the
+        application context.
+        """
+        db.session.remove()
+        db.drop_all()
+        cls.app_context.pop()
+
+    @classmethod
+    def seed_database(cls):
+        """Bulk insert users, events and their related rows, then
+        refresh the planner statistics.
+        """
+        now = datetime.now()
+        role = Role.query.filter_by(name="Event Organizer").first()
+        main_image = ImageType.query.filter_by(name="Main Event Image").first()
+        event_type = EventType.query.first()
+        event_category = EventCategory.query.first()
+        venue = Venue(
+            name="Madison Square Garden",
+            address="4 Penn Plaza",
+            city="New York",
+            state="NY",
+            zip_code="10001",
+        )
+        db.session.add(venue)
+        db.session.flush()
+
+        insert_in_chunks(
+            User.__table__,
+            (
+                {
+                    "id": i,
+                    "first_name": "First",
+                    "last_name": "Last",
+                    "company": "company%d" % i,
+                    "email": "user%d@example.com" % i,
+                    "password_hash": "hash",
+                    "member_since": now,
+                    "role_id": role.id,
+                }
+                for i in range(1, NUM_USERS + 1)
+            ),
+        )
+        insert_in_chunks(
+            Event.__table__,
+            (
+                {
+                    "id": i,
+                    "title": "Event %d" % i,
+                    "start_datetime": now + timedelta(days=(i % 730) - 366),
+                    "end_datetime": now + timedelta(days=(i % 730) - 365),
+                    "published": i % 4 != 0,
+                    "status": event_status(i, now),
+                    "user_id": i % NUM_USERS + 1,
+                    "venue_id": venue.id,
+                    "event_type_id": event_type.id,
+                    "event_category_id": event_category.id,
+                }
+                for i in range(1, NUM_EVENTS + 1)
+            ),
+        )
+        insert_in_chunks(
+            Image.__table__,
+            (
+                {
+                    "id": i,
+                    "path": "app/static/images/event%d.jpg" % i,
+                    "uploaded_at": now,
+                    "image_type_id": main_image.id,
+                    "event_id": i,
+                }
+                for i in range(1, NUM_EVENTS + 1)
+            ),
+        )
+        insert_in_chunks(
+            Package.__table__,
+            (
+                {
+                    "id": i,
+                    "name": "Gold",
+                    "price": 100,
+                    "audience": "Everyone",
+                    "description": "Gold package",
+                    "available_packages": 10,
+                    "num_purchased": 1,
+                    "package_type": "Unlimited",
+                    "event_id": i,
+                }
+                for i in range(1, NUM_EVENTS + 1)
+            ),
+        )
+        insert_in_chunks(
+            Sponsorship.__table__,
+            (
+                {
+                    "event_id": i,
+                    "sponsor_id": (i * 7) % NUM_USERS + 1,
+                    "package_id": i,
+                    "timestamp": now,
+                }
+                for i in range(1, NUM_EVENTS + 1, 2)
+            ),
+        )
+        insert_in_chunks(
+            saved_events,
+            (
+                {"user_id": (i * 3) % NUM_USERS + 1, "event_id": i}
+                for i in range(1, NUM_EVENTS + 1, 2)
+            ),
+        )
+        db.session.commit()
+        db.session.execute("ANALYZE")
+        db.session.commit()
+
+    def assertUsesIndexes(self, statements):
+        """Assert that none of the given statements scan a large table."""
+        self.assertTrue(statements)
+        for statement, parameters in statements:
+            plan = explain(statement, parameters)
+            with self.subTest(statement=statement):
+                self.assertEqual(find_full_scans(plan), [], "\n".join(plan))
+
+    def assertUsesIndex(self, statement, parameters, index):
+        """Assert that the plan of the given statement uses the index."""
+        plan = explain(statement, parameters)
+        self.assertTrue(any(index in line for line in plan), "\n".join(plan))
+
+    def test_home_page(self):
+        """Test that the home page lists live events using the partial
+        index on live events.
+        """
+        with self.app.test_request_context():
+            with captured_statements() as statements:
+                response = self.app.test_client().get("/")
+        self.assertEqual(response.status_code, 200)
+        self.assertUsesIndexes(statements)
+        listing = [
+            (statement, parameters)
+            for statement, parameters in statements
+            if "FROM events" in statement and "status" in statement
+        ]
+        self.assertTrue(listing)
+        for statement, parameters in listing:
+            with self.subTest(statement=statement):
+                self.assertUsesIndex(
+                    statement, parameters, "ix_events_live_end_datetime"
+                )
+
+    def test_expire_events(self):
+        """Test that finding the live events that have ended uses the
+        partial index on live events.
+        """
+        with captured_statements() as statements:
+            Event.query.filter(
+                Event.is_ongoing(), Event.end_datetime <= datetime.now()
+            ).first()
+        self.assertUsesIndex(*statements[0], "ix_events_live_end_datetime")
+
+    def test_user_profile(self):
+        """Test that the profile page queries use an index."""
+        user = User.query.get(1)
+        sponsor = User.query.get(8)
+        for status in [EventStatus.LIVE, EventStatus.PAST]:
+            with captured_statements() as statements:
+                pagination = user_services.get_user_events_by_status(
+                    status, user, 1, 20
+                )
+                [event.main_image() for event in pagination.items]
+            self.assertUsesIndexes(statements)
+
+        for status in [SponsorshipStatus.CURRENT, SponsorshipStatus.PAST]:
+            with captured_statements() as statements:
+                user_services.get_user_sponsored_events_by_status(
+                    status, sponsor, 1, 20
+                )
+            self.assertUsesIndexes(statements)
+
+    def test_dashboard(self):
+        """Test that the dashboard queries use an index."""
+        user = User.query.get(1)
+        sponsor = User.query.get(8)
+        for status in [EventStatus.LIVE, EventStatus.PAST, EventStatus.DRAFT]:
+            with captured_statements() as statements:
+                user.get_events_by_status(status)
+            self.assertUsesIndexes(statements)
+
+        for status in [SponsorshipStatus.CURRENT, SponsorshipStatus.PAST]:
+            with captured_statements() as statements:
+                for sponsorship in sponsor.get_sponsorships_by_status(status):
+                    sponsorship.event.packages.all()
+            self.assertUsesIndexes(statements)
+
+    def test_saved_events(self):
+        """Test that looking up who saved an event uses an index."""
+        event = Event.query.get(1)
+        with captured_statements() as statements:
+            event.users.all()
+        self.assertUsesIndexes(statements)
@@ -0,0 +1,133 @@
+"""This module contains tests for routing reads to replica databases."""
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from flask import request
+from app import create_app
+from app.extensions import db
+from app.models import Role
+from app.utils import read_only
+
+
+class ReadReplicaTestCase(unittest.TestCase):
+    """Class to test that reads from read-only views are sent to a
+    replica and that everything else is sent to the primary.
+    """
+
+    def setUp(self):
+        """Create an application instance backed by a primary and
+        a replica database that have different rows in them.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.app = create_app("testing", False)
+        self.app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(
+            self.directory, "primary.sqlite"
+        )
+        self.app.config["SQLALCHEMY_BINDS"] = {
+            "replica_0": "sqlite:///" + os.path.join(self.directory, "replica.sqlite")
+        }
+        self.app.config["SQLALCHEMY_REPLICA_BINDS"] = ["replica_0"]
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.session.remove()
+        db.create_all()
+        db.session.add(Role(name="Primary"))
+        db.session.commit()
+
+        # the replica lags behind and only has its own row
+        replica = db.get_engine(self.app, bind="replica_0")
+        db.Model.metadata.create_all(replica)
+        replica.execute(Role.__table__.insert(), {"name": "Replica"})
+        self.add_views()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Pop application context, remove the db session
+        and delete the databases.
+        """
+        db.session.remove()
+        db.drop_all()
+        db.get_engine(self.app).dispose()
+        db.get_engine(self.app, bind="replica_0").dispose()
+        self.app_context.pop()
+        shutil.rmtree(self.directory)
+
+    def add_views(self):
+        """Add views to the application to exercise the routing."""
+
+        def role_names():
+            return ",".join(role.name for role in Role.query.order_by(Role.id))
+
+        @self.app.route("/roles", methods=["GET", "POST"])
+        @read_only
+        def roles():
+            return role_names()
+
+        @self.app.route("/roles/primary")
+        def roles_from_primary():
+            return role_names()
+
+        @self.app.route("/roles/read-then-write")
+        @read_only
+        def read_then_write():
+            before = role_names()
+            db.session.add(Role(name="Written"))
+            db.session.commit()
+            return before + "|" + role_names()
+
+        @self.app.route("/roles/add", methods=["POST"])
+        def add_role():
+            db.session.add(Role(name=request.form["name"]))
+            db.session.commit()
+            return ""
+
+    def test_read_only_view_reads_from_replica(self):
+        """Test that a GET request to a read-only view reads from the replica."""
+        response = self.client.get("/roles")
+        self.assertEqual(response.get_data(as_text=True), "Replica")
+
+    def test_other_views_read_from_primary(self):
+        """Test that views that aren't marked read-only and non GET
+        requests to read-only views use the primary.
+        """
+        response = self.client.get("/roles/primary")
+        self.assertEqual(response.get_data(as_text=True), "Primary")
+        response = self.client.post("/roles")
+        self.assertEqual(response.get_data(as_text=True), "Primary")
+
+    def test_reads_stick_to_primary_after_write(self):
+        """Test that reads after a write in the same request go to the
+        primary database and the write is not sent to the replica.
+        """
+        response = self.client.get("/roles/read-then-write")
+        self.assertEqual(response.get_data(as_text=True), "Replica|Primary,Written")
+
+    def test_reads_stick_to_primary_after_users_commit(self):
+        """Test that a user's reads go to the primary for a short while
+        after they commit, and go back to the replica afterwards.
+        """
+        self.client.post("/roles/add", data={"name": "Mine"})
+        response = self.client.get("/roles")
+        self.assertEqual(response.get_data(as_text=True), "Primary,Mine")
+
+        # other users aren't affected
+        response = self.app.test_client().get("/roles")
+        self.assertEqual(response.get_data(as_text=True), "Replica")
+
+        self.app.config["REPLICA_STICKY_SECONDS"] = 0
+        response = self.client.get("/roles")
+        self.assertEqual(response.get_data(as_text=True), "Replica")
+
+    def test_write_not_remembered_without_replicas(self):
+        """Test that a write doesn't give the user a session cookie
+        when there are no replicas to keep their reads away from.
+        """
+        response = self.client.post("/roles/add", data={"name": "Mine"})
+        self.assertIn("Set-Cookie", response.headers)
+
+        self.app.config["SQLALCHEMY_REPLICA_BINDS"] = []
+        response = self.app.test_client().post("/roles/add", data={"name": "Other"})
+        self.assertNotIn("Set-Cookie", response.headers)
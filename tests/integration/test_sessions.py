@@ -0,0 +1,134 @@
+"""This module contains tests for the sessions stored on the server."""
+
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from flask import session
+from app import create_app
+from app.extensions import db
+from app.models import Role
+from app.sessions import SESSION_KEY_PREFIX, init_sessions
+from tests.integration.testing_data import TestModelFactory
+
+
+class ServerSideSessionTestCase(unittest.TestCase):
+    """Class to test storing sessions in a SQLite file."""
+
+    def setUp(self):
+        """Create application instance with a session store and add
+        views that read and change the session.
+        """
+        self.directory = tempfile.mkdtemp()
+        self.app = create_app("testing", False)
+        self.app.config["SESSION_STORE_PATH"] = os.path.join(
+            self.directory, "sessions.sqlite"
+        )
+        init_sessions(self.app)
+        self.store = self.app.session_interface.store
+        self.app.add_url_rule("/session/read", "read", lambda: repr(dict(session)))
+        self.app.add_url_rule("/session/write", "write", self.write)
+        self.app.add_url_rule("/session/clear", "clear", lambda: repr(session.clear()))
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        Role.insert_roles()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        """Pop application context, remove the db session, drop all
+        tables in the database and delete the session store.
+        """
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def write():
+        """Store a pending order in the session."""
+        session["PENDING_ORDER#1#1"] = [
+            {"package_id": number, "name": "Package %d" % number, "price": 1000.0}
+            for number in range(50)
+        ]
+        return "written"
+
+    def session_id(self):
+        """Return the session id in the client's cookie."""
+        cookies = {cookie.name: cookie.value for cookie in self.client.cookie_jar}
+        return cookies.get(self.app.session_cookie_name)
+
+    def test_only_the_id_is_sent(self):
+        """Test that the browser gets a short id, and that the contents
+        of the session are read back from the store.
+        """
+        response = self.client.get("/session/write")
+        sid = self.session_id()
+        self.assertEqual(len(sid), 32)
+        self.assertLess(len(response.headers["Set-Cookie"]), 100)
+        self.assertIsNotNone(self.store.get(SESSION_KEY_PREFIX + sid))
+        response = self.client.get("/session/read")
+        self.assertIn("Package 49", response.get_data(as_text=True))
+        self.assertNotIn("Set-Cookie", response.headers)
+        self.assertEqual(response.headers["Vary"], "Cookie")
+
+    def test_empty_session_is_not_stored(self):
+        """Test that requests that don't use the session don't store one."""
+        response = self.client.get("/session/read")
+        self.assertNotIn("Set-Cookie", response.headers)
+        self.assertIsNone(self.session_id())
+
+    def test_unknown_id(self):
+        """Test that ids that aren't in the store, like signed cookies
+        from before sessions were stored, start a new session.
+        """
+        for value in ["eyJ1c2VyIjoiRmFjZWJvb2sifQ.Xo2Tjw.abc", "a" * 32]:
+            with self.subTest(value=value):
+                self.client.set_cookie("localhost", "session", value)
+                response = self.client.get("/session/read")
+                self.assertEqual(response.get_data(as_text=True), "{}")
+
+    def test_expiry(self):
+        """Test that a session expires once it isn't used for its
+        timeout, and that using it pushes the expiry back.
+        """
+        self.app.session_interface.timeout = 1
+        self.client.get("/session/write")
+        for _ in range(3):
+            time.sleep(0.6)
+            response = self.client.get("/session/read")
+            self.assertIn("Package 49", response.get_data(as_text=True))
+        time.sleep(1.2)
+        response = self.client.get("/session/read")
+        self.assertEqual(response.get_data(as_text=True), "{}")
+
+    def test_clear(self):
+        """Test that clearing the session deletes it and its cookie."""
+        self.client.get("/session/write")
+        sid = self.session_id()
+        self.client.get("/session/clear")
+        self.assertIsNone(self.session_id())
+        self.assertIsNone(self.store.get(SESSION_KEY_PREFIX + sid))
+
+    def test_login_changes_id(self):
+        """Test that logging in moves the session to a new id."""
+        user = TestModelFactory.create_user(password="password")
+        user.role = Role.query.filter_by(name="Sponsor").first()
+        db.session.add(user)
+        db.session.commit()
+        self.client.get("/session/write")
+        sid = self.session_id()
+        self.client.post(
+            "/auth/login", data={"email": user.email, "password": "password"}
+        )
+        self.assertNotEqual(self.session_id(), sid)
+        self.assertIsNone(self.store.get(SESSION_KEY_PREFIX + sid))
+        response = self.client.get("/session/read")
+        self.assertIn("Package 49", response.get_data(as_text=True))
+        self.assertIn("user_id", response.get_data(as_text=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
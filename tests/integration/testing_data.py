@@ -4,7 +4,9 @@ as well as classes for creating fake models for testing.
 
 
 import uuid
+from contextlib import contextmanager
 from datetime import date, timedelta, datetime
+from app.database import count_queries
 from app.models import (
     User,
     Role,
@@ -22,6 +24,18 @@ from app.models import (
 )
 
 
+@contextmanager
+def assert_query_count(test_case, expected):
+    """Assert that exactly the expected number of SQL statements are
+    run inside the with block, e.g. by a request to a view.
+    """
+    with count_queries() as counter:
+        yield counter
+    test_case.assertEqual(
+        counter.count, expected, "\n\n".join(counter.statements)
+    )
+
+
 class ViewFunctionTestData:
     """Class to hold test parameters for testing view functions"""
 
@@ -436,15 +450,16 @@ class TestModelFactory:
             event_category=EventCategory(name=event_category),
         )
         if status.lower() in EventStatus.LIVE:
-            event.published = True
             event.start_datetime = datetime.now()
             event.end_datetime = datetime.now() + timedelta(days=1)
+            event.publish()
         elif status.lower() == EventStatus.PAST:
-            event.published = True
             event.start_datetime = datetime.now() - timedelta(days=3)
             event.end_datetime = datetime.now() - timedelta(days=1)
+            event.publish()
         elif status.lower() == EventStatus.DRAFT:
             event.published = False
+            event.status = EventStatus.DRAFT
             start_datetime = (datetime.now(),)
             end_datetime = datetime.now() + timedelta(days=1)
         if (
@@ -120,6 +120,101 @@ class EventModelTestCase(unittest.TestCase):
         self.assertFalse(event.has_ended())
         self.assertTrue(event.is_draft())
 
+    def test_publish(self):
+        """Test that publishing an event sets its status
+        based on its end date.
+        """
+        event = TestModelFactory.create_event("Test Event", "draft")
+        event.end_datetime = datetime.now() + timedelta(days=1)
+        event.publish()
+        self.assertTrue(event.published)
+        self.assertTrue(event.is_ongoing())
+
+        event.end_datetime = datetime.now() - timedelta(days=1)
+        event.publish()
+        self.assertTrue(event.has_ended())
+
+    def test_expire_events(self):
+        """Test that live events that have ended are moved to past
+        status and that other events are left alone.
+        """
+        role = TestModelFactory.create_role("Event Organizer")
+        user = TestModelFactory.create_user()
+        user.role = role
+        venue = TestModelFactory.create_venue()
+        ended = TestModelFactory.create_event("Ended", "live", "Type 1", "Category 1")
+        ongoing = TestModelFactory.create_event(
+            "Ongoing", "live", "Type 2", "Category 2"
+        )
+        draft = TestModelFactory.create_event("Draft", "draft", "Type 3", "Category 3")
+        ended.end_datetime = datetime.now() - timedelta(hours=1)
+        draft.end_datetime = datetime.now() - timedelta(hours=1)
+        for event in [ended, ongoing, draft]:
+            event.user = user
+            event.venue = venue
+        db.session.add_all([user, ended, ongoing, draft])
+        db.session.commit()
+
+        self.assertEqual(Event.expire_events(), 1)
+        db.session.commit()
+        self.assertTrue(Event.query.get(ended.id).has_ended())
+        self.assertTrue(Event.query.get(ongoing.id).is_ongoing())
+        self.assertTrue(Event.query.get(draft.id).is_draft())
+        self.assertEqual(Event.expire_events(), 0)
+
+    def test_version(self):
+        """Test that an event's version is bumped when the event, its
+        venue, images or packages are changed, and only then.
+        """
+        role = TestModelFactory.create_role("Event Organizer")
+        user = TestModelFactory.create_user()
+        user.role = role
+        venue = TestModelFactory.create_venue()
+        event = TestModelFactory.create_event("Event", "live")
+        event.user = user
+        event.venue = venue
+        db.session.add_all([user, event])
+        db.session.commit()
+        self.assertEqual(event.version, 1)
+
+        event.title = "New Title"
+        db.session.commit()
+        self.assertEqual(event.version, 2)
+
+        venue.name = "New Venue"
+        db.session.commit()
+        self.assertEqual(event.version, 3)
+
+        package = TestModelFactory.create_package()
+        event.packages.append(package)
+        db.session.commit()
+        self.assertEqual(event.version, 4)
+
+        package.price = 2000
+        db.session.commit()
+        self.assertEqual(event.version, 5)
+
+        image_type = ImageType(name="Main Event Image")
+        image = TestModelFactory.create_image("image.jpg", image_type)
+        event.images.append(image)
+        db.session.commit()
+        self.assertEqual(event.version, 6)
+
+        db.session.delete(image)
+        db.session.commit()
+        self.assertEqual(event.version, 7)
+
+        # changes to other rows leave the event alone
+        user.company = "Another Company"
+        db.session.commit()
+        self.assertEqual(event.version, 7)
+
+        event.end_datetime = datetime.now() - timedelta(hours=1)
+        db.session.commit()
+        Event.expire_events()
+        db.session.commit()
+        self.assertEqual(Event.query.get(event.id).version, 9)
+
     def test_start_date_method(self):
         """Test to ensure correct functionality of
         the start_date() method.
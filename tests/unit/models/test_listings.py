@@ -0,0 +1,108 @@
+"""This module contains tests for the event card read models."""
+
+
+import unittest
+from app import create_app
+from app.extensions import db
+from tests.integration.testing_data import TestModelFactory
+from app.models import (
+    Event,
+    EventCard,
+    EventStatus,
+    ImageType,
+    event_cards,
+    event_cards_by_id,
+)
+
+
+class EventCardTestCase(unittest.TestCase):
+    """Class to run tests on the event card read models."""
+
+    def setUp(self):
+        """Create application instance and insert necessary
+        information into the database before each test.
+        """
+        self.app = create_app("testing", False)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        ImageType.insert_image_types()
+        self.user = TestModelFactory.create_user()
+        self.user.role = TestModelFactory.create_role("Event Organizer")
+        main_image = ImageType.query.filter_by(name="Main Event Image").first()
+        misc_image = ImageType.query.filter_by(name="Misc").first()
+        self.events = []
+        for number in range(3):
+            event = TestModelFactory.create_event(
+                f"Event {number}", "live", f"Type {number}", f"Category {number}"
+            )
+            event.user = self.user
+            event.venue = TestModelFactory.create_venue(f"{number} Ford Ave")
+            event.images.append(
+                TestModelFactory.create_image(
+                    f"app/static/images/misc{number}.jpg", misc_image
+                )
+            )
+            if number > 0:
+                event.images.append(
+                    TestModelFactory.create_image(
+                        f"app/static/images/event{number}.jpg", main_image
+                    )
+                )
+            self.events.append(event)
+        db.session.add_all(self.events)
+        db.session.commit()
+
+    def tearDown(self):
+        """Pop application context, remove the db session,
+        and drop all tables in the database.
+        """
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_event_cards(self):
+        """Test that cards hold the same values the event objects
+        return for the card templates.
+        """
+        cards = event_cards(Event.is_ongoing()).order_by(Event.id).all()
+        self.assertEqual(len(cards), 3)
+        for card, event in zip(cards, self.events):
+            self.assertIsInstance(card, EventCard)
+            self.assertEqual(card.id, event.id)
+            self.assertEqual(card.title, event.title)
+            self.assertEqual(card.venue_name, event.venue.name)
+            self.assertEqual(card.city, event.venue.city)
+            self.assertEqual(card.state, event.venue.state)
+            self.assertEqual(card.main_image, event.main_image())
+            self.assertEqual(card.start_date("%a, %b %-d"), event.start_date("%a, %b %-d"))
+            self.assertEqual(card.start_time("%-I:%M %p"), event.start_time("%-I:%M %p"))
+        self.assertEqual(cards[0].main_image, "")
+        self.assertEqual(cards[1].main_image, "images/event1.jpg")
+
+    def test_event_cards_filter(self):
+        """Test that only the events matching the criteria are returned."""
+        self.events[0].status = EventStatus.PAST
+        db.session.commit()
+        cards = event_cards(Event.is_ongoing()).all()
+        self.assertEqual(
+            sorted(card.id for card in cards), [self.events[1].id, self.events[2].id]
+        )
+
+    def test_event_cards_by_id(self):
+        """Test that cards are returned in the order of the given ids
+        and that missing ids are skipped.
+        """
+        ids = [self.events[2].id, 999, self.events[0].id]
+        cards = event_cards_by_id(ids)
+        self.assertEqual([card.id for card in cards], [self.events[2].id, self.events[0].id])
+        self.assertEqual(event_cards_by_id([]), [])
+
+    def test_event_cards_have_no_instance_dict(self):
+        """Test that cards only store the card columns."""
+        card = event_cards().first()
+        self.assertFalse(hasattr(card, "__dict__"))
+
+
+if __name__ == "__main__":
+    unittest.main()
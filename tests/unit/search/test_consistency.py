@@ -0,0 +1,142 @@
+"""This module contains tests for the functions that find differences
+between a table and its index.
+"""
+
+
+import json
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from app import create_app
+from app.extensions import db
+from app.models import Event
+from tests.integration.testing_data import TestModelFactory
+from app.search import FlaskSQLAlchemyMiddleware, RepairType
+from app.search.consistency import (
+    content_hash,
+    find_differences,
+    stream_database_documents,
+    create_bulk_actions,
+)
+
+
+class ConsistencyTestCase(unittest.TestCase):
+    """Class to run tests on comparing streams of rows
+    and documents.
+    """
+
+    def test_content_hash_matches_indexed_source(self):
+        """Test that a payload and the source of its indexed document
+        have the same hash.
+        """
+        payload = {
+            "title": "Foobar",
+            "start_datetime": datetime(2020, 11, 10, 20, 30),
+            "package_prices": [Decimal("1000.00"), 250.5],
+            "published": True,
+        }
+        source = json.loads(
+            '{"published": true, "package_prices": [1000.0, 250.5], '
+            '"start_datetime": "2020-11-10T20:30:00", "title": "Foobar"}'
+        )
+        self.assertEqual(content_hash(payload), content_hash(source))
+        source["title"] = "Eric's Party"
+        self.assertNotEqual(content_hash(payload), content_hash(source))
+
+    def test_find_differences(self):
+        """Test that missing, stale and orphaned documents
+        are found.
+        """
+        rows = [(1, "a", {"id": 1}), (2, "b", {"id": 2}), (4, "d", {"id": 4})]
+        documents = [(2, "x"), (3, "c"), (4, "d"), (5, "e")]
+        self.assertEqual(
+            list(find_differences(rows, documents)),
+            [
+                (RepairType.ADD, 1, {"id": 1}),
+                (RepairType.UPDATE, 2, {"id": 2}),
+                (RepairType.DELETE, 3, None),
+                (RepairType.DELETE, 5, None),
+            ],
+        )
+
+    def test_find_differences_empty_streams(self):
+        """Test that every row is missing from an empty index
+        and every document is orphaned without any rows.
+        """
+        self.assertEqual(
+            list(find_differences([(1, "a", {"id": 1})], [])),
+            [(RepairType.ADD, 1, {"id": 1})],
+        )
+        self.assertEqual(
+            list(find_differences([], [(1, "a")])), [(RepairType.DELETE, 1, None)]
+        )
+        self.assertEqual(list(find_differences([], [])), [])
+
+    def test_create_bulk_actions(self):
+        """Test that differences are converted to bulk API actions."""
+        differences = [
+            (RepairType.UPDATE, 2, {"id": 2}),
+            (RepairType.DELETE, 3, None),
+        ]
+        self.assertEqual(
+            list(create_bulk_actions("events", differences)),
+            [
+                {"_op_type": "index", "_index": "events", "_id": 2, "_source": {"id": 2}},
+                {"_op_type": "delete", "_index": "events", "_id": 3},
+            ],
+        )
+
+
+class StreamDatabaseDocumentsTestCase(unittest.TestCase):
+    """Class to run tests on streaming rows from the database."""
+
+    def setUp(self):
+        """Create application instance and insert necessary
+        information into the database before each test.
+        """
+        self.app = create_app("testing", False)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        """Pop application context, remove the db session,
+        and drop all tables in the database.
+        """
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_rows_streamed_in_id_order(self):
+        """Test that rows are streamed in id order along with the
+        hash of their searchable fields.
+        """
+        role = TestModelFactory.create_role("Event Organizer")
+        user = TestModelFactory.create_user()
+        user.role = role
+        venue = TestModelFactory.create_venue()
+        events = []
+        for id_ in (3, 1, 2):
+            event = TestModelFactory.create_event(
+                f"Event {id_}",
+                "live",
+                event_type=f"Type {id_}",
+                event_category=f"Category {id_}",
+                id=id_,
+            )
+            event.user = user
+            event.venue = venue
+            events.append(event)
+        db.session.add_all([user] + events)
+        db.session.commit()
+
+        extract_fields = FlaskSQLAlchemyMiddleware.extract_searchable_fields
+        rows = list(stream_database_documents(Event, extract_fields, batch_size=2))
+        self.assertEqual([row[0] for row in rows], [1, 2, 3])
+        event = Event.query.get(1)
+        self.assertEqual(rows[0][1], content_hash(extract_fields(event)))
+        self.assertEqual(rows[0][2]["title"], "Event 1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""This module contains tests for the methods of the search
+middleware that don't require a connection to Elasticsearch.
+"""
+
+
+import unittest
+from unittest import mock
+from app import create_app
+from app.extensions import db
+from app.models import Event, event_cards_by_id
+from tests.integration.testing_data import TestModelFactory
+from app.search import FlaskSQLAlchemyMiddleware, MatchQuery
+from benchmarks.loadtest.search import LocalSearchClient
+
+
+class SearchMiddlewareTestCase(unittest.TestCase):
+    """Class to run tests on how the search middleware
+    extracts fields from models.
+    """
+
+    def setUp(self):
+        """Create application instance and insert necessary
+        information into the database before each test.
+        """
+        self.app = create_app("testing", False)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        role = TestModelFactory.create_role("Event Organizer")
+        user = TestModelFactory.create_user()
+        user.role = role
+        self.event = TestModelFactory.create_event("Test Event", "live")
+        self.event.user = user
+        self.event.venue = TestModelFactory.create_venue()
+        db.session.add_all([user, self.event])
+        db.session.commit()
+
+    def tearDown(self):
+        """Pop application context, remove the db session,
+        and drop all tables in the database.
+        """
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_no_changed_searchable_fields(self):
+        """Test that changes to fields that aren't searchable
+        aren't reported.
+        """
+        self.event.pitch = "A new pitch"
+        self.assertEqual(
+            FlaskSQLAlchemyMiddleware.get_changed_searchable_fields(self.event), []
+        )
+
+    def test_changed_searchable_fields(self):
+        """Test that only the searchable fields that were
+        changed are reported.
+        """
+        self.event.published = False
+        self.event.title = "New Title"
+        self.assertEqual(
+            FlaskSQLAlchemyMiddleware.get_changed_searchable_fields(self.event),
+            ["title", "published"],
+        )
+
+    def test_changed_nested_searchable_fields(self):
+        """Test that changes to related models are reported
+        for nested fields.
+        """
+        self.event.venue.city = "Philadelphia"
+        self.assertEqual(
+            FlaskSQLAlchemyMiddleware.get_changed_searchable_fields(self.event),
+            ["venue.city"],
+        )
+
+    def listen(self):
+        """Keep a mock Elasticsearch client in sync with the database
+        until the end of the test and return the client.
+        """
+        client = mock.Mock()
+        middleware = FlaskSQLAlchemyMiddleware(client, db)
+        for name, listener in [
+            ("before_commit", middleware.before_commit),
+            ("after_commit", middleware.after_commit),
+        ]:
+            db.event.listen(db.session, name, listener)
+            self.addCleanup(db.event.remove, db.session, name, listener)
+        return client
+
+    def test_commit_venue_changes(self):
+        """Test that committing a change to a venue updates the
+        search documents of its events, but only if the change is
+        to a field the documents contain.
+        """
+        client = self.listen()
+        self.event.venue.name = "New Name"
+        db.session.commit()
+        client.update_partial.assert_not_called()
+
+        self.event.venue.city = "Philadelphia"
+        db.session.commit()
+        client.update_partial.assert_called_once_with(
+            Event.__tablename__,
+            self.event.id,
+            {
+                "venue.city": "Philadelphia",
+                "id": self.event.id,
+                "index": Event.__tablename__,
+                "doc_type": Event.__doctype__,
+            },
+        )
+
+    def test_search_loads_items(self):
+        """Test that the items of a search are what the given load
+        function returns for the matched ids, and that the models
+        aren't queried for as well.
+        """
+        client = LocalSearchClient()
+        middleware = FlaskSQLAlchemyMiddleware(client, db)
+        middleware.reindex(Event)
+        load = mock.Mock(wraps=event_cards_by_id)
+        with mock.patch.object(middleware, "_create_query") as create_query:
+            response, pagination = middleware.search(
+                Event, MatchQuery("title", "Test Event"), load=load
+            )
+        create_query.assert_not_called()
+        load.assert_called_once_with([self.event.id])
+        self.assertEqual(response.total, 1)
+        self.assertEqual(pagination.total, 1)
+        self.assertEqual([card.title for card in pagination.items], ["Test Event"])
+
+    def test_extract_given_searchable_fields(self):
+        """Test that only the given fields are extracted
+        along with the document's metadata.
+        """
+        payload = FlaskSQLAlchemyMiddleware.extract_searchable_fields(
+            self.event, ["title"]
+        )
+        self.assertEqual(
+            payload,
+            {
+                "title": "Test Event",
+                "id": self.event.id,
+                "index": Event.__tablename__,
+                "doc_type": Event.__doctype__,
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""This module contains tests for the classes that represent
+Elasticsearch queries.
+"""
+
+
+import unittest
+from app.search import MatchQuery, BooleanQuery, AggregationType
+
+
+class QueryTestCase(unittest.TestCase):
+    """Class to run tests on the query classes."""
+
+    def test_query_without_aggregations(self):
+        """Test that queries don't contain an aggregations
+        section unless an aggregation is added.
+        """
+        match_query = MatchQuery("title", "Foobar")
+        self.assertNotIn("aggs", match_query.to_dict())
+
+    def test_add_aggregation(self):
+        """Test that aggregations are added to the query
+        under the given name.
+        """
+        bool_query = BooleanQuery()
+        bool_query.add_aggregation(
+            "categories", AggregationType.TERMS, "event_category_id"
+        )
+        bool_query.add_aggregation(
+            "prices",
+            AggregationType.RANGE,
+            "package_prices",
+            ranges=[{"to": 500}, {"from": 500}],
+        )
+        aggregations = bool_query.to_dict()["aggs"]
+        self.assertEqual(
+            aggregations["categories"], {"terms": {"field": "event_category_id"}}
+        )
+        self.assertEqual(
+            aggregations["prices"],
+            {
+                "range": {
+                    "field": "package_prices",
+                    "ranges": [{"to": 500}, {"from": 500}],
+                }
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
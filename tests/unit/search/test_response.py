@@ -0,0 +1,69 @@
+"""This module contains tests for the class that represents
+a response from an Elasticsearch query.
+"""
+
+
+import unittest
+from app.search import MatchQuery
+from app.search.response import SearchResponse
+
+
+def create_results(hits, aggregations=None):
+    """Return a dictionary in the format of an Elasticsearch
+    search response.
+    """
+    results = {
+        "took": 3,
+        "_shards": {"total": 1, "successful": 1, "skipped": 0, "failed": 0},
+        "hits": {
+            "total": {"value": len(hits), "relation": "eq"},
+            "max_score": 1.0 if hits else None,
+            "hits": [{"_id": str(id_), "_score": 1.0} for id_ in hits],
+        },
+    }
+    if aggregations is not None:
+        results["aggregations"] = aggregations
+    return results
+
+
+class SearchResponseTestCase(unittest.TestCase):
+    """Class to run tests on the SearchResponse class."""
+
+    def test_document_ids(self):
+        """Test that the ids of the matched documents are
+        returned in order as integers.
+        """
+        response = SearchResponse(create_results([3, 1, 2]), MatchQuery("title", "Foo"))
+        self.assertEqual(response.document_ids, [3, 1, 2])
+        self.assertEqual(response.total, 3)
+
+    def test_buckets(self):
+        """Test that the buckets of an aggregation can be
+        retrieved by name.
+        """
+        aggregations = {
+            "cities": {
+                "buckets": [
+                    {"key": "Philadelphia", "doc_count": 2},
+                    {"key": "Boston", "doc_count": 1},
+                ]
+            }
+        }
+        response = SearchResponse(
+            create_results([1, 2, 3], aggregations), MatchQuery("title", "Foo")
+        )
+        self.assertEqual(
+            [bucket["key"] for bucket in response.buckets("cities")],
+            ["Philadelphia", "Boston"],
+        )
+
+    def test_buckets_missing_aggregation(self):
+        """Test that an empty list is returned for an aggregation
+        that wasn't part of the query.
+        """
+        response = SearchResponse(create_results([]), MatchQuery("title", "Foo"))
+        self.assertEqual(response.buckets("cities"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
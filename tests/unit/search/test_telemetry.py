@@ -0,0 +1,101 @@
+"""This module contains tests for the classes that record
+search latency.
+"""
+
+
+import unittest
+from app.search import SearchTelemetry, MatchQuery
+from app.search.response import SearchResponse
+from app.search.telemetry import Histogram
+from tests.unit.search.test_response import create_results
+
+
+class RecordingLogger:
+    """Class that stores logged warnings for inspection."""
+
+    def __init__(self):
+        self.messages = []
+
+    def warning(self, message, *args):
+        self.messages.append(message % args)
+
+
+def create_response(title, hits=1, took=3):
+    """Return a search response for a match query on the given title."""
+    results = create_results(list(range(1, hits + 1)))
+    results["took"] = took
+    return SearchResponse(results, MatchQuery("title", title))
+
+
+class HistogramTestCase(unittest.TestCase):
+    """Class to run tests on the Histogram class."""
+
+    def test_cumulative_buckets(self):
+        """Test that bucket counts are cumulative and that values
+        above the last bucket are counted in +Inf.
+        """
+        histogram = Histogram(buckets=(10, 100))
+        for value in (5, 10, 50, 500):
+            histogram.observe(value)
+        self.assertEqual(
+            histogram.to_dict(),
+            {"buckets": {"10": 2, "100": 3, "+Inf": 4}, "sum": 565, "count": 4},
+        )
+
+
+class SearchTelemetryTestCase(unittest.TestCase):
+    """Class to run tests on the SearchTelemetry class."""
+
+    def test_record_per_endpoint(self):
+        """Test that searches are counted per endpoint."""
+        telemetry = SearchTelemetry()
+        telemetry.record("main.search", "query_index", create_response("a"), 20, 5)
+        telemetry.record("main.search", "query_index", create_response("b", 0), 30, 5)
+        telemetry.record(None, "query_index", create_response("c", 2), 10, 5)
+        endpoints = telemetry.to_dict()["endpoints"]
+        self.assertEqual(endpoints["main.search"]["searches"], 2)
+        self.assertEqual(endpoints["main.search"]["hits"], 1)
+        self.assertEqual(endpoints["main.search"]["zero_results"], 1)
+        self.assertEqual(endpoints["main.search"]["wall_time"]["sum"], 50)
+        self.assertEqual(endpoints["main.search"]["took"]["sum"], 6)
+        self.assertEqual(endpoints["unknown"]["searches"], 1)
+
+    def test_slowest_queries(self):
+        """Test that only the slowest searches are kept, slowest first."""
+        telemetry = SearchTelemetry(max_slow_queries=2)
+        for title, wall_time in (("a", 10), ("b", 50), ("c", 5), ("d", 30)):
+            telemetry.record(
+                "main.search", "query_index", create_response(title), wall_time, 0
+            )
+        slowest_queries = telemetry.slowest_queries()
+        self.assertEqual([entry["wall_time"] for entry in slowest_queries], [50, 30])
+        self.assertEqual(
+            slowest_queries[0]["query"]["query"], {"match": {"title": {"query": "b"}}}
+        )
+
+    def test_slow_queries_not_kept(self):
+        """Test that no searches are kept when the number of slow
+        queries to keep is 0, and that it can't be negative.
+        """
+        telemetry = SearchTelemetry(max_slow_queries=0)
+        telemetry.record("main.search", "query_index", create_response("a"), 10, 0)
+        self.assertEqual(telemetry.slowest_queries(), [])
+        self.assertEqual(telemetry.to_dict()["endpoints"]["main.search"]["searches"], 1)
+        with self.assertRaises(ValueError):
+            SearchTelemetry(max_slow_queries=-1)
+
+    def test_slow_query_logged(self):
+        """Test that only searches slower than the threshold are
+        logged along with their query.
+        """
+        logger = RecordingLogger()
+        telemetry = SearchTelemetry(slow_query_threshold=100, logger=logger)
+        telemetry.record("main.search", "query_index", create_response("a"), 20, 5)
+        telemetry.record("main.search", "query_index", create_response("b"), 90, 20)
+        self.assertEqual(len(logger.messages), 1)
+        self.assertIn("main.search", logger.messages[0])
+        self.assertIn("'query': 'b'", logger.messages[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,9 +4,12 @@ setup of the app.
 
 
 import unittest
-from flask import current_app
+from logging.handlers import SMTPHandler
+from unittest import mock
+from flask import Flask, current_app
 from app import create_app
 from app.extensions import db
+from config import ProductionConfig
 
 
 class BasicsTestCase(unittest.TestCase):
@@ -37,6 +40,27 @@ class BasicsTestCase(unittest.TestCase):
 		"""
         self.assertTrue(current_app.config["TESTING"])
 
+    def test_errors_emailed_only_to_an_administrator(self):
+        """Test that production errors are only emailed when there
+        is an administrator to email them to.
+        """
+        for admin_email, emailed in [(None, False), ("admin@example.com", True)]:
+            with self.subTest(admin_email=admin_email):
+                app = Flask(__name__)
+                app.config.from_object(ProductionConfig)
+                with mock.patch.object(ProductionConfig, "ADMIN_EMAIL", admin_email):
+                    ProductionConfig.init_app(app)
+                handlers = [
+                    handler
+                    for handler in app.logger.handlers
+                    if isinstance(handler, SMTPHandler)
+                ]
+                for handler in handlers:
+                    app.logger.removeHandler(handler)
+                self.assertEqual(len(handlers), int(emailed))
+                if emailed:
+                    self.assertEqual(handlers[0].toaddrs, [admin_email])
+
 
 if __name__ == "__main__":
     unittest.main()
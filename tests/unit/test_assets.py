@@ -0,0 +1,182 @@
+"""This module contains tests for fingerprinting, precompressing and
+serving static assets.
+"""
+
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from flask import url_for
+from app import create_app
+from app.assets import (
+    MANIFEST_FILENAME,
+    AssetManifest,
+    build_assets,
+    fingerprint,
+    strip_fingerprint,
+)
+
+
+CSS = b"@font-face { src: url('../fonts/font.ttf'); }\nbody { color: red; }\n" * 20
+FONT = b"font data " * 200
+IMAGE = b"\x89PNG not compressible"
+
+
+def write_file(folder, name, content):
+    """Write the content to the named file in the folder."""
+    path = os.path.join(folder, *name.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as output:
+        output.write(content)
+
+
+class AssetManifestTestCase(unittest.TestCase):
+    """Class to test building asset manifests."""
+
+    def setUp(self):
+        """Create a static folder and a build folder."""
+        self.static_folder = tempfile.mkdtemp()
+        self.build_folder = tempfile.mkdtemp()
+        write_file(self.static_folder, "css/style.css", CSS)
+        write_file(self.static_folder, "fonts/font.ttf", FONT)
+        write_file(self.static_folder, "favicons/icon.png", IMAGE)
+        write_file(self.static_folder, "images/upload.jpg", IMAGE)
+        self.directories = ["css", "fonts", "favicons"]
+
+    def tearDown(self):
+        """Delete the folders."""
+        shutil.rmtree(self.static_folder)
+        shutil.rmtree(self.build_folder)
+
+    def test_fingerprint(self):
+        """Test that fingerprints depend only on the content and can be
+        removed again.
+        """
+        name = fingerprint("css/style.css", CSS)
+        self.assertRegex(name, r"^css/style\.[0-9a-f]{12}\.css$")
+        self.assertEqual(name, fingerprint("css/style.css", CSS))
+        self.assertNotEqual(name, fingerprint("css/style.css", CSS + b" "))
+        self.assertEqual(strip_fingerprint(name), "css/style.css")
+        self.assertEqual(strip_fingerprint("images/upload.jpg"), "images/upload.jpg")
+
+    def test_from_static_folder(self):
+        """Test that the assets in the given directories are fingerprinted
+        and served from the original files.
+        """
+        manifest = AssetManifest.from_static_folder(
+            self.static_folder, self.directories
+        )
+        self.assertEqual(
+            sorted(manifest.assets), ["css/style.css", "favicons/icon.png", "fonts/font.ttf"]
+        )
+        path = manifest.url_filename("css/style.css")
+        self.assertEqual(path, fingerprint("css/style.css", CSS))
+        self.assertEqual(manifest.url_filename("images/upload.jpg"), "images/upload.jpg")
+        self.assertEqual(manifest.original(path), "css/style.css")
+        self.assertEqual(manifest.file_for(path, ["gzip"]), ("css/style.css", None))
+
+    def test_build(self):
+        """Test that the build writes fingerprinted, precompressed copies
+        with references rewritten, and a manifest that can be loaded.
+        """
+        manifest = build_assets(self.static_folder, self.directories, self.build_folder)
+        font_path = manifest.url_filename("fonts/font.ttf")
+        css_path = manifest.url_filename("css/style.css")
+
+        with open(os.path.join(self.build_folder, css_path), "rb") as css_file:
+            css = css_file.read()
+        self.assertIn(("url('../%s')" % font_path).encode(), css)
+        self.assertEqual(css_path, fingerprint("css/style.css", css))
+        with open(os.path.join(self.build_folder, css_path + ".gz"), "rb") as gz_file:
+            self.assertEqual(gzip.decompress(gz_file.read()), css)
+
+        # png files aren't worth compressing
+        self.assertEqual(manifest.assets["favicons/icon.png"]["encodings"], [])
+        self.assertIn("gzip", manifest.assets["css/style.css"]["encodings"])
+        self.assertEqual(
+            manifest.file_for(css_path, ["gzip"]), (css_path + ".gz", "gzip")
+        )
+        self.assertEqual(manifest.file_for(css_path, []), (css_path, None))
+
+        with open(os.path.join(self.build_folder, MANIFEST_FILENAME)) as manifest_file:
+            self.assertEqual(json.load(manifest_file), manifest.assets)
+        self.assertEqual(AssetManifest.load(self.build_folder).assets, manifest.assets)
+
+
+class StaticAssetViewTestCase(unittest.TestCase):
+    """Class to test serving fingerprinted static assets."""
+
+    def setUp(self):
+        """Create application instance and push an app context."""
+        self.app = create_app("testing", False)
+        self.app.config["SERVER_NAME"] = "localhost"
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.client = self.app.test_client()
+        self.build_folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Pop application context and delete the build folder."""
+        self.app_context.pop()
+        shutil.rmtree(self.build_folder)
+
+    def test_url_for(self):
+        """Test that url_for returns fingerprinted names for assets and
+        plain names for other static files.
+        """
+        url = url_for("static", filename="css/style.css")
+        self.assertRegex(url, r"/static/css/style\.[0-9a-f]{12}\.css$")
+        url = url_for("static", filename="images/default_profile_photo.jpg")
+        self.assertTrue(url.endswith("/static/images/default_profile_photo.jpg"))
+
+    def test_fingerprinted_files_are_immutable(self):
+        """Test that fingerprinted files may be cached forever and that
+        plain names are served with the default caching.
+        """
+        response = self.client.get(url_for("static", filename="css/style.css"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "text/css")
+        self.assertIn("immutable", response.headers["Cache-Control"])
+        response.close()
+
+        response = self.client.get("/static/css/style.css")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("immutable", response.headers.get("Cache-Control", ""))
+        response.close()
+
+    def test_old_fingerprints_get_current_file(self):
+        """Test that a fingerprint from an earlier deploy still gets the
+        file instead of a 404, without being cached forever.
+        """
+        response = self.client.get("/static/css/style.0123456789ab.css")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("immutable", response.headers.get("Cache-Control", ""))
+        response.close()
+        response = self.client.get("/static/css/missing.0123456789ab.css")
+        self.assertEqual(response.status_code, 404)
+
+    def test_content_negotiation(self):
+        """Test that a built asset is sent precompressed to clients that
+        accept it and as is to the others.
+        """
+        self.app.asset_manifest = build_assets(
+            self.app.static_folder, ["css"], self.build_folder
+        )
+        url = url_for("static", filename="css/style.css")
+        with open(os.path.join(self.build_folder, url.split("/static/")[1]), "rb") as css:
+            content = css.read()
+
+        response = self.client.get(url, headers={"Accept-Encoding": "gzip, deflate"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.mimetype, "text/css")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(gzip.decompress(response.get_data()), content)
+        response.close()
+
+        response = self.client.get(url)
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.get_data(), content)
+        response.close()
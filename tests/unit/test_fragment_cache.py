@@ -0,0 +1,100 @@
+"""This module contains tests for the fragment cache and the
+{% cache %} template tag.
+"""
+
+
+import unittest
+from flask import render_template_string
+from app import create_app
+from app.cache import LRUCache, init_fragment_cache
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    """Class to test the in-process LRU cache."""
+
+    def test_get_and_set(self):
+        """Test that values can be stored and retrieved and that
+        hits and misses are counted.
+        """
+        cache = LRUCache(2)
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        cache.delete("a")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(
+            cache.to_dict(), {"size": 0, "max_size": 2, "hits": 1, "misses": 2}
+        )
+
+    def test_eviction(self):
+        """Test that the least recently used entry is evicted when
+        the cache is full.
+        """
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+
+class FragmentCacheTestCase(unittest.TestCase):
+    """Class to test the {% cache %} template tag."""
+
+    template = (
+        "{% for event in events %}"
+        "{% cache 'card', event.id, event.version %}"
+        "<p>{{ event.title }}</p>"
+        "{% endcache %}"
+        "{% endfor %}"
+    )
+
+    def setUp(self):
+        """Create application instance and push an app context."""
+        self.app = create_app("testing", False)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        """Pop application context."""
+        self.app_context.pop()
+
+    def render(self, *events):
+        """Render the template with the given (id, version, title) tuples."""
+        return render_template_string(
+            self.template,
+            events=[
+                {"id": id, "version": version, "title": title}
+                for id, version, title in events
+            ],
+        )
+
+    def test_fragment_is_cached_until_version_changes(self):
+        """Test that a fragment is rendered once per version."""
+        self.assertEqual(self.render((1, 1, "A"), (2, 1, "B")), "<p>A</p><p>B</p>")
+        # same versions, so the cached fragments are used
+        self.assertEqual(self.render((1, 1, "X"), (2, 1, "Y")), "<p>A</p><p>B</p>")
+        # a new version is rendered again
+        self.assertEqual(self.render((1, 2, "X"), (2, 1, "Y")), "<p>X</p><p>B</p>")
+        self.assertEqual(self.app.fragment_cache.hits, 3)
+        self.assertEqual(self.app.fragment_cache.misses, 3)
+
+    def test_fragments_are_escaped_once(self):
+        """Test that cached fragments are neither escaped again nor
+        left unescaped.
+        """
+        self.assertEqual(self.render((1, 1, "<b>")), "<p>&lt;b&gt;</p>")
+        self.assertEqual(self.render((1, 1, "<b>")), "<p>&lt;b&gt;</p>")
+
+    def test_disabled(self):
+        """Test that fragments are always rendered when the cache
+        size is 0.
+        """
+        self.app.config["FRAGMENT_CACHE_SIZE"] = 0
+        init_fragment_cache(self.app)
+        self.assertIsNone(self.app.fragment_cache)
+        self.assertEqual(self.render((1, 1, "A")), "<p>A</p>")
+        self.assertEqual(self.render((1, 1, "X")), "<p>X</p>")
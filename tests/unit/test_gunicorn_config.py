@@ -0,0 +1,93 @@
+"""This module contains tests for the gunicorn settings and for
+resetting connections in forked workers.
+"""
+
+
+import os
+import runpy
+import unittest
+from unittest import mock
+from app import create_app, init_worker
+from app.extensions import db
+from app.search import ElasticsearchClient
+from config import default_worker_count
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_settings(**environment):
+    """Return the settings in gunicorn.conf.py for the given environment."""
+    environment.setdefault("PROMETHEUS_MULTIPROC_DIR", "")
+    with mock.patch.dict(os.environ, environment):
+        with mock.patch("config.CONFIG_MAPPER", reload_config_mapper()):
+            return runpy.run_path(os.path.join(ROOT, "gunicorn.conf.py"))
+
+
+def reload_config_mapper():
+    """Return the configuration classes built from the current environment."""
+    return runpy.run_path(os.path.join(ROOT, "config.py"))["CONFIG_MAPPER"]
+
+
+class GunicornConfigTestCase(unittest.TestCase):
+    """Class to test the settings gunicorn is started with."""
+
+    def test_default_worker_count(self):
+        """Test that sync workers get two per core and threaded workers
+        one per core.
+        """
+        self.assertEqual(default_worker_count("sync", 4), 9)
+        self.assertEqual(default_worker_count("gthread", 4), 5)
+        self.assertEqual(default_worker_count("gevent", 1), 2)
+
+    def test_settings(self):
+        """Test that the settings are read from the configuration class."""
+        settings = load_settings(
+            FLASK_CONFIG="production",
+            GUNICORN_WORKER_CLASS="gthread",
+            GUNICORN_WORKERS="3",
+            GUNICORN_THREADS="8",
+            GUNICORN_MAX_REQUESTS="500",
+        )
+        self.assertEqual(settings["workers"], 3)
+        self.assertEqual(settings["threads"], 8)
+        self.assertEqual(settings["max_requests"], 500)
+        self.assertTrue(settings["preload_app"])
+        self.assertGreater(settings["max_requests_jitter"], 0)
+
+    def test_sync_workers_have_one_thread(self):
+        """Test that sync workers aren't turned into gthread workers."""
+        settings = load_settings(
+            FLASK_CONFIG="production", GUNICORN_WORKER_CLASS="sync", GUNICORN_THREADS="8"
+        )
+        self.assertEqual(settings["threads"], 1)
+
+
+class InitWorkerTestCase(unittest.TestCase):
+    """Class to test resetting connections after a fork."""
+
+    def setUp(self):
+        """Create application instance and push an app context."""
+        self.app = create_app("testing", False)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        """Pop the app context."""
+        self.app_context.pop()
+
+    def test_init_worker(self):
+        """Test that the engines are disposed and that the search client
+        is created again on its next use.
+        """
+        engine = db.get_engine()
+        self.app.elasticsearch_client = ElasticsearchClient("http://localhost:9200")
+        client = self.app.elasticsearch_client._client
+        with mock.patch.object(engine, "dispose") as dispose:
+            init_worker(self.app)
+        dispose.assert_called_once_with()
+        self.assertIsNot(self.app.elasticsearch_client._client, client)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+"""This module contains tests for the in memory stand-in for
+Elasticsearch that the load test searches with.
+"""
+
+
+import unittest
+from datetime import date, datetime
+from app.blueprints.main.services import (
+    add_event_search_facets,
+    create_advanced_event_search_query,
+)
+from app.search import MatchQuery
+from benchmarks.loadtest.search import LocalSearchClient
+
+
+DOCUMENTS = [
+    {
+        "id": 1,
+        "title": "Summer Gala",
+        "venue.city": "Phoenix",
+        "venue.state": "Arizona",
+        "start_datetime": datetime(2020, 6, 1, 18),
+        "end_datetime": datetime(2020, 6, 1, 22),
+        "event_category_id": 1,
+        "package_prices": [250.0, 1000.0],
+    },
+    {
+        "id": 2,
+        "title": "Winter Gala",
+        "venue.city": "Denver",
+        "venue.state": "Colorado",
+        "start_datetime": datetime(2020, 12, 1, 18),
+        "end_datetime": datetime(2020, 12, 2, 22),
+        "event_category_id": 2,
+        "package_prices": [5000.0],
+    },
+    {
+        "id": 3,
+        "title": "Summer Festival",
+        "venue.city": "Phoenix",
+        "venue.state": "Arizona",
+        "start_datetime": datetime(2020, 7, 4, 12),
+        "end_datetime": datetime(2020, 7, 5, 12),
+        "event_category_id": 1,
+        "package_prices": [750.0],
+    },
+]
+
+
+class LocalSearchClientTestCase(unittest.TestCase):
+    """Class to test answering the application's queries in memory."""
+
+    def setUp(self):
+        """Index the documents."""
+        self.client = LocalSearchClient()
+        self.client.create_index("events")
+        for document in DOCUMENTS:
+            self.client.add_to_index("events", "event", document["id"], document)
+
+    def test_title_search(self):
+        """Test that a title search returns the matching events and
+        the facets of all of them.
+        """
+        response = self.client.query_index(
+            "events", add_event_search_facets(MatchQuery("title", "gala", size=1))
+        )
+        self.assertEqual(response.total, 2)
+        self.assertEqual(response.document_ids, [1])
+        self.assertEqual(
+            response.buckets("categories"),
+            [{"key": 1, "doc_count": 1}, {"key": 2, "doc_count": 1}],
+        )
+        self.assertEqual(
+            [bucket["key_as_string"] for bucket in response.buckets("dates")],
+            ["2020-06", "2020-12"],
+        )
+        self.assertEqual(
+            [bucket["doc_count"] for bucket in response.buckets("prices")],
+            [1, 0, 1, 1],
+        )
+
+    def test_advanced_search(self):
+        """Test that every clause of the advanced search has to match."""
+        query = create_advanced_event_search_query(
+            {
+                "category": 1,
+                "city": "phoenix",
+                "state": "Arizona",
+                "start_date": date(2020, 6, 1),
+                "end_date": date(2020, 6, 30),
+            }
+        )
+        response = self.client.query_index("events", query)
+        self.assertEqual(response.document_ids, [1])
+        self.assertEqual(response.buckets("cities"), [{"key": "Phoenix", "doc_count": 1}])
+
+    def test_changes(self):
+        """Test that documents are updated and removed."""
+        self.client.update_partial("events", 3, {"title": "Winter Festival"})
+        self.client.remove_from_index("events", "event", 2)
+        response = self.client.query_index("events", MatchQuery("title", "winter"))
+        self.assertEqual(response.document_ids, [3])
+        self.client.reset()
+        self.assertEqual(
+            [int(hit["_id"]) for hit in self.client.iterate_index("events", "id")],
+            [1, 3],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""This module contains tests for the password hasher."""
+
+
+import threading
+import unittest
+from unittest import mock
+from werkzeug.security import generate_password_hash
+from app.passwords import PasswordHasher, PasswordHasherBusy
+
+
+class PasswordHasherTestCase(unittest.TestCase):
+    """Class to test hashing and checking passwords."""
+
+    def test_methods(self):
+        """Test that passwords hashed with each supported method can
+        be checked, including hashes Werkzeug made.
+        """
+        for method in ["pbkdf2:sha256:1000", "pbkdf2:sha512:1000", "scrypt:1024:8:1"]:
+            with self.subTest(method=method):
+                hasher = PasswordHasher(method)
+                password_hash = hasher.hash("password")
+                self.assertTrue(password_hash.startswith(method + "$"))
+                self.assertTrue(hasher.verify(password_hash, "password"))
+                self.assertFalse(hasher.verify(password_hash, "pass"))
+        hasher = PasswordHasher("scrypt:1024:8:1")
+        self.assertTrue(hasher.verify(generate_password_hash("password"), "password"))
+        self.assertFalse(hasher.verify("scrypt:1024:8:1$salt", "password"))
+
+    def test_needs_rehash(self):
+        """Test that hashes made with another method, cost or salt
+        length need to be made again.
+        """
+        hasher = PasswordHasher("pbkdf2:sha256", salt_length=16)
+        self.assertFalse(hasher.needs_rehash(hasher.hash("password")))
+        self.assertTrue(hasher.needs_rehash(generate_password_hash("password")))
+        for method in ["pbkdf2:sha256:1000", "scrypt:1024:8:1"]:
+            with self.subTest(method=method):
+                other = PasswordHasher(method, salt_length=16)
+                self.assertTrue(hasher.needs_rehash(other.hash("password")))
+
+    def test_pools(self):
+        """Test that passwords can be checked on a pool of threads or processes."""
+        for pool in ["thread", "process"]:
+            with self.subTest(pool=pool):
+                hasher = PasswordHasher("pbkdf2:sha256:1000", pool=pool)
+                password_hash = hasher.hash("password")
+                self.assertTrue(hasher.verify(password_hash, "password"))
+                self.assertFalse(hasher.verify(password_hash, "pass"))
+
+    def test_busy(self):
+        """Test that a password isn't checked once as many as allowed
+        are being checked, and that it is once one of them is done.
+        """
+        hasher = PasswordHasher("pbkdf2:sha256:1000", max_concurrency=1, wait=0.05)
+        password_hash = hasher.hash("password")
+        started = threading.Event()
+        finish = threading.Event()
+
+        def slow_check(password_hash, password):
+            started.set()
+            finish.wait()
+            return True
+
+        with mock.patch("app.passwords.check_password", slow_check):
+            thread = threading.Thread(target=hasher.verify, args=(password_hash, "x"))
+            thread.start()
+            started.wait()
+            with self.assertRaises(PasswordHasherBusy):
+                hasher.verify(password_hash, "password")
+            finish.set()
+            thread.join()
+        self.assertTrue(hasher.verify(password_hash, "password"))
+
+
+if __name__ == "__main__":
+    unittest.main()
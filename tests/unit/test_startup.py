@@ -0,0 +1,53 @@
+"""This module contains tests for the modules imported when the
+application starts.
+"""
+
+
+import os
+import subprocess
+import sys
+import unittest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def imported_modules(module, **environment):
+    """Import the module in a new interpreter and return the names of
+    every module that was imported with it.
+    """
+    code = f"import sys, {module}; print(' '.join(sys.modules))"
+    env = dict(os.environ, FLASK_CONFIG="testing", USE_ELASTICSEARCH="0")
+    env.pop("ELASTICSEARCH_URL", None)
+    env.update(environment)
+    output = subprocess.check_output(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, universal_newlines=True
+    )
+    return set(output.split())
+
+
+class StartupTestCase(unittest.TestCase):
+    """Class to test that workers and the command line tools only
+    import what they need.
+    """
+
+    def test_wsgi_imports(self):
+        """Test that the WSGI entry point doesn't import development
+        tools, migrations or the payment client.
+        """
+        modules = imported_modules("wsgi")
+        for module in ["app.fake", "faker", "flask_migrate", "alembic", "stripe"]:
+            self.assertNotIn(module, modules)
+
+    def test_cli_imports(self):
+        """Test that the command line tools can be loaded without an
+        Elasticsearch URL and without importing the fake data generator.
+        """
+        modules = imported_modules("sponsormatch")
+        self.assertIn("flask_migrate", modules)
+        self.assertNotIn("app.fake", modules)
+        self.assertNotIn("faker", modules)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""This module contains tests for the rate limiter."""
+
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+from app.throttling import MemoryRateLimitStore, RateLimiter, SQLiteRateLimitStore
+
+
+class RateLimitStoreTestCase(unittest.TestCase):
+    """Class to test counting attempts in a sliding window."""
+
+    def setUp(self):
+        """Create a directory for the SQLite stores."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "attempts.sqlite")
+
+    def tearDown(self):
+        """Delete the SQLite stores."""
+        shutil.rmtree(self.directory)
+
+    def test_sliding_window(self):
+        """Test that attempts over the limit are turned away until the
+        oldest ones leave the window, and that keys are counted apart.
+        """
+        for store in [MemoryRateLimitStore(), SQLiteRateLimitStore(self.path)]:
+            with self.subTest(store=type(store).__name__):
+                self.assertEqual(store.hit("a", 2, 0.2), 0)
+                time.sleep(0.1)
+                self.assertEqual(store.hit("a", 2, 0.2), 0)
+                retry_after = store.hit("a", 2, 0.2)
+                self.assertGreater(retry_after, 0)
+                self.assertLessEqual(retry_after, 0.1)
+                self.assertEqual(store.hit("b", 2, 0.2), 0)
+                time.sleep(0.12)
+                self.assertEqual(store.hit("a", 2, 0.2), 0)
+                self.assertGreater(store.hit("a", 2, 0.2), 0)
+
+    def test_memory_store_forgets_keys(self):
+        """Test that the in-memory store keeps at most max_keys keys."""
+        store = MemoryRateLimitStore(max_keys=2)
+        for key in ["a", "b", "c"]:
+            store.hit(key, 1, 60)
+        self.assertEqual(store.hit("a", 1, 60), 0)
+        self.assertGreater(store.hit("c", 1, 60), 0)
+
+    def test_shared_between_workers(self):
+        """Test that workers sharing a SQLite store count each other's
+        attempts, and that a worker that saw enough attempts itself
+        doesn't ask the shared store.
+        """
+        first = RateLimiter(SQLiteRateLimitStore(self.path))
+        second = RateLimiter(SQLiteRateLimitStore(self.path))
+        self.assertEqual(first.hit("a", 3, 60), 0)
+        self.assertEqual(second.hit("a", 3, 60), 0)
+        self.assertEqual(first.hit("a", 3, 60), 0)
+        self.assertGreater(second.hit("a", 3, 60), 0)
+        self.assertGreater(first.hit("a", 3, 60), 0)
+        third = RateLimiter(mock.Mock(wraps=SQLiteRateLimitStore(self.path)))
+        self.assertEqual(third.hit("b", 1, 60), 0)
+        self.assertGreater(third.hit("b", 1, 60), 0)
+        third.shared_store.hit.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,24 @@
+"""This script creates the application for WSGI servers such as gunicorn.
+The command line tools live in sponsormatch.py, so that the modules
+only they need aren't imported by every worker.
+"""
+
+
+import os
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+
+from app import create_app
+from app.error_handlers import register_error_handlers
+
+
+app = create_app(
+    os.environ.get("FLASK_CONFIG", "default"),
+    os.environ.get("USE_ELASTICSEARCH", 1) == 1,
+)
+
+# Register application wide error handlers
+register_error_handlers(app)